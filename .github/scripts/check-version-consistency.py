@@ -4,11 +4,16 @@ Check version consistency across different files in the repository.
 Supports multiple file formats and provides detailed reporting.
 """
 
+import hashlib
 import json
+import os
 import sys
 import re
+import shutil
+import time
+from concurrent.futures import ProcessPoolExecutor
 from pathlib import Path
-from typing import Dict, List, Optional, Any, Set
+from typing import Dict, List, Optional, Any, Set, Tuple
 
 # Optional imports with fallbacks
 try:
@@ -27,11 +32,226 @@ except ImportError:
     version = None
 
 
+# Semantic version core with optional pre-release and build metadata
+SEMVER = r'[0-9]+\.[0-9]+\.[0-9]+(?:-[0-9A-Za-z.-]*[0-9A-Za-z])?(?:\+[0-9A-Za-z.-]*[0-9A-Za-z])?'
+
+# All markdown version reference forms in one pattern, so each file is scanned once:
+# "Version 1.0.0" / "version: 1.0.0", "v1.0.0" and "[1.0.0]". Every form starts with
+# one of three characters, which lets the regex engine skip ahead with a charset
+# prefilter; the branches then verify the rest.
+VERSION_REFERENCE_PATTERN = re.compile(rf'''
+    [Vv\[] (?<!\w[Vv])
+    (?:
+        (?<=\[) (?P<bracketed>{SEMVER}) \]
+      | (?<=[Vv]) (?i:ersion) (?::[ \t]*|\s+) (?P<labeled>{SEMVER})
+      | (?<=[Vv]) (?P<prefixed>{SEMVER})
+    )
+''', re.VERBOSE)
+
+
+def find_version_references(content: str) -> List[Dict[str, Any]]:
+    """
+    Find every version reference in content in a single pass.
+
+    Returns one entry per occurrence with the version string, its 1-based
+    line and column, its character offset and the form it was written in.
+    """
+    references = []
+    line = 1
+    last = 0
+
+    for match in VERSION_REFERENCE_PATTERN.finditer(content):
+        kind = match.lastgroup
+        start = match.start(kind)
+        line += content.count('\n', last, start)
+        last = start
+        references.append({
+            'version': match.group(kind),
+            'line': line,
+            'column': start - content.rfind('\n', 0, start),
+            'offset': start,
+            'kind': kind
+        })
+
+    return references
+
+
+def benchmark_markdown_scan(files: int = 2000, repeat: int = 3):
+    """Compare the single-pass matcher with one findall per pattern on a synthetic docs tree."""
+    legacy_patterns = [
+        r'Version\s+([0-9]+\.[0-9]+\.[0-9]+[^\s]*)',
+        r'v([0-9]+\.[0-9]+\.[0-9]+[^\s]*)',
+        r'version:\s*([0-9]+\.[0-9]+\.[0-9]+[^\s]*)',
+        r'\[([0-9]+\.[0-9]+\.[0-9]+[^\]]*?)\]',
+    ]
+    prose = (
+        'The layer model describes interfaces between components and how they evolve.\n'
+        'Plain prose with numbers like 3.14, dates such as 2025-01-15 and [links](index.md) is common.\n\n'
+    )
+    references = 'See the v1.4.2 release notes and [2.0.0]; this page tracks Version 1.4.2.\n\n'
+    docs = [f'# Page {i}\n\n' + (prose * 10 + references) * 4 for i in range(files)]
+    size = sum(len(doc) for doc in docs)
+
+    def legacy():
+        for doc in docs:
+            versions = []
+            for pattern in legacy_patterns:
+                versions.extend(re.findall(pattern, doc, re.IGNORECASE))
+            set(versions)
+
+    def single_pass():
+        for doc in docs:
+            find_version_references(doc)
+
+    timings = {}
+    for name, func in (('legacy (4 x findall)', legacy), ('single pass', single_pass)):
+        best = float('inf')
+        for _ in range(repeat):
+            start = time.perf_counter()
+            func()
+            best = min(best, time.perf_counter() - start)
+        timings[name] = best
+
+    print(f"📏 Markdown scan benchmark: {files} files, {size / 1024 / 1024:.1f} MiB")
+    for name, seconds in timings.items():
+        print(f"   {name:22} {seconds:.3f}s ({size / 1024 / 1024 / seconds:.1f} MiB/s)")
+    print(f"   Speedup: {timings['legacy (4 x findall)'] / timings['single pass']:.2f}x")
+    return timings
+
+
+# Where a primary file keeps its version value, as patterns formatted with the escaped version
+PRIMARY_VALUE_PATTERNS = {
+    'package.json': r'"version"\s*:\s*"({version})"',
+    'pyproject.toml': r'^\s*version\s*=\s*["\']({version})["\']',
+    'Cargo.toml': r'^\s*version\s*=\s*["\']({version})["\']',
+}
+
+
+def write_atomically(path: Path, content: str):
+    """Replace path with content via a temporary file in the same directory."""
+    tmp_path = path.with_name(f'.{path.name}.tmp')
+    with open(tmp_path, 'w', encoding='utf-8', newline='') as f:
+        f.write(content)
+    shutil.copymode(path, tmp_path)
+    os.replace(tmp_path, path)
+
+
+DEFAULT_CACHE_PATH = Path('.github/.cache/version-references.json')
+
+# Below this many changed files a process pool costs more than it saves
+PARALLEL_SCAN_MIN_FILES = 32
+
+# Directories never worth descending into when looking for version information
+PRUNED_DIRS = {
+    '.git', 'site', 'node_modules', '.venv', 'venv', '__pycache__', '.tox', '.nox',
+    '.mypy_cache', '.pytest_cache', '.ruff_cache', '.cache', 'target', 'dist', 'build'
+}
+
+
+def scan_markdown_file(path: str) -> Tuple[str, Optional[str], List[Dict[str, Any]], Optional[str]]:
+    """Read, hash and scan one markdown file; runs in worker processes."""
+    try:
+        data = Path(path).read_bytes()
+        references = find_version_references(data.decode('utf-8'))
+        return path, hashlib.sha256(data).hexdigest(), references, None
+    except Exception as e:
+        return path, None, [], str(e)
+
+
+class ReferenceCache:
+    """
+    Version references per markdown file, keyed by content hash.
+
+    A file whose size and mtime are unchanged is reused without being read;
+    otherwise it is hashed and only rescanned when its content changed.
+    Entries are invalidated wholesale when the reference pattern changes.
+    """
+
+    def __init__(self, path: Optional[Path]):
+        self.path = path
+        self.signature = hashlib.sha256(VERSION_REFERENCE_PATTERN.pattern.encode('utf-8')).hexdigest()
+        self.entries = {}
+        self.hits = 0
+        self.misses = 0
+
+        if path is not None:
+            try:
+                data = json.loads(path.read_text(encoding='utf-8'))
+                if data.get('signature') == self.signature:
+                    self.entries = data.get('files', {})
+            except (OSError, ValueError):
+                pass
+
+    def lookup(self, path: str) -> Optional[List[Dict[str, Any]]]:
+        """Cached references for path, or None when it has to be rescanned."""
+        entry = self.entries.get(path)
+        if entry is None:
+            self.misses += 1
+            return None
+
+        try:
+            stat = os.stat(path)
+            if stat.st_size == entry['size'] and stat.st_mtime_ns == entry['mtime_ns']:
+                self.hits += 1
+                return entry['references']
+
+            digest = hashlib.sha256(Path(path).read_bytes()).hexdigest()
+        except OSError:
+            self.misses += 1
+            return None
+
+        if digest == entry['sha256']:
+            entry['size'], entry['mtime_ns'] = stat.st_size, stat.st_mtime_ns
+            self.hits += 1
+            return entry['references']
+
+        self.misses += 1
+        return None
+
+    def store(self, path: str, digest: str, references: List[Dict[str, Any]]):
+        """Record freshly scanned references for path."""
+        try:
+            stat = os.stat(path)
+        except OSError:
+            return
+        self.entries[path] = {
+            'size': stat.st_size,
+            'mtime_ns': stat.st_mtime_ns,
+            'sha256': digest,
+            'references': references
+        }
+
+    def save(self, live_paths: Set[str]):
+        """Persist entries for files that still exist."""
+        if self.path is None:
+            return
+        files = {path: entry for path, entry in self.entries.items() if path in live_paths}
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = self.path.with_suffix('.tmp')
+        tmp_path.write_text(json.dumps({'signature': self.signature, 'files': files}), encoding='utf-8')
+        tmp_path.replace(self.path)
+
+
 class VersionChecker:
-    def __init__(self):
+    def __init__(self, jobs: int = 1, cache_path: Optional[Path] = None):
         self.versions = {}
         self.issues = []
         self.recommendations = []
+        self.scan_stats = {}
+        self.jobs = jobs
+        self.cache = ReferenceCache(cache_path)
+
+        # Extractors dispatched by file name; root files are only read at the top level
+        self.manifest_extractors = {
+            'package.json': self.extract_version_from_package_json,
+            'pyproject.toml': self.extract_version_from_pyproject_toml,
+            'Cargo.toml': self.extract_version_from_cargo_toml,
+        }
+        self.root_extractors = {
+            'VERSION': self.extract_version_from_text_file,
+            'version.txt': self.extract_version_from_text_file,
+            'CHANGELOG.md': self.extract_version_from_changelog,
+        }
         
     def extract_version_from_package_json(self, file_path: Path) -> Optional[str]:
         """Extract version from package.json."""
@@ -123,9 +343,9 @@ class VersionChecker:
             
             # Look for version patterns in changelog
             patterns = [
-                r'##\\s*\\[([0-9]+\\.[0-9]+\\.[0-9]+[^\\]]*?)\\]',  # ## [1.0.0]
-                r'##\\s*v?([0-9]+\\.[0-9]+\\.[0-9]+[^\\s]*)',       # ## v1.0.0 or ## 1.0.0
-                r'#\\s*v?([0-9]+\\.[0-9]+\\.[0-9]+[^\\s]*)',        # # v1.0.0 or # 1.0.0
+                r'##\s*\[([0-9]+\.[0-9]+\.[0-9]+[^\]]*?)\]',  # ## [1.0.0]
+                r'##\s*v?([0-9]+\.[0-9]+\.[0-9]+[^\s]*)',     # ## v1.0.0 or ## 1.0.0
+                r'#\s*v?([0-9]+\.[0-9]+\.[0-9]+[^\s]*)',      # # v1.0.0 or # 1.0.0
             ]
             
             for pattern in patterns:
@@ -141,74 +361,141 @@ class VersionChecker:
             })
             return None
             
-    def extract_version_from_markdown(self, file_path: Path) -> List[str]:
-        """Extract version references from markdown files."""
-        versions = []
-        try:
-            content = file_path.read_text()
-            
-            # Look for version patterns
-            patterns = [
-                r'Version\\s+([0-9]+\\.[0-9]+\\.[0-9]+[^\\s]*)',
-                r'v([0-9]+\\.[0-9]+\\.[0-9]+[^\\s]*)',
-                r'version:\\s*([0-9]+\\.[0-9]+\\.[0-9]+[^\\s]*)',
-                r'\\[([0-9]+\\.[0-9]+\\.[0-9]+[^\\]]*?)\\]',
-            ]
-            
-            for pattern in patterns:
-                matches = re.findall(pattern, content, re.IGNORECASE)
-                versions.extend(matches)
-                
-        except Exception as e:
-            self.issues.append({
-                'severity': 'Warning',
-                'message': f'Could not parse {file_path}: {e}'
-            })
-            
-        return list(set(versions))  # Remove duplicates
-        
+    def get_extractor(self, name: str, at_root: bool):
+        """Pick the extractor for a file by name, then by extension."""
+        if name in self.manifest_extractors:
+            return 'primary', self.manifest_extractors[name]
+        if at_root and name in self.root_extractors:
+            return 'primary', self.root_extractors[name]
+        if name.endswith('.md') and name not in ('CHANGELOG.md', 'README.md'):
+            return 'reference', scan_markdown_file  # Files we handle specifically are skipped
+        return None, None
+
+    def iter_repository_files(self, repo_root: Path):
+        """
+        Walk the repository once, yielding (path, size, at_root) for regular files.
+
+        VCS metadata, build output and dependency directories are pruned
+        before they are entered, and symlinks are skipped so linked docs
+        are not scanned twice.
+        """
+        stack = [repo_root]
+        while stack:
+            directory = stack.pop()
+            try:
+                entries = sorted(os.scandir(directory), key=lambda entry: entry.name)
+            except OSError:
+                continue
+
+            subdirs = []
+            for entry in entries:
+                if entry.is_symlink():
+                    continue
+                if entry.is_dir():
+                    if entry.name not in PRUNED_DIRS:
+                        subdirs.append(entry.path)
+                elif entry.is_file():
+                    yield Path(entry.path), entry.stat().st_size, directory == repo_root
+            stack.extend(reversed(subdirs))
+
+    def scan_markdown(self, paths: List[str]) -> Dict[str, List[Dict[str, Any]]]:
+        """
+        Collect version references for markdown files.
+
+        Unchanged files come from the content-hash cache. The rest are
+        scanned, in a process pool when more than one job is requested and
+        there is enough work to amortize starting it.
+        """
+        results = {}
+        pending = []
+        for path in paths:
+            cached = self.cache.lookup(path)
+            if cached is None:
+                pending.append(path)
+            else:
+                results[path] = cached
+
+        if self.jobs > 1 and len(pending) >= PARALLEL_SCAN_MIN_FILES:
+            with ProcessPoolExecutor(max_workers=self.jobs) as pool:
+                chunksize = max(1, len(pending) // (self.jobs * 4))
+                scanned = list(pool.map(scan_markdown_file, pending, chunksize=chunksize))
+        else:
+            scanned = [scan_markdown_file(path) for path in pending]
+
+        for path, digest, references, error in scanned:
+            if error is not None:
+                self.issues.append({
+                    'severity': 'Warning',
+                    'message': f'Could not parse {path}: {error}'
+                })
+                continue
+            self.cache.store(path, digest, references)
+            results[path] = references
+
+        self.cache.save(set(paths))
+        return results
+
     def scan_repository(self):
-        """Scan repository for version information."""
+        """Scan repository for version information in a single directory walk."""
         repo_root = Path('.')
-        
-        # File patterns to check
-        file_patterns = {
-            '**/package.json': self.extract_version_from_package_json,
-            '**/pyproject.toml': self.extract_version_from_pyproject_toml,
-            '**/Cargo.toml': self.extract_version_from_cargo_toml,
-            'VERSION': self.extract_version_from_text_file,
-            'version.txt': self.extract_version_from_text_file,
-            'CHANGELOG.md': self.extract_version_from_changelog,
-        }
-        
+
         print("🔍 Scanning repository for version information...")
-        
-        for pattern, extractor in file_patterns.items():
-            for file_path in repo_root.glob(pattern):
-                if file_path.is_file():
-                    print(f"   Checking {file_path}")
-                    extracted_version = extractor(file_path)
-                    
-                    if extracted_version:
-                        self.versions[str(file_path)] = {
-                            'version': extracted_version,
-                            'type': 'primary',
-                            'consistent': True  # Will be updated later
-                        }
-        
-        # Check markdown files for version references
-        for md_file in repo_root.glob('**/*.md'):
-            if md_file.name in ['CHANGELOG.md', 'README.md']:
-                continue  # Skip files we handle specifically
-                
-            versions_found = self.extract_version_from_markdown(md_file)
+
+        start = time.perf_counter()
+        files_scanned = 0
+        bytes_scanned = 0
+        markdown_files = []
+
+        for file_path, size, at_root in self.iter_repository_files(repo_root):
+            kind, extractor = self.get_extractor(file_path.name, at_root)
+            if extractor is None:
+                continue
+
+            files_scanned += 1
+            bytes_scanned += size
+
+            if kind == 'primary':
+                print(f"   Checking {file_path}")
+                extracted_version = extractor(file_path)
+
+                if extracted_version:
+                    self.versions[str(file_path)] = {
+                        'version': extracted_version,
+                        'type': 'primary',
+                        'consistent': True  # Will be updated later
+                    }
+            else:
+                markdown_files.append(str(file_path))
+
+        # Merge cached and freshly scanned references in walk order
+        scanned = self.scan_markdown(markdown_files)
+        for path in markdown_files:
+            references = scanned.get(path, [])
+            versions_found = list(dict.fromkeys(ref['version'] for ref in references))
             if versions_found:
-                self.versions[str(md_file)] = {
+                self.versions[path] = {
                     'version': versions_found[0] if len(versions_found) == 1 else versions_found,
                     'type': 'reference',
                     'consistent': True,
-                    'all_versions': versions_found if len(versions_found) > 1 else None
+                    'all_versions': versions_found if len(versions_found) > 1 else None,
+                    'references': references
                 }
+
+        elapsed = max(time.perf_counter() - start, 1e-9)
+        self.scan_stats = {
+            'files_scanned': files_scanned,
+            'bytes_scanned': bytes_scanned,
+            'seconds': round(elapsed, 4),
+            'files_per_second': round(files_scanned / elapsed, 1),
+            'bytes_per_second': round(bytes_scanned / elapsed, 1),
+            'jobs': self.jobs,
+            'cache_hits': self.cache.hits,
+            'cache_misses': self.cache.misses
+        }
+        print(f"   Scanned {files_scanned} files ({bytes_scanned / 1024:.1f} KiB) in {elapsed:.3f}s "
+              f"({self.scan_stats['files_per_second']:.0f} files/s, "
+              f"{bytes_scanned / 1024 / 1024 / elapsed:.2f} MiB/s)")
+        print(f"   Markdown cache: {self.cache.hits} unchanged, {self.cache.misses} rescanned")
                 
     def analyze_consistency(self) -> bool:
         """Analyze version consistency."""
@@ -317,7 +604,8 @@ class VersionChecker:
                 'total_files': len(self.versions),
                 'primary_files': len([v for v in self.versions.values() if v['type'] == 'primary']),
                 'reference_files': len([v for v in self.versions.values() if v['type'] == 'reference'])
-            }
+            },
+            'scan': self.scan_stats
         }
         
         with open('.version-check-results.json', 'w') as f:
@@ -328,6 +616,86 @@ class VersionChecker:
         if primary_version:
             print(f"::set-output name=primary_version::{primary_version}")
             
+    def locate_primary_version(self, file_path: str, content: str, version: str) -> List[int]:
+        """Offsets of the version value in a primary version file's content."""
+        name = Path(file_path).name
+        if name == 'CHANGELOG.md':
+            return []  # Released sections are history; bumping adds a section instead
+
+        pattern = PRIMARY_VALUE_PATTERNS.get(name)
+        if pattern is None:
+            offset = content.find(version)
+            return [offset] if offset >= 0 else []
+
+        match = re.search(pattern.format(version=re.escape(version)), content, re.MULTILINE)
+        return [match.start(1)] if match else []
+
+    def bump_version(self, new_version: str) -> bool:
+        """
+        Rewrite every reference to the canonical version as new_version.
+
+        Markdown references come from the scan's positional index and are
+        checked in place rather than searched for again. Primary files are
+        located within the same single read. Each file is read once and
+        replaced atomically with one write.
+
+        Files are decoded exactly as the scan decodes them, line endings
+        included, so the indexed offsets stay valid. Returns False if any
+        reference had to be skipped.
+        """
+        if not re.fullmatch(SEMVER, new_version.lstrip('v')):
+            print(f"❌ Not a semantic version: {new_version}")
+            return False
+        new_version = new_version.lstrip('v')
+
+        primary_versions = {info['version'] for info in self.versions.values()
+                            if info['type'] == 'primary' and isinstance(info['version'], str)}
+        if len(primary_versions) != 1:
+            print(f"❌ Cannot bump without one canonical version, found: {sorted(primary_versions) or 'none'}")
+            return False
+        old_version = primary_versions.pop()
+
+        print(f"🔁 Bumping {old_version} -> {new_version}")
+        start = time.perf_counter()
+        files_written = 0
+        replaced = 0
+        skipped = 0
+
+        for file_path, info in self.versions.items():
+            if info['type'] == 'primary' and info['version'] != old_version:
+                continue
+
+            path = Path(file_path)
+            content = path.read_bytes().decode('utf-8')
+            if info['type'] == 'primary':
+                offsets = self.locate_primary_version(file_path, content, old_version)
+            else:
+                offsets = [ref['offset'] for ref in info.get('references', []) if ref['version'] == old_version]
+
+            parts = []
+            last = 0
+            for offset in sorted(offsets):
+                if content[offset:offset + len(old_version)] != old_version:
+                    skipped += 1  # File changed since it was scanned
+                    continue
+                parts.extend([content[last:offset], new_version])
+                last = offset + len(old_version)
+
+            if not parts:
+                continue
+
+            parts.append(content[last:])
+            write_atomically(path, ''.join(parts))
+            files_written += 1
+            replaced += len(parts) // 2
+
+        elapsed = time.perf_counter() - start
+        print(f"   Rewrote {replaced} references in {files_written} files in {elapsed:.3f}s")
+        if skipped:
+            print(f"   ❌ Skipped {skipped} stale references; rerun the check to rescan changed files")
+            return False
+        return True
+
     def run_check(self) -> bool:
         """Run the complete version consistency check."""
         self.scan_repository()
@@ -345,7 +713,28 @@ class VersionChecker:
 
 def main():
     """Main execution function."""
-    checker = VersionChecker()
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Check version consistency across repository files")
+    parser.add_argument('--benchmark', type=int, nargs='?', const=2000, metavar='FILES',
+                        help='Benchmark markdown scanning on a synthetic docs tree and exit')
+    parser.add_argument('--jobs', type=int, default=1,
+                        help='Scan changed markdown files in a pool of this many processes (default: 1)')
+    parser.add_argument('--bump', metavar='VERSION',
+                        help='Rewrite every reference to the current version as VERSION and exit')
+    parser.add_argument('--no-cache', action='store_true',
+                        help=f'Ignore and do not update the reference cache ({DEFAULT_CACHE_PATH})')
+    args = parser.parse_args()
+
+    if args.benchmark:
+        benchmark_markdown_scan(args.benchmark)
+        return
+
+    checker = VersionChecker(jobs=max(1, args.jobs), cache_path=None if args.no_cache else DEFAULT_CACHE_PATH)
+
+    if args.bump:
+        checker.scan_repository()
+        sys.exit(0 if checker.bump_version(args.bump) else 1)
     
     try:
         consistent = checker.run_check()
@@ -5,42 +5,95 @@ Tracks execution times, success rates, and other workflow statistics.
 """
 
 import json
+import math
 import os
+import sqlite3
 import sys
 import requests
-from datetime import datetime, timedelta
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta, timezone
+from itertools import accumulate
+from pathlib import Path
 from typing import Dict, List, Any, Optional
+from github_api import DEFAULT_RATE, GitHubClient, LOW
 
+API_URL = os.environ.get('GITHUB_API_URL', 'https://api.github.com')
+GRAPHQL_URL = os.environ.get('GITHUB_GRAPHQL_URL', 'https://api.github.com/graphql')
 
-def get_github_headers() -> Dict[str, str]:
-    """Get GitHub API headers with authentication."""
+# Workflows fetched at once; each worker keeps its own pooled connection
+MAX_WORKERS = int(os.environ.get('METRICS_MAX_WORKERS', '6'))
+
+# Local run history, restored between CI runs so only new runs are fetched
+DEFAULT_DB_PATH = Path(os.environ.get('METRICS_DB', '.github/.cache/workflow-runs.sqlite'))
+
+# Workflow files are discovered here; their GitHub ids are cached across runs
+WORKFLOW_DIR = Path('.github/workflows')
+DEFAULT_ID_CACHE_PATH = Path('.github/.cache/workflow-ids.json')
+
+# Windows reported alongside the main period, in days
+DEFAULT_WINDOWS = [7, 30, 90]
+
+# Latency percentiles reported per workflow, job and step
+PERCENTILES = [50, 90, 95, 99]
+
+# A duration shift counts as a regression when the later runs are this much
+# slower on average and the shift is this many standard errors wide
+REGRESSION_THRESHOLD = float(os.environ.get('METRICS_REGRESSION_THRESHOLD', '0.2'))
+REGRESSION_MIN_SCORE = 3.0
+REGRESSION_MIN_RUNS = 5
+
+
+def utc_timestamp(moment: datetime) -> str:
+    """Format a datetime the way the GitHub API does, in UTC."""
+    if moment.tzinfo is None:
+        moment = moment.replace(tzinfo=timezone.utc)
+    return moment.astimezone(timezone.utc).strftime('%Y-%m-%dT%H:%M:%SZ')
+
+
+def create_client(max_workers: int = MAX_WORKERS) -> GitHubClient:
+    """
+    Create the API client shared by all fetches.
+
+    Its connection pool holds one keep-alive connection per worker, so
+    concurrent requests reuse connections, and it paces requests against
+    the rate limit for every thread at once, at GITHUB_API_RATE requests
+    per second.
+    """
     token = os.environ.get('GITHUB_TOKEN')
     if not token:
         print("Warning: No GITHUB_TOKEN provided, using unauthenticated requests")
-        return {'Accept': 'application/vnd.github.v3+json'}
-    
-    return {
-        'Accept': 'application/vnd.github.v3+json',
-        'Authorization': f'token {token}',
-        'User-Agent': 'AILIS-MetricsCollector/1.0'
-    }
+    return GitHubClient(token, pool_size=max_workers, rate=DEFAULT_RATE)
+
 
+def fetch_workflow_runs(repo: str, workflow_file: str, days: int = 30,
+                        client: Optional[GitHubClient] = None,
+                        since: Optional[str] = None) -> List[Dict[str, Any]]:
+    """
+    Fetch workflow runs created in the last ``days`` days, or from ``since``.
 
-def fetch_workflow_runs(repo: str, workflow_file: str, days: int = 30) -> List[Dict[str, Any]]:
-    """Fetch recent workflow runs from GitHub API."""
-    headers = get_github_headers()
-    since_date = (datetime.now() - timedelta(days=days)).isoformat()
+    ``workflow_file`` is a file name or workflow id. ``since`` is a UTC
+    timestamp; the runs created at that moment are included again so
+    nothing is lost between syncs. All pages are followed.
+    """
+    client = client or create_client(1)
+    since = since or utc_timestamp(datetime.now(timezone.utc) - timedelta(days=days))
     
-    url = f"https://api.github.com/repos/{repo}/actions/workflows/{workflow_file}/runs"
+    url = f"{API_URL}/repos/{repo}/actions/workflows/{workflow_file}/runs"
     params = {
         'per_page': 100,
-        'created': f'>{since_date}'
+        'created': f'>={since}'
     }
     
+    runs = []
     try:
-        response = requests.get(url, headers=headers, params=params, timeout=30)
-        response.raise_for_status()
-        return response.json().get('workflow_runs', [])
+        while url:
+            response = client.get(url, params=params, timeout=30)
+            response.raise_for_status()
+            runs.extend(response.json().get('workflow_runs', []))
+            # The next link already carries the query
+            url = response.links.get('next', {}).get('url')
+            params = None
+        return runs
     except requests.RequestException as e:
         if hasattr(e, 'response') and e.response is not None and e.response.status_code == 403 and 'rate limit' in str(e).lower():
             print(f"Rate limited. Consider using authenticated requests: {e}")
@@ -49,58 +102,649 @@ def fetch_workflow_runs(repo: str, workflow_file: str, days: int = 30) -> List[D
         return []
 
 
-def calculate_workflow_metrics(runs: List[Dict[str, Any]]) -> Dict[str, Any]:
-    """Calculate metrics from workflow runs."""
-    if not runs:
+def fetch_all_workflow_runs(repo: str, workflows: List[str], days: int = 30,
+                            max_workers: int = MAX_WORKERS,
+                            since: Optional[Dict[str, Optional[str]]] = None,
+                            ids: Optional[Dict[str, Dict[str, Any]]] = None) -> Dict[str, List[Dict[str, Any]]]:
+    """
+    Fetch runs for every workflow concurrently over one pooled client.
+
+    At most max_workers requests are in flight, so total time follows the
+    slowest workflow rather than the sum of all of them. ``since`` maps
+    workflows to the timestamp to resume from; workflows found in ``ids``
+    are addressed by id, the rest by file name.
+    """
+    since = since or {}
+    ids = ids or {}
+    max_workers = max(1, min(max_workers, len(workflows) or 1))
+    client = create_client(max_workers)
+    try:
+        with ThreadPoolExecutor(max_workers=max_workers) as pool:
+            results = pool.map(
+                lambda workflow: fetch_workflow_runs(
+                    repo, str(ids.get(workflow, {}).get('id', workflow)), days, client, since.get(workflow)
+                ),
+                workflows
+            )
+            return dict(zip(workflows, results))
+    finally:
+        client.close()
+
+
+def list_workflow_ids(repo: str, client: GitHubClient) -> Dict[str, Dict[str, Any]]:
+    """Map workflow file names to their REST id and GraphQL node id."""
+    url = f"{API_URL}/repos/{repo}/actions/workflows"
+    params = {'per_page': 100}
+    workflows = {}
+    while url:
+        response = client.get(url, params=params, timeout=30)
+        response.raise_for_status()
+        for workflow in response.json().get('workflows', []):
+            workflows[os.path.basename(workflow['path'])] = {'id': workflow['id'], 'node_id': workflow['node_id']}
+        url = response.links.get('next', {}).get('url')
+        params = None
+    return workflows
+
+
+def discover_workflows(workflow_dir: Path = WORKFLOW_DIR) -> List[str]:
+    """File names of every workflow in the repository, sorted."""
+    workflow_dir = Path(workflow_dir)
+    return sorted(p.name for p in list(workflow_dir.glob('*.yml')) + list(workflow_dir.glob('*.yaml')))
+
+
+def resolve_workflow_ids(repo: str, workflows: List[str], client: Optional[GitHubClient] = None,
+                         cache_path: Optional[Path] = DEFAULT_ID_CACHE_PATH) -> Dict[str, Dict[str, Any]]:
+    """
+    GitHub ids of the given workflow files, from the cache when possible.
+
+    The workflow listing is only requested when a file is missing from the
+    cache, such as a newly added workflow. Files GitHub does not know yet
+    are left out, and are then fetched by file name.
+    """
+    cache = {}
+    if cache_path is not None:
+        try:
+            cache = json.loads(Path(cache_path).read_text(encoding='utf-8')).get(repo, {})
+        except (OSError, ValueError):
+            cache = {}
+
+    if all(workflow in cache for workflow in workflows):
+        return {workflow: cache[workflow] for workflow in workflows}
+
+    own_client = client is None
+    client = client or create_client(1)
+    try:
+        cache = list_workflow_ids(repo, client)
+    except requests.RequestException as e:
+        print(f"Warning: Could not list workflows, fetching by file name: {e}")
+        return {workflow: cache[workflow] for workflow in workflows if workflow in cache}
+    finally:
+        if own_client:
+            client.close()
+
+    if cache_path is not None:
+        cache_path = Path(cache_path)
+        cache_path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = cache_path.with_suffix('.tmp')
+        tmp_path.write_text(json.dumps({repo: cache}, indent=2), encoding='utf-8')
+        tmp_path.replace(cache_path)
+    return {workflow: cache[workflow] for workflow in workflows if workflow in cache}
+
+
+def graphql_run(node: Dict[str, Any]) -> Dict[str, Any]:
+    """Shape a GraphQL WorkflowRun like a REST workflow run."""
+    suite = node.get('checkSuite') or {}
+    return {
+        'id': node['databaseId'],
+        'status': (suite.get('status') or '').lower() or None,
+        'conclusion': (suite.get('conclusion') or '').lower() or None,
+        'created_at': node['createdAt'],
+        'updated_at': node['updatedAt']
+    }
+
+
+def fetch_all_workflow_runs_graphql(repo: str, workflows: List[str], days: int = 30,
+                                    since: Optional[Dict[str, Optional[str]]] = None,
+                                    client: Optional[GitHubClient] = None,
+                                    ids: Optional[Dict[str, Dict[str, Any]]] = None) -> Dict[str, List[Dict[str, Any]]]:
+    """
+    Fetch runs for every workflow with batched GraphQL queries.
+
+    Each query asks for the next page of runs of every workflow that still
+    has runs newer than its cutoff, using one aliased field per workflow,
+    so a sync costs one request per page depth instead of one per page.
+    Workflows without a known id are fetched with REST by file name.
+    GraphQL has no run start time, so those runs keep any start time an
+    earlier REST sync stored.
+    """
+    since = since or {}
+    default_since = utc_timestamp(datetime.now(timezone.utc) - timedelta(days=days))
+    runs = {workflow: [] for workflow in workflows}
+    own_client = client is None
+    client = client or create_client(1)
+
+    try:
+        ids = ids if ids is not None else list_workflow_ids(repo, client)
+        active = {f'w{i}': workflow for i, workflow in enumerate(workflows) if workflow in ids}
+        cursors = {alias: None for alias in active}
+
+        while active:
+            declarations = ', '.join(f'$id_{alias}: ID!, $after_{alias}: String' for alias in active)
+            fields = '\n'.join(
+                f'{alias}: node(id: $id_{alias}) {{ ... on Workflow {{ '
+                f'runs(first: 100, after: $after_{alias}, orderBy: {{field: CREATED_AT, direction: DESC}}) {{ '
+                f'nodes {{ databaseId createdAt updatedAt checkSuite {{ status conclusion }} }} '
+                f'pageInfo {{ hasNextPage endCursor }} }} }} }}'
+                for alias in active
+            )
+            variables = {}
+            for alias, workflow in active.items():
+                variables[f'id_{alias}'] = ids[workflow]['node_id']
+                variables[f'after_{alias}'] = cursors[alias]
+            data = client.graphql(f'query({declarations}) {{\n{fields}\n}}', variables, GRAPHQL_URL)
+
+            for alias, workflow in list(active.items()):
+                connection = (data.get(alias) or {}).get('runs')
+                cutoff = since.get(workflow) or default_since
+                nodes = connection['nodes'] if connection else []
+                runs[workflow].extend(graphql_run(node) for node in nodes if node['createdAt'] >= cutoff)
+                # Runs come newest first, so a page ending before the cutoff is the last one needed
+                if not connection or not connection['pageInfo']['hasNextPage'] or (
+                        nodes and nodes[-1]['createdAt'] < cutoff):
+                    del active[alias]
+                else:
+                    cursors[alias] = connection['pageInfo']['endCursor']
+    except requests.RequestException as e:
+        print(f"Error fetching workflow runs with GraphQL: {e}")
+        return {workflow: [] for workflow in workflows}
+    finally:
+        if own_client:
+            client.close()
+
+    missing = [workflow for workflow in workflows if workflow not in ids]
+    if missing:
+        print(f"⚠️  No workflow id for {', '.join(missing)}; fetching by file name with REST")
+        runs.update(fetch_all_workflow_runs(repo, missing, days, since=since))
+    return runs
+
+
+class RunStore:
+    """
+    Workflow runs kept in a local SQLite database, keyed by run id.
+
+    Timestamps are stored as the API's UTC strings, which sort in time
+    order, so windows are plain indexed range queries.
+    """
+    def __init__(self, path=DEFAULT_DB_PATH):
+        if str(path) != ':memory:':
+            Path(path).parent.mkdir(parents=True, exist_ok=True)
+        self.conn = sqlite3.connect(str(path))
+        self.conn.executescript("""
+            CREATE TABLE IF NOT EXISTS runs (
+                id INTEGER PRIMARY KEY,
+                workflow TEXT NOT NULL,
+                status TEXT,
+                conclusion TEXT,
+                created_at TEXT NOT NULL,
+                updated_at TEXT,
+                duration_seconds REAL
+            );
+            CREATE INDEX IF NOT EXISTS runs_by_workflow ON runs (workflow, created_at);
+            CREATE TABLE IF NOT EXISTS jobs (
+                id INTEGER PRIMARY KEY,
+                run_id INTEGER NOT NULL,
+                workflow TEXT NOT NULL,
+                name TEXT NOT NULL,
+                conclusion TEXT,
+                created_at TEXT,
+                started_at TEXT,
+                completed_at TEXT
+            );
+            CREATE INDEX IF NOT EXISTS jobs_by_workflow ON jobs (workflow, created_at);
+            CREATE TABLE IF NOT EXISTS steps (
+                job_id INTEGER NOT NULL,
+                number INTEGER NOT NULL,
+                name TEXT NOT NULL,
+                conclusion TEXT,
+                started_at TEXT,
+                completed_at TEXT,
+                PRIMARY KEY (job_id, number)
+            );
+        """)
+        # Columns added after the first release of the store
+        columns = {row[1] for row in self.conn.execute("PRAGMA table_info(runs)")}
+        if 'run_started_at' not in columns:
+            self.conn.execute("ALTER TABLE runs ADD COLUMN run_started_at TEXT")
+        if 'jobs_synced' not in columns:
+            self.conn.execute("ALTER TABLE runs ADD COLUMN jobs_synced INTEGER NOT NULL DEFAULT 0")
+
+    def close(self):
+        self.conn.close()
+
+    def upsert(self, workflow: str, runs: List[Dict[str, Any]]) -> int:
+        """Insert or refresh runs; returns how many were written."""
+        rows = []
+        for run in runs:
+            duration = None
+            if run.get('status') == 'completed' and run.get('created_at') and run.get('updated_at'):
+                start = datetime.fromisoformat(run['created_at'].replace('Z', '+00:00'))
+                end = datetime.fromisoformat(run['updated_at'].replace('Z', '+00:00'))
+                duration = (end - start).total_seconds()
+            rows.append((run['id'], workflow, run.get('status'), run.get('conclusion'),
+                         run['created_at'], run.get('updated_at'), duration, run.get('run_started_at')))
+        with self.conn:
+            self.conn.executemany("""
+                INSERT INTO runs (id, workflow, status, conclusion, created_at, updated_at, duration_seconds,
+                                  run_started_at)
+                VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+                ON CONFLICT (id) DO UPDATE SET
+                    status = excluded.status, conclusion = excluded.conclusion,
+                    updated_at = excluded.updated_at, duration_seconds = excluded.duration_seconds,
+                    run_started_at = COALESCE(excluded.run_started_at, runs.run_started_at)
+            """, rows)
+        return len(rows)
+
+    def runs_without_jobs(self, workflow: str, since: str) -> List[int]:
+        """Completed runs created since ``since`` whose jobs have not been fetched."""
+        return [row[0] for row in self.conn.execute(
+            "SELECT id FROM runs WHERE workflow = ? AND created_at >= ? AND status = 'completed' "
+            "AND jobs_synced = 0", (workflow, since)
+        )]
+
+    def store_jobs(self, workflow: str, run_id: int, jobs: List[Dict[str, Any]]):
+        """Replace the jobs and steps of one run."""
+        with self.conn:
+            self.conn.executemany("""
+                INSERT OR REPLACE INTO jobs (id, run_id, workflow, name, conclusion, created_at, started_at,
+                                             completed_at)
+                VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+            """, [(job['id'], run_id, workflow, job['name'], job.get('conclusion'),
+                   job.get('created_at'), job.get('started_at'), job.get('completed_at')) for job in jobs])
+            self.conn.executemany("""
+                INSERT OR REPLACE INTO steps (job_id, number, name, conclusion, started_at, completed_at)
+                VALUES (?, ?, ?, ?, ?, ?)
+            """, [(job['id'], step['number'], step['name'], step.get('conclusion'),
+                   step.get('started_at'), step.get('completed_at'))
+                  for job in jobs for step in job.get('steps') or []])
+            self.conn.execute("UPDATE runs SET jobs_synced = 1 WHERE id = ?", (run_id,))
+
+    def high_water_mark(self, workflow: str) -> Optional[str]:
+        """
+        Timestamp to resume fetching from.
+
+        This is the newest stored run, or the oldest unfinished one so its
+        final status is picked up on the next sync.
+        """
+        pending = self.conn.execute(
+            "SELECT MIN(created_at) FROM runs WHERE workflow = ? AND status != 'completed'", (workflow,)
+        ).fetchone()[0]
+        if pending:
+            return pending
+        return self.conn.execute(
+            "SELECT MAX(created_at) FROM runs WHERE workflow = ?", (workflow,)
+        ).fetchone()[0]
+
+
+def sync_runs(store: RunStore, repo: str, workflows: List[str], days: int = 30,
+              max_workers: int = MAX_WORKERS, use_graphql: bool = False,
+              ids: Optional[Dict[str, Dict[str, Any]]] = None) -> Dict[str, int]:
+    """Fetch only runs newer than each workflow's high-water mark into the store."""
+    since = {workflow: store.high_water_mark(workflow) for workflow in workflows}
+    if use_graphql:
+        fetched = fetch_all_workflow_runs_graphql(repo, workflows, days, since, ids=ids)
+    else:
+        fetched = fetch_all_workflow_runs(repo, workflows, days, max_workers, since, ids)
+    return {workflow: store.upsert(workflow, runs) for workflow, runs in fetched.items()}
+
+
+def fetch_run_jobs(repo: str, run_id: int, client: GitHubClient) -> Optional[List[Dict[str, Any]]]:
+    """
+    Fetch every job of a run, with steps; None if the request failed.
+
+    Job timings are the first thing to give up when the rate limit runs low.
+    """
+    url = f"{API_URL}/repos/{repo}/actions/runs/{run_id}/jobs"
+    params = {'per_page': 100}
+    jobs = []
+    try:
+        while url:
+            response = client.get(url, params=params, timeout=30, priority=LOW)
+            response.raise_for_status()
+            jobs.extend(response.json().get('jobs', []))
+            url = response.links.get('next', {}).get('url')
+            params = None
+        return jobs
+    except requests.RequestException as e:
+        print(f"Error fetching jobs for run {run_id}: {e}")
+        return None
+
+
+def sync_jobs(store: RunStore, repo: str, workflows: List[str], days: int = 30,
+              max_workers: int = MAX_WORKERS) -> int:
+    """Fetch jobs for completed runs that do not have them yet; returns runs synced."""
+    since = utc_timestamp(datetime.now(timezone.utc) - timedelta(days=days))
+    pending = [(workflow, run_id) for workflow in workflows for run_id in store.runs_without_jobs(workflow, since)]
+    if not pending:
+        return 0
+
+    max_workers = max(1, min(max_workers, len(pending)))
+    client = create_client(max_workers)
+    synced = 0
+    try:
+        with ThreadPoolExecutor(max_workers=max_workers) as pool:
+            results = pool.map(lambda item: fetch_run_jobs(repo, item[1], client), pending)
+            for (workflow, run_id), jobs in zip(pending, results):
+                if jobs is not None:
+                    store.store_jobs(workflow, run_id, jobs)
+                    synced += 1
+    finally:
+        client.close()
+    return synced
+
+
+class StreamingQuantile:
+    """
+    Estimate one quantile of a stream in constant memory (the P² algorithm).
+
+    Five markers track the minimum, the quantile, the maximum and two points
+    between; their heights are adjusted with a parabolic fit as values
+    arrive. Exact while fewer than five values have been seen.
+    """
+    def __init__(self, q: float):
+        self.q = q
+        self.count = 0
+        self.heights = []
+        self.positions = [1, 2, 3, 4, 5]
+        self.desired = [1, 1 + 2 * q, 1 + 4 * q, 3 + 2 * q, 5]
+        self.increments = [0, q / 2, q, (1 + q) / 2, 1]
+
+    def add(self, value: float):
+        self.count += 1
+        heights = self.heights
+        if self.count <= 5:
+            heights.append(value)
+            heights.sort()
+            return
+
+        if value < heights[0]:
+            heights[0] = value
+            cell = 0
+        elif value >= heights[4]:
+            heights[4] = value
+            cell = 3
+        else:
+            cell = next(i for i in range(4) if heights[i] <= value < heights[i + 1])
+
+        for i in range(cell + 1, 5):
+            self.positions[i] += 1
+        for i in range(5):
+            self.desired[i] += self.increments[i]
+
+        n = self.positions
+        for i in (1, 2, 3):
+            d = self.desired[i] - n[i]
+            if (d >= 1 and n[i + 1] - n[i] > 1) or (d <= -1 and n[i - 1] - n[i] < -1):
+                d = 1 if d > 0 else -1
+                height = heights[i] + d / (n[i + 1] - n[i - 1]) * (
+                    (n[i] - n[i - 1] + d) * (heights[i + 1] - heights[i]) / (n[i + 1] - n[i])
+                    + (n[i + 1] - n[i] - d) * (heights[i] - heights[i - 1]) / (n[i] - n[i - 1])
+                )
+                if not heights[i - 1] < height < heights[i + 1]:
+                    height = heights[i] + d * (heights[i + d] - heights[i]) / (n[i + d] - n[i])
+                heights[i] = height
+                n[i] += d
+
+    def value(self) -> Optional[float]:
+        if not self.heights:
+            return None
+        if self.count > 5:
+            return self.heights[2]
+        # Linear interpolation between the closest ranks
+        rank = self.q * (len(self.heights) - 1)
+        low = int(rank)
+        high = min(low + 1, len(self.heights) - 1)
+        return self.heights[low] + (self.heights[high] - self.heights[low]) * (rank - low)
+
+
+class LatencySummary:
+    """Count and streaming percentiles of durations in seconds."""
+    def __init__(self, percentiles: List[int] = PERCENTILES):
+        self.count = 0
+        self.estimators = {p: StreamingQuantile(p / 100) for p in percentiles}
+
+    def add(self, seconds: Optional[float]):
+        if seconds is None or seconds < 0:
+            return
+        self.count += 1
+        for estimator in self.estimators.values():
+            estimator.add(seconds)
+
+    def summary(self) -> Dict[str, Any]:
+        result = {'count': self.count}
+        for p, estimator in self.estimators.items():
+            value = estimator.value()
+            result[f'p{p}_seconds'] = round(value, 1) if value is not None else None
+        return result
+
+
+def calculate_latency(store: RunStore, workflow: str, days: int = 30,
+                      now: Optional[datetime] = None) -> Dict[str, Any]:
+    """
+    Queue and execution time percentiles for a workflow, its jobs and steps.
+
+    Queue time runs from creation to start, execution time from start to
+    completion. Rows are streamed from SQLite into fixed-size estimators,
+    so memory does not grow with the number of runs.
+    """
+    start = utc_timestamp((now or datetime.now(timezone.utc)) - timedelta(days=days))
+    seconds = "(julianday({end}) - julianday({begin})) * 86400"
+
+    run = {'queue': LatencySummary(), 'execution': LatencySummary(), 'total': LatencySummary()}
+    for queue, execution, total in store.conn.execute(f"""
+        SELECT {seconds.format(begin='created_at', end='run_started_at')},
+               {seconds.format(begin='run_started_at', end='updated_at')},
+               duration_seconds
+        FROM runs WHERE workflow = ? AND created_at >= ? AND status = 'completed'
+    """, (workflow, start)):
+        run['queue'].add(queue)
+        run['execution'].add(execution)
+        run['total'].add(total)
+
+    jobs = {}
+    for name, queue, execution in store.conn.execute(f"""
+        SELECT name, {seconds.format(begin='created_at', end='started_at')},
+               {seconds.format(begin='started_at', end='completed_at')}
+        FROM jobs WHERE workflow = ? AND created_at >= ?
+    """, (workflow, start)):
+        job = jobs.setdefault(name, {'queue': LatencySummary(), 'execution': LatencySummary(), 'steps': {}})
+        job['queue'].add(queue)
+        job['execution'].add(execution)
+
+    for job_name, step_name, execution in store.conn.execute(f"""
+        SELECT jobs.name, steps.name, {seconds.format(begin='steps.started_at', end='steps.completed_at')}
+        FROM steps JOIN jobs ON jobs.id = steps.job_id
+        WHERE jobs.workflow = ? AND jobs.created_at >= ?
+    """, (workflow, start)):
+        if job_name in jobs:
+            jobs[job_name]['steps'].setdefault(step_name, LatencySummary()).add(execution)
+
+    return {
+        **{kind: summary.summary() for kind, summary in run.items()},
+        'jobs': {
+            name: {
+                'queue': job['queue'].summary(),
+                'execution': job['execution'].summary(),
+                'steps': {step: summary.summary() for step, summary in job['steps'].items()}
+            }
+            for name, job in jobs.items()
+        }
+    }
+
+
+def duration_series(store: RunStore, workflow: str, days: int = 90,
+                    now: Optional[datetime] = None) -> Dict[Optional[str], List[tuple]]:
+    """
+    Durations of successful runs and jobs in time order.
+
+    Keys are job names, with None for the workflow as a whole; values are
+    (created_at, run_id, seconds) tuples. Failed runs are left out since
+    they often stop early.
+    """
+    start = utc_timestamp((now or datetime.now(timezone.utc)) - timedelta(days=days))
+    series = {None: list(store.conn.execute("""
+        SELECT created_at, id, duration_seconds FROM runs
+        WHERE workflow = ? AND created_at >= ? AND conclusion = 'success' AND duration_seconds IS NOT NULL
+        ORDER BY created_at, id
+    """, (workflow, start)))}
+    for name, created_at, run_id, seconds in store.conn.execute("""
+        SELECT name, created_at, run_id, (julianday(completed_at) - julianday(started_at)) * 86400
+        FROM jobs
+        WHERE workflow = ? AND created_at >= ? AND conclusion = 'success' AND completed_at IS NOT NULL
+        ORDER BY created_at, run_id
+    """, (workflow, start)):
+        series.setdefault(name, []).append((created_at, run_id, seconds))
+    return series
+
+
+def find_change_point(values: List[float], min_runs: int = REGRESSION_MIN_RUNS) -> Optional[Dict[str, Any]]:
+    """
+    Best single split of a series into two segments with different means.
+
+    Prefix sums of values and squares give every split's segment means and
+    variances in one pass, so the whole history is scanned in O(n). Returns
+    the split with the largest shift in standard errors, or None.
+    """
+    n = len(values)
+    if n < 2 * min_runs:
+        return None
+
+    sums = list(accumulate(values, initial=0.0))
+    squares = list(accumulate((v * v for v in values), initial=0.0))
+
+    best = None
+    for split in range(min_runs, n - min_runs + 1):
+        before_n, after_n = split, n - split
+        before_mean = sums[split] / before_n
+        after_mean = (sums[n] - sums[split]) / after_n
+        before_var = max(squares[split] / before_n - before_mean ** 2, 0.0)
+        after_var = max((squares[n] - squares[split]) / after_n - after_mean ** 2, 0.0)
+        error = math.sqrt(before_var / before_n + after_var / after_n)
+        # Identical constant segments would divide by zero; any shift is then decisive
+        score = abs(after_mean - before_mean) / error if error else (math.inf if after_mean != before_mean else 0.0)
+        if best is None or score > best['score']:
+            best = {'index': split, 'before': before_mean, 'after': after_mean, 'score': score}
+    return best
+
+
+def detect_regressions(store: RunStore, workflows: List[str], days: int = 90,
+                       threshold: float = REGRESSION_THRESHOLD,
+                       now: Optional[datetime] = None) -> List[Dict[str, Any]]:
+    """
+    Workflows and jobs whose recent runs got slower, and since which run.
+
+    A regression is a change point after which the mean duration is at
+    least ``threshold`` higher and the shift is significant. Works entirely
+    from the local run store.
+    """
+    regressions = []
+    for workflow in workflows:
+        for job, points in duration_series(store, workflow, days, now).items():
+            change = find_change_point([seconds for _, _, seconds in points])
+            if not change or change['score'] < REGRESSION_MIN_SCORE or change['before'] <= 0:
+                continue
+            increase = change['after'] / change['before'] - 1
+            if increase < threshold:
+                continue
+            since, run_id, _ = points[change['index']]
+            regressions.append({
+                'workflow': workflow,
+                'job': job,
+                'since': since,
+                'run_id': run_id,
+                'runs_since': len(points) - change['index'],
+                'before_minutes': round(change['before'] / 60, 2),
+                'after_minutes': round(change['after'] / 60, 2),
+                'change_percent': round(increase * 100, 1)
+            })
+    return sorted(regressions, key=lambda r: -r['change_percent'])
+
+
+def calculate_workflow_metrics(store: RunStore, workflow: str, days: int = 30,
+                               now: Optional[datetime] = None) -> Dict[str, Any]:
+    """Calculate metrics for the runs of one workflow created in the last ``days`` days."""
+    start = utc_timestamp((now or datetime.now(timezone.utc)) - timedelta(days=days))
+    total_runs, successful_runs, avg_seconds = store.conn.execute("""
+        SELECT COUNT(*), COALESCE(SUM(conclusion = 'success'), 0), AVG(duration_seconds)
+        FROM runs WHERE workflow = ? AND created_at >= ?
+    """, (workflow, start)).fetchone()
+
+    if not total_runs:
         return {
             'total_runs': 0,
+            'successful_runs': 0,
+            'failed_runs': 0,
             'success_rate': 0,
             'avg_duration_minutes': 0,
             'latest_status': 'unknown'
         }
-    
-    total_runs = len(runs)
-    successful_runs = len([r for r in runs if r['conclusion'] == 'success'])
-    success_rate = (successful_runs / total_runs) * 100
-    
-    # Calculate average duration for completed runs
-    durations = []
-    for run in runs:
-        if run['status'] == 'completed' and run['created_at'] and run['updated_at']:
-            start = datetime.fromisoformat(run['created_at'].replace('Z', '+00:00'))
-            end = datetime.fromisoformat(run['updated_at'].replace('Z', '+00:00'))
-            duration = (end - start).total_seconds() / 60  # Convert to minutes
-            durations.append(duration)
-    
-    avg_duration = sum(durations) / len(durations) if durations else 0
-    
+
+    latest_status, latest_run_date = store.conn.execute("""
+        SELECT conclusion, created_at FROM runs WHERE workflow = ? AND created_at >= ?
+        ORDER BY created_at DESC, id DESC LIMIT 1
+    """, (workflow, start)).fetchone()
+
     return {
         'total_runs': total_runs,
         'successful_runs': successful_runs,
         'failed_runs': total_runs - successful_runs,
-        'success_rate': round(success_rate, 1),
-        'avg_duration_minutes': round(avg_duration, 2),
-        'latest_status': runs[0]['conclusion'] if runs else 'unknown',
-        'latest_run_date': runs[0]['created_at'] if runs else None
+        'success_rate': round(successful_runs / total_runs * 100, 1),
+        'avg_duration_minutes': round((avg_seconds or 0) / 60, 2),
+        'latest_status': latest_status,
+        'latest_run_date': latest_run_date
     }
 
 
-def generate_metrics_report(repo: str, workflows: List[str], output_file: str = 'workflow-metrics.json'):
+def generate_metrics_report(repo: str, workflows: List[str], output_file: str = 'workflow-metrics.json',
+                            max_workers: int = MAX_WORKERS, store: Optional[RunStore] = None,
+                            period_days: int = 30, windows: Optional[List[int]] = None,
+                            offline: bool = False, use_graphql: bool = False):
     """Generate comprehensive metrics report for all workflows."""
     print("📊 Collecting workflow metrics...")
+    windows = DEFAULT_WINDOWS if windows is None else windows
     
     all_metrics = {
         'generated_at': datetime.now().isoformat(),
         'repository': repo,
-        'period_days': 30,
+        'period_days': period_days,
         'workflows': {}
     }
     
-    for workflow in workflows:
-        print(f"  Analyzing {workflow}...")
-        runs = fetch_workflow_runs(repo, workflow)
-        metrics = calculate_workflow_metrics(runs)
-        all_metrics['workflows'][workflow] = metrics
+    own_store = store is None
+    store = store or RunStore()
+    try:
+        if offline:
+            print("  Offline: reporting from the local run store only")
+            synced = {workflow: 0 for workflow in workflows}
+        else:
+            if use_graphql:
+                print(f"  Syncing {len(workflows)} workflows with batched GraphQL queries...")
+            else:
+                print(f"  Syncing {len(workflows)} workflows with up to {max_workers} concurrent requests...")
+            ids = resolve_workflow_ids(repo, workflows)
+            synced = sync_runs(store, repo, workflows, max(windows + [period_days]), max_workers, use_graphql, ids)
+            print(f"  Fetched job timings for {sync_jobs(store, repo, workflows, period_days, max_workers)} runs")
+        for workflow in workflows:
+            print(f"  Analyzing {workflow} ({synced[workflow]} runs fetched)...")
+            metrics = calculate_workflow_metrics(store, workflow, period_days)
+            metrics['windows'] = {
+                str(days): calculate_workflow_metrics(store, workflow, days) for days in windows
+            }
+            metrics['latency'] = calculate_latency(store, workflow, period_days)
+            all_metrics['workflows'][workflow] = metrics
+        all_metrics['regressions'] = detect_regressions(store, workflows, max(windows + [period_days]))
+    finally:
+        if own_store:
+            store.close()
     
     # Calculate overall statistics
     total_runs = sum(w['total_runs'] for w in all_metrics['workflows'].values())
@@ -142,8 +786,22 @@ def print_metrics_summary(metrics: Dict[str, Any]):
         status_emoji = "✅" if data['latest_status'] == 'success' else "❌" if data['latest_status'] == 'failure' else "⚠️"
         print(f"{status_emoji} {workflow_name}")
         print(f"   Runs: {data['total_runs']} | Success Rate: {data['success_rate']}% | Avg Duration: {data['avg_duration_minutes']}min")
+        latency = data.get('latency')
+        if latency and latency['total']['count']:
+            print(f"   p50/p95: {latency['total']['p50_seconds']}s/{latency['total']['p95_seconds']}s | "
+                  f"Queue p95: {latency['queue']['p95_seconds']}s | Execution p95: {latency['execution']['p95_seconds']}s")
     
     print()
+    
+    regressions = metrics.get('regressions') or []
+    if regressions:
+        print("🐢 Duration Regressions:")
+        print("-" * 30)
+        for regression in regressions:
+            target = regression['workflow'] + (f" / {regression['job']}" if regression['job'] else '')
+            print(f"⚠️ {target}: {regression['before_minutes']}min -> {regression['after_minutes']}min "
+                  f"(+{regression['change_percent']}%) since run {regression['run_id']} ({regression['since']})")
+        print()
 
 
 def main():
@@ -153,18 +811,19 @@ def main():
         print("Error: GITHUB_REPOSITORY environment variable not set")
         sys.exit(1)
     
-    # Define workflows to track
-    workflows = [
-        'link-validation.yml',
-        'markdown-lint.yml', 
-        'spell-check.yml',
-        'accessibility-check.yml',
-        'proposal-lifecycle.yml',
-        'discussion-notifications.yml'
-    ]
+    # Track every workflow in the repository unless a subset is requested
+    selected = os.environ.get('METRICS_WORKFLOWS', '')
+    workflows = [w.strip() for w in selected.split(',') if w.strip()] or discover_workflows()
+    if not workflows:
+        print(f"Error: No workflows found in {WORKFLOW_DIR}")
+        sys.exit(1)
     
     # Generate metrics report
-    metrics = generate_metrics_report(repo, workflows)
+    period_days = int(os.environ.get('METRICS_PERIOD_DAYS') or 30)
+    offline = os.environ.get('METRICS_OFFLINE', '').lower() in ('1', 'true', 'yes')
+    use_graphql = os.environ.get('METRICS_API', 'rest').lower() == 'graphql'
+    metrics = generate_metrics_report(repo, workflows, period_days=period_days, offline=offline,
+                                      use_graphql=use_graphql)
     
     # Print summary
     print_metrics_summary(metrics)
@@ -174,6 +833,7 @@ def main():
         with open(os.environ.get('GITHUB_OUTPUT', '/dev/null'), 'a') as f:
             f.write(f"overall_success_rate={metrics['summary']['overall_success_rate']}\n")
             f.write(f"total_runs={metrics['summary']['total_runs_all_workflows']}\n")
+            f.write(f"regressions={len(metrics['regressions'])}\n")
 
 
 if __name__ == '__main__':
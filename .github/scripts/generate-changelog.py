@@ -14,10 +14,357 @@ from pathlib import Path
 from typing import Dict, List, Optional, Tuple
 import subprocess
 
+from github_api import DEFAULT_RATE, GitHubClient
+
+
+DEFAULT_CACHE_DIR = Path(os.getenv('CHANGELOG_CACHE_DIR', '.github/.cache'))
+VERSION_TAG_PATTERN = re.compile(r'^v?(\d+)\.(\d+)\.(\d+)$')
+PR_REFERENCE_PATTERN = re.compile(r'\(#(\d+)\)\s*$|^Merge pull request #(\d+)')
+OTHER_CATEGORY = '🔄 Other Changes'
+
+
+def version_key(name: str) -> Tuple[int, Tuple[int, ...]]:
+    """Sort key for release names; unversioned names such as Unreleased sort last."""
+    match = VERSION_TAG_PATTERN.match(name)
+    return (1, tuple(int(part) for part in match.groups())) if match else (2, ())
+
+
+def sorted_versions(releases: Dict[str, Dict]) -> List[str]:
+    """Release keys newest first, with unversioned keys such as Unreleased on top."""
+    return sorted(releases, key=version_key, reverse=True)
+
+
+class PullRequestFetcher:
+    """
+    Fetch merged pull requests page by page with conditional requests.
+
+    Pages are followed through the ``Link`` header. Each page's ETag and a
+    trimmed copy of its pull requests are persisted on disk, so a page that
+    has not changed since the last run is answered with ``304 Not Modified``,
+    which GitHub does not count against the rate limit. Requests go through
+    a GitHubClient, which paces them and retries when a limit is hit.
+    """
+
+    def __init__(self, repo_owner: str, repo_name: str, token: Optional[str] = None,
+                 api_url: Optional[str] = None, cache_path: Optional[Path] = None,
+                 per_page: int = 100, session: Optional[GitHubClient] = None):
+        self.api_url = (api_url or os.getenv('GITHUB_API_URL', 'https://api.github.com')).rstrip('/')
+        self.repo_owner = repo_owner
+        self.repo_name = repo_name
+        self.per_page = per_page
+        self.cache_path = cache_path or DEFAULT_CACHE_DIR / 'pull-requests.json'
+        self.session = session or GitHubClient(rate=DEFAULT_RATE)
+        self.headers = {'Accept': 'application/vnd.github.v3+json'}
+        if token:
+            self.headers['Authorization'] = f'token {token}'
+        self.cache = self.load_cache()
+        self.stats = {'pages': 0, 'not_modified': 0}
+
+    def load_cache(self) -> Dict[str, Dict]:
+        """Load the ETag cache, starting empty if it is missing or corrupt."""
+        try:
+            return json.loads(self.cache_path.read_text(encoding='utf-8'))
+        except (OSError, ValueError):
+            return {}
+
+    def save_cache(self):
+        """Persist the ETag cache atomically."""
+        self.cache_path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = self.cache_path.with_suffix('.tmp')
+        tmp_path.write_text(json.dumps(self.cache), encoding='utf-8')
+        tmp_path.replace(self.cache_path)
+
+    def first_page_url(self) -> str:
+        """Build the URL of the first page of closed pull requests."""
+        url = f"{self.api_url}/repos/{self.repo_owner}/{self.repo_name}/pulls"
+        params = {
+            'state': 'closed',
+            'sort': 'updated',
+            'direction': 'desc',
+            'per_page': self.per_page
+        }
+        return requests.Request('GET', url, params=params).prepare().url
+
+    @staticmethod
+    def slim_pr(pr: Dict) -> Dict:
+        """Keep only the pull request fields the changelog needs."""
+        return {
+            'number': pr['number'],
+            'title': pr['title'],
+            'author': (pr.get('user') or {}).get('login', 'ghost'),
+            'merged_at': pr.get('merged_at'),
+            'updated_at': pr.get('updated_at'),
+            'body': pr.get('body') or '',
+            'url': pr['html_url'],
+            'merge_commit_sha': pr.get('merge_commit_sha')
+        }
+
+    def get_page(self, url: str) -> Tuple[List[Dict], Optional[str]]:
+        """Fetch one page, returning its pull requests and the next page URL."""
+        headers = dict(self.headers)
+        cached = self.cache.get(url)
+        if cached and cached.get('etag'):
+            headers['If-None-Match'] = cached['etag']
+
+        response = self.session.get(url, headers=headers, timeout=30)
+        self.stats['pages'] += 1
+
+        if response.status_code == 304 and cached:
+            self.stats['not_modified'] += 1
+            return cached['items'], cached.get('next')
+
+        response.raise_for_status()
+        items = [self.slim_pr(pr) for pr in response.json()]
+        next_url = response.links.get('next', {}).get('url')
+
+        etag = response.headers.get('ETag')
+        if etag:
+            self.cache[url] = {'etag': etag, 'items': items, 'next': next_url}
+        else:
+            self.cache.pop(url, None)
+
+        return items, next_url
+
+    def fetch_merged(self, since_date: Optional[str] = None) -> List[Dict]:
+        """
+        Fetch pull requests merged on or after ``since_date`` (YYYY-MM-DD).
+
+        Results are ordered by ``updated_at`` descending and a pull request is
+        never updated before it is merged, so once a page ends with an update
+        older than ``since_date`` every remaining ``merged_at`` is older too
+        and pagination stops.
+        """
+        merged = []
+        url = self.first_page_url()
+
+        try:
+            while url:
+                items, url = self.get_page(url)
+
+                for pr in items:
+                    if pr['merged_at'] and (not since_date or pr['merged_at'][:10] >= since_date):
+                        merged.append(pr)
+
+                if since_date and items and (items[-1]['updated_at'] or '')[:10] < since_date:
+                    break
+        finally:
+            self.save_cache()
+
+        return merged
+
+
+class GraphQLPullRequestFetcher:
+    """
+    Fetch merged pull requests and their merge commits through GraphQL.
+
+    One query returns a page of 100 pull requests with everything the
+    changelog needs, merge commit included, and pages are followed by
+    cursor. Stops early on ``since_date`` like PullRequestFetcher.
+    """
+
+    QUERY = """
+    query($owner: String!, $name: String!, $first: Int!, $after: String) {
+      repository(owner: $owner, name: $name) {
+        pullRequests(states: MERGED, first: $first, after: $after,
+                     orderBy: {field: UPDATED_AT, direction: DESC}) {
+          nodes {
+            number title body url mergedAt updatedAt
+            author { login }
+            mergeCommit { oid }
+          }
+          pageInfo { hasNextPage endCursor }
+        }
+      }
+    }
+    """
+
+    def __init__(self, repo_owner: str, repo_name: str, token: Optional[str] = None,
+                 graphql_url: Optional[str] = None, per_page: int = 100,
+                 session: Optional[GitHubClient] = None):
+        self.repo_owner = repo_owner
+        self.repo_name = repo_name
+        self.graphql_url = graphql_url
+        self.per_page = per_page
+        self.session = session or GitHubClient(token, rate=DEFAULT_RATE)
+        self.stats = {'pages': 0, 'not_modified': 0}
+
+    @staticmethod
+    def slim_pr(node: Dict) -> Dict:
+        """Shape a pull request node like PullRequestFetcher.slim_pr."""
+        return {
+            'number': node['number'],
+            'title': node['title'],
+            'author': (node.get('author') or {}).get('login', 'ghost'),
+            'merged_at': node.get('mergedAt'),
+            'updated_at': node.get('updatedAt'),
+            'body': node.get('body') or '',
+            'url': node['url'],
+            'merge_commit_sha': (node.get('mergeCommit') or {}).get('oid')
+        }
+
+    def fetch_merged(self, since_date: Optional[str] = None) -> List[Dict]:
+        """Fetch pull requests merged on or after ``since_date`` (YYYY-MM-DD)."""
+        merged = []
+        variables = {'owner': self.repo_owner, 'name': self.repo_name, 'first': self.per_page, 'after': None}
+
+        while True:
+            data = self.session.graphql(self.QUERY, variables, self.graphql_url)
+            self.stats['pages'] += 1
+            connection = data['repository']['pullRequests']
+            items = [self.slim_pr(node) for node in connection['nodes']]
+
+            merged.extend(pr for pr in items
+                          if pr['merged_at'] and (not since_date or pr['merged_at'][:10] >= since_date))
+
+            if since_date and items and (items[-1]['updated_at'] or '')[:10] < since_date:
+                break
+            if not connection['pageInfo']['hasNextPage']:
+                break
+            variables['after'] = connection['pageInfo']['endCursor']
+
+        return merged
+
+
+class ChangelogState:
+    """
+    Structured record of what has been written to the changelog.
+
+    Stores the last processed commit (the watermark) and the categorized
+    entries of every release, so later runs only ingest newer commits and
+    pull requests and can re-render a release section in full. It is
+    written together with CHANGELOG.md and doubles as a queryable store:
+    indexes by SHA, author and category are built when it is loaded.
+    """
+
+    path = Path(os.getenv('CHANGELOG_STATE', '.changelog-state.json'))
+
+    def __init__(self, last_sha: Optional[str] = None, releases: Optional[Dict[str, Dict]] = None):
+        self.last_sha = last_sha
+        self.releases = releases or {}
+        self.build_index()
+
+    @classmethod
+    def load(cls) -> 'ChangelogState':
+        """Load saved state, starting empty if it is missing or corrupt."""
+        try:
+            data = json.loads(cls.path.read_text(encoding='utf-8'))
+            return cls(data.get('last_sha'), data.get('releases'))
+        except (OSError, ValueError):
+            return cls()
+
+    def save(self):
+        """Write the state next to the changelog."""
+        data = {'last_sha': self.last_sha, 'releases': self.releases}
+        self.path.write_text(json.dumps(data, indent=2, ensure_ascii=False) + '\n', encoding='utf-8')
+
+    def build_index(self):
+        """
+        Index every recorded change by SHA, author and category.
+
+        Releases are visited oldest first, so the SHA index maps a commit to
+        the first release that contained it.
+        """
+        self.by_sha = {}
+        self.by_author = {}
+        self.by_category = {}
+
+        for version in reversed(sorted_versions(self.releases)):
+            for category, changes in self.releases[version]['categories'].items():
+                for change in changes:
+                    ref = (version, category, change)
+                    if 'sha' in change:
+                        self.by_sha.setdefault(change['sha'], version)
+                    self.by_author.setdefault(change['author'], []).append(ref)
+                    self.by_category.setdefault(category, []).append(ref)
+
+    def first_release(self, sha: str) -> Optional[str]:
+        """Version of the first release containing a commit (full or short SHA)."""
+        return self.by_sha.get(sha[:7])
+
+    def find_changes(self, category: Optional[str] = None, author: Optional[str] = None,
+                     since: Optional[str] = None) -> List[Tuple[str, str, Dict]]:
+        """Changes matching every given filter, as (version, category, change), oldest first."""
+        if author is not None:
+            refs = self.by_author.get(author, [])
+        elif category is not None:
+            refs = self.by_category.get(category, [])
+        else:
+            refs = [ref for refs in self.by_category.values() for ref in refs]
+            refs.sort(key=lambda ref: version_key(ref[0]))
+
+        since_key = None
+        if since:
+            since_key = version_key('.'.join((since.lstrip('v').split('.') + ['0', '0'])[:3]))
+
+        return [
+            (version, ref_category, change) for version, ref_category, change in refs
+            if (category is None or ref_category == category)
+            and (since_key is None or version_key(version) > since_key)
+        ]
+
+    def seen_keys(self) -> set:
+        """Keys of every commit and pull request already recorded."""
+        seen = set()
+        for release in self.releases.values():
+            for changes in release['categories'].values():
+                for change in changes:
+                    if change['type'] == 'pr':
+                        seen.add(('pr', change['number']))
+                    if 'sha' in change:
+                        seen.add(('commit', change['sha']))
+        return seen
+
+    def join_recorded_prs(self, commits: List[Dict], prs: List[Dict]) -> Tuple[List[Dict], bool]:
+        """
+        Fold commits of pull requests recorded by earlier runs into those entries.
+
+        A commit matches on a fetched PR's merge commit SHA or on a PR
+        reference in its message, as in categorize_changes. The recorded PR
+        keeps the SHA of the first matching commit. Returns the commits left
+        over and whether any entry changed.
+        """
+        recorded = {}
+        for release in self.releases.values():
+            for changes in release['categories'].values():
+                for change in changes:
+                    if change['type'] == 'pr':
+                        recorded[change['number']] = change
+        merged = {pr['merge_commit_sha']: pr['number'] for pr in prs if pr.get('merge_commit_sha')}
+
+        remaining = []
+        changed = False
+        for commit in commits:
+            number = merged.get(commit['sha']) or ChangelogGenerator.referenced_pr(commit['message'])
+            change = recorded.get(number)
+            if change is None:
+                remaining.append(commit)
+            elif 'sha' not in change:
+                change['sha'] = commit['sha'][:7]
+                changed = True
+        return remaining, changed
+
+    @staticmethod
+    def head_sha() -> Optional[str]:
+        """Current HEAD commit, or None outside a git checkout."""
+        try:
+            result = subprocess.run(['git', 'rev-parse', 'HEAD'],
+                                    capture_output=True, text=True, check=True)
+            return result.stdout.strip()
+        except (OSError, subprocess.CalledProcessError):
+            return None
+
+    @staticmethod
+    def is_ancestor(sha: str) -> bool:
+        """Whether sha is still part of HEAD's history (survives force pushes)."""
+        result = subprocess.run(['git', 'merge-base', '--is-ancestor', sha, 'HEAD'],
+                                capture_output=True)
+        return result.returncode == 0
+
 
 class ChangelogGenerator:
-    def __init__(self, github_token: Optional[str] = None):
+    def __init__(self, github_token: Optional[str] = None, use_graphql: bool = False):
         self.github_token = github_token
+        self.use_graphql = use_graphql
         self.repo_owner = "DollhouseMCP"
         self.repo_name = "AILIS"
         
@@ -35,13 +382,19 @@ class ChangelogGenerator:
             'chore': {'label': '🔧 Maintenance', 'order': 10},
             'revert': {'label': '⏪ Reverts', 'order': 11}
         }
+        self.category_order = {v['label']: v['order'] for v in self.commit_types.values()}
         
-    def get_git_commits(self, since_tag: Optional[str] = None) -> List[Dict]:
-        """Get commits from git history."""
+    def get_git_commits(self, since_tag: Optional[str] = None,
+                        exclude: Optional[List[str]] = None) -> List[Dict]:
+        """Get commits reachable from HEAD but not from since_tag or any exclude ref."""
         cmd = ['git', 'log', '--oneline', '--pretty=format:%H|%s|%an|%ad', '--date=short']
         
         if since_tag:
             cmd.append(f'{since_tag}..HEAD')
+        else:
+            cmd.append('HEAD')
+        for ref in exclude or []:
+            cmd.append(f'^{ref}')
             
         try:
             result = subprocess.run(cmd, capture_output=True, text=True, check=True)
@@ -67,47 +420,29 @@ class ChangelogGenerator:
         if not self.github_token:
             print("Warning: No GitHub token provided, skipping PR information")
             return []
-            
-        url = f"https://api.github.com/repos/{self.repo_owner}/{self.repo_name}/pulls"
-        params = {
-            'state': 'closed',
-            'sort': 'updated',
-            'direction': 'desc',
-            'per_page': 100
-        }
-        
-        headers = {
-            'Authorization': f'token {self.github_token}',
-            'Accept': 'application/vnd.github.v3+json'
-        }
-        
+
+        fetcher_class = GraphQLPullRequestFetcher if self.use_graphql else PullRequestFetcher
+        fetcher = fetcher_class(self.repo_owner, self.repo_name, self.github_token)
+
         try:
-            response = requests.get(url, headers=headers, params=params, timeout=30)
-            response.raise_for_status()
-            
-            prs = response.json()
-            merged_prs = []
-            
-            for pr in prs:
-                if pr.get('merged_at'):
-                    # Convert merged_at to date for comparison
-                    merged_date = pr['merged_at'][:10]  # YYYY-MM-DD
-                    
-                    if not since_date or merged_date >= since_date:
-                        merged_prs.append({
-                            'number': pr['number'],
-                            'title': pr['title'],
-                            'author': pr['user']['login'],
-                            'merged_at': merged_date,
-                            'body': pr.get('body', ''),
-                            'url': pr['html_url']
-                        })
-                        
-            return merged_prs
+            prs = fetcher.fetch_merged(since_date)
         except requests.RequestException as e:
             print(f"Warning: Could not fetch PRs: {e}")
             return []
-            
+
+        print(f"   PR pages: {fetcher.stats['pages']} "
+              f"({fetcher.stats['not_modified']} unchanged, served from cache)")
+
+        return [{
+            'number': pr['number'],
+            'title': pr['title'],
+            'author': pr['author'],
+            'merged_at': pr['merged_at'][:10],  # YYYY-MM-DD
+            'body': pr.get('body') or '',
+            'url': pr['url'],
+            'merge_commit_sha': pr.get('merge_commit_sha')
+        } for pr in prs]
+
     def parse_conventional_commit(self, message: str) -> Tuple[Optional[str], str, str]:
         """Parse conventional commit message."""
         # Pattern: type(scope): description
@@ -122,73 +457,92 @@ class ChangelogGenerator:
         
         return None, "", message
         
+    def get_category(self, message: str) -> Tuple[str, str]:
+        """Map a commit message or PR title to its category label and description."""
+        commit_type, scope, description = self.parse_conventional_commit(message)
+
+        if commit_type and commit_type in self.commit_types:
+            return self.commit_types[commit_type]['label'], description
+
+        return OTHER_CATEGORY, description
+
+    @staticmethod
+    def referenced_pr(message: str) -> Optional[int]:
+        """PR number referenced by a squash (#123) or merge commit subject."""
+        match = PR_REFERENCE_PATTERN.search(message)
+        if match:
+            return int(match.group(1) or match.group(2))
+        return None
+
     def categorize_changes(self, commits: List[Dict], prs: List[Dict]) -> Dict[str, List[Dict]]:
-        """Categorize commits and PRs by type."""
+        """
+        Categorize commits and PRs by type, listing each change once.
+
+        Commits are hash-joined to PRs on the merge commit SHA and on
+        ``(#123)`` / ``Merge pull request #123`` references. A joined commit
+        is folded into its PR entry, which keeps the short SHA.
+        """
+        prs_by_sha = {pr['merge_commit_sha']: pr for pr in prs if pr.get('merge_commit_sha')}
+        prs_by_number = {pr['number']: pr for pr in prs}
+        joined_shas = {}
         categories = {}
-        
+
         # Process commits
         for commit in commits:
-            commit_type, scope, description = self.parse_conventional_commit(commit['message'])
-            
-            if commit_type and commit_type in self.commit_types:
-                category = self.commit_types[commit_type]['label']
-            else:
-                category = '🔄 Other Changes'
-                
-            if category not in categories:
-                categories[category] = []
-                
-            categories[category].append({
+            pr = prs_by_sha.get(commit['sha']) or prs_by_number.get(self.referenced_pr(commit['message']))
+            if pr is not None:
+                # Later commits of an already joined PR are the same change
+                joined_shas.setdefault(pr['number'], commit['sha'][:7])
+                continue
+
+            category, description = self.get_category(commit['message'])
+            categories.setdefault(category, []).append({
                 'type': 'commit',
                 'sha': commit['sha'][:7],
                 'message': description,
                 'author': commit['author'],
                 'date': commit['date']
             })
-            
+
         # Process PRs
         for pr in prs:
-            commit_type, scope, description = self.parse_conventional_commit(pr['title'])
-            
-            if commit_type and commit_type in self.commit_types:
-                category = self.commit_types[commit_type]['label']
-            else:
-                category = '🔄 Other Changes'
-                
-            if category not in categories:
-                categories[category] = []
-                
-            categories[category].append({
+            category, description = self.get_category(pr['title'])
+            change = {
                 'type': 'pr',
                 'number': pr['number'],
                 'title': pr['title'],
                 'author': pr['author'],
                 'date': pr['merged_at'],
                 'url': pr['url']
-            })
-            
+            }
+            if pr['number'] in joined_shas:
+                change['sha'] = joined_shas[pr['number']]
+            categories.setdefault(category, []).append(change)
+
         return categories
-        
-    def generate_version_section(self, version: str, date: str, categories: Dict[str, List[Dict]]) -> str:
+
+    def ordered_categories(self, categories: Dict[str, List[Dict]]) -> List[Tuple[str, List[Dict]]]:
+        """Non-empty categories in display order."""
+        return sorted(
+            ((category, changes) for category, changes in categories.items() if changes),
+            key=lambda item: self.category_order.get(item[0], 999)
+        )
+
+    @staticmethod
+    def release_contributors(release: Dict) -> List[str]:
+        """Sorted authors of every change in a release."""
+        return sorted({change['author'] for changes in release['categories'].values() for change in changes})
+
+    def generate_version_section(self, version: str, date: Optional[str], categories: Dict[str, List[Dict]]) -> str:
         """Generate changelog section for a version."""
         lines = []
         
         # Version header
         version_clean = version.lstrip('v')
-        lines.append(f"## [{version_clean}] - {date}")
+        lines.append(f"## [{version_clean}] - {date}" if date else f"## [{version_clean}]")
         lines.append("")
         
-        # Sort categories by order
-        sorted_categories = sorted(
-            categories.items(),
-            key=lambda x: next((v['order'] for k, v in self.commit_types.items() 
-                              if v['label'] == x[0]), 999)
-        )
-        
-        for category, changes in sorted_categories:
-            if not changes:
-                continue
-                
+        for category, changes in self.ordered_categories(categories):
             lines.append(f"### {category}")
             lines.append("")
             
@@ -240,86 +594,386 @@ and this project adheres to [Semantic Versioning](https://semver.org/spec/v2.0.0
 
 """
         
+    def get_since_date(self, since_tag: Optional[str]) -> Optional[str]:
+        """Get the commit date of since_tag, used as the PR lower bound."""
+        if not since_tag:
+            return None
+        try:
+            result = subprocess.run(
+                ['git', 'log', '-1', '--format=%ad', '--date=short', since_tag],
+                capture_output=True, text=True, check=True
+            )
+            return result.stdout.strip() or None
+        except subprocess.CalledProcessError:
+            return None
+
+    def render_release(self, version: str, release: Dict) -> str:
+        """Render a release recorded in the changelog state as Markdown."""
+        entries = [entry for changes in release['categories'].values() for entry in changes]
+        version_section = self.generate_version_section(version, release['date'], release['categories'])
+        contributors_section = self.get_contributors_section(entries, [])
+        return '\n'.join([version_section, contributors_section])
+
+    def render_release_notes(self, release: Dict) -> str:
+        """Render a release as a compact GitHub release body."""
+        lines = []
+
+        for category, changes in self.ordered_categories(release['categories']):
+            lines.append(f"### {category}")
+            lines.append("")
+            for change in changes:
+                if change['type'] == 'pr':
+                    lines.append(f"- {change['title']} (#{change['number']})")
+                else:
+                    lines.append(f"- {change['message']} ({change['sha']})")
+            lines.append("")
+
+        contributors = self.release_contributors(release)
+        if contributors:
+            lines.append("**Contributors:** " + ", ".join(f"@{name}" for name in contributors))
+            lines.append("")
+
+        return "\n".join(lines)
+
+    def render_json(self, releases: Dict[str, Dict]) -> Dict:
+        """Render releases as a JSON-serializable document, newest first."""
+        return {
+            'releases': [{
+                'version': version,
+                'date': releases[version]['date'],
+                'categories': [
+                    {'label': category, 'changes': changes}
+                    for category, changes in self.ordered_categories(releases[version]['categories'])
+                ],
+                'contributors': self.release_contributors(releases[version])
+            } for version in sorted_versions(releases)]
+        }
+
+    def write_exports(self, state: 'ChangelogState', version: str):
+        """Write the JSON and release notes exports requested through the environment."""
+        json_path = os.getenv('CHANGELOG_JSON_FILE')
+        if json_path:
+            Path(json_path).write_text(
+                json.dumps(self.render_json(state.releases), indent=2, ensure_ascii=False) + '\n',
+                encoding='utf-8'
+            )
+
+        notes_path = os.getenv('RELEASE_NOTES_FILE')
+        release = state.releases.get(version.lstrip('v'))
+        if notes_path and release:
+            Path(notes_path).write_text(self.render_release_notes(release), encoding='utf-8')
+
+    @staticmethod
+    def replace_version_section(content: str, version: str, section: str) -> str:
+        """Replace the ``## [version]`` section in content, or insert it at the top."""
+        lines = content.split('\n')
+        version_clean = version.lstrip('v')
+
+        start = next((i for i, line in enumerate(lines)
+                      if line.startswith(f'## [{version_clean}]')), None)
+        if start is not None:
+            end = next((i for i in range(start + 1, len(lines))
+                        if lines[i].startswith('## ') or lines[i] == '---'), len(lines))
+            return '\n'.join(lines[:start] + [section] + lines[end:])
+
+        # Insert before the newest release, or after the header
+        insert_idx = next((i for i, line in enumerate(lines) if line.startswith('## [')), None)
+        if insert_idx is None:
+            insert_idx = len(ChangelogGenerator.split_changelog(content)[0])
+        return '\n'.join(lines[:insert_idx] + ['', section] + lines[insert_idx:])
+
+    @staticmethod
+    def split_changelog(content: str) -> Tuple[List[str], List[str], List[str]]:
+        """
+        Split a changelog into header, release sections and footer lines.
+
+        The header runs up to the first ``## [`` heading. The footer starts
+        at the first ``---`` rule that is not followed by another release.
+        """
+        lines = content.split('\n')
+        release_starts = [i for i, line in enumerate(lines) if line.startswith('## [')]
+
+        if release_starts:
+            header_end = release_starts[0]
+            footer_start = next((i for i in range(release_starts[-1], len(lines)) if lines[i] == '---'),
+                                len(lines))
+        else:
+            header_end = footer_start = len(lines)
+
+        header = lines[:header_end]
+        while header and not header[-1].strip():
+            header.pop()
+        return header, lines[header_end:footer_start], lines[footer_start:]
+
+    def get_version_tags(self) -> List[Dict]:
+        """List version tags (vX.Y.Z or X.Y.Z), oldest version first."""
+        cmd = ['git', 'for-each-ref', 'refs/tags', '--format=%(refname:short)|%(objectname)|%(*objectname)|%(creatordate:short)']
+
+        try:
+            result = subprocess.run(cmd, capture_output=True, text=True, check=True)
+        except subprocess.CalledProcessError as e:
+            print(f"Warning: Could not list tags: {e}")
+            return []
+
+        tags = []
+        for line in result.stdout.splitlines():
+            name, sha, peeled_sha, date = line.split('|', 3)
+            match = VERSION_TAG_PATTERN.match(name)
+            if match:
+                tags.append({
+                    'name': name,
+                    'sha': peeled_sha or sha,  # Annotated tags point at a tag object
+                    'date': date,
+                    'key': tuple(int(part) for part in match.groups())
+                })
+
+        return sorted(tags, key=lambda tag: tag['key'])
+
+    def walk_releases(self, tags: List[Dict], unreleased: str) -> Dict[str, List[Dict]]:
+        """
+        Assign every commit to the oldest release that contains it in one walk.
+
+        ``git log --topo-order`` lists children before parents, so each
+        commit's release is final by the time it is reached and only needs
+        to be passed down to its parents. Commits not contained in any tag
+        are assigned to ``unreleased``.
+        """
+        labels = [tag['name'] for tag in tags] + [unreleased]
+        unreleased_idx = len(tags)
+        release_of = {tag['sha']: idx for idx, tag in enumerate(tags)}
+
+        cmd = ['git', 'log', '--topo-order', '--pretty=format:%H|%P|%an|%ad|%s', '--date=short',
+               'HEAD'] + [tag['name'] for tag in tags]
+
+        try:
+            result = subprocess.run(cmd, capture_output=True, text=True, check=True)
+        except subprocess.CalledProcessError as e:
+            print(f"Warning: Could not get git commits: {e}")
+            return {}
+
+        releases = {label: [] for label in labels}
+        for line in result.stdout.split('\n'):
+            parts = line.split('|', 4)
+            if len(parts) < 5:
+                continue
+            sha, parents, author, date, message = parts
+
+            idx = release_of.get(sha, unreleased_idx)
+            for parent in parents.split():
+                if idx < release_of.get(parent, unreleased_idx):
+                    release_of[parent] = idx
+
+            release_of[sha] = idx
+            releases[labels[idx]].append({
+                'sha': sha,
+                'message': message,
+                'author': author,
+                'date': date
+            })
+
+        return releases
+
+    def rebuild_all_releases(self, version: str, date: str) -> bool:
+        """
+        Rebuild every release section from a single history walk.
+
+        Commits newer than the latest tag are listed under ``version`` when
+        it has not been tagged yet, and under Unreleased otherwise. Pull
+        requests are matched to releases through their merge commit.
+        """
+        tags = self.get_version_tags()
+        print(f"📝 Rebuilding changelog for {len(tags)} tagged releases")
+
+        tag_names = {tag['name'] for tag in tags}
+        unreleased = 'Unreleased' if version in tag_names else version
+        releases = self.walk_releases(tags, unreleased)
+        dates = {tag['name']: tag['date'] for tag in tags}
+        dates[unreleased] = None if unreleased == 'Unreleased' else date
+
+        release_of = {commit['sha']: label for label, commits in releases.items() for commit in commits}
+        prs_by_release = {label: [] for label in releases}
+        for pr in self.get_github_prs():
+            label = release_of.get(pr.get('merge_commit_sha'))
+            if label is None:
+                # Merge commit not in local history (e.g. rebased); fall back to dates
+                label = next((tag['name'] for tag in tags if tag['date'] >= pr['merged_at']), unreleased)
+            prs_by_release[label].append(pr)
+
+        total = sum(len(commits) for commits in releases.values())
+        print(f"   Walked {total} commits once")
+
+        state = ChangelogState(last_sha=ChangelogState.head_sha())
+        sections = []
+        for label in reversed(list(releases)):
+            commits, prs = releases[label], prs_by_release[label]
+            if not commits and not prs:
+                continue
+
+            release = {
+                'date': dates[label],
+                'categories': self.categorize_changes(commits, prs),
+                'last_pr_date': max((pr['merged_at'] for pr in prs), default=None)
+            }
+            state.releases[label.lstrip('v')] = release
+            sections.extend(['', self.render_release(label, release)])
+
+        if not sections:
+            print("ℹ️  No changes found to add to changelog")
+            return False
+
+        header, _, footer = self.split_changelog(self.load_existing_changelog())
+        Path('CHANGELOG.md').write_text('\n'.join(header + sections + footer), encoding='utf-8')
+        state.save()
+        self.write_exports(state, version)
+
+        print(f"✅ Changelog rebuilt with {len(state.releases)} releases")
+        return True
+
     def update_changelog(self, version: str, since_tag: Optional[str], date: str, full_rebuild: bool = False) -> bool:
-        """Update the changelog with new version."""
+        """
+        Update the changelog with new version.
+
+        Incremental runs only ingest commits after the state watermark and
+        re-render the affected version section. A full rebuild ignores the
+        saved state and starts the changelog over.
+        """
         print(f"📝 Generating changelog for version {version}")
         print(f"   Since: {since_tag or 'beginning'}")
         print(f"   Date: {date}")
-        
-        # Get data
-        commits = self.get_git_commits(since_tag if not full_rebuild else None)
-        
-        # Calculate since date for PRs
-        since_date = None
-        if since_tag and not full_rebuild:
-            try:
-                result = subprocess.run(
-                    ['git', 'log', '-1', '--format=%ad', '--date=short', since_tag], 
-                    capture_output=True, text=True
-                )
-                since_date = result.stdout.strip()
-            except subprocess.CalledProcessError:
-                pass
-                
+
+        state = ChangelogState() if full_rebuild else ChangelogState.load()
+        head = state.head_sha()
+        version_clean = version.lstrip('v')
+        release = state.releases.get(version_clean)
+
+        # Commits already processed are reachable from the watermark
+        exclude = []
+        if state.last_sha and state.is_ancestor(state.last_sha):
+            exclude.append(state.last_sha)
+        elif release:
+            print("   Watermark is not an ancestor of HEAD, re-ingesting release")
+            del state.releases[version_clean]
+            release = None
+
+        if full_rebuild:
+            commits = self.get_git_commits()
+            since_date = None
+        else:
+            commits = self.get_git_commits(since_tag, exclude)
+            since_date = self.get_since_date(since_tag)
+            if release and release.get('last_pr_date'):
+                since_date = max(since_date or '', release['last_pr_date'])
+
         prs = self.get_github_prs(since_date)
-        
+
+        if release is None:
+            release = {'date': date, 'categories': {}, 'last_pr_date': None}
+        seen = state.seen_keys()
+        commits = [c for c in commits if ('commit', c['sha'][:7]) not in seen]
+        # Commits of PRs an earlier run recorded are not new changes
+        commits, joined = state.join_recorded_prs(commits, prs)
+        prs = [pr for pr in prs if ('pr', pr['number']) not in seen]
+
         if not commits and not prs:
             print("ℹ️  No changes found to add to changelog")
+            if (exclude or joined) and head:
+                state.last_sha = head
+                state.save()
+            if joined:
+                self.write_exports(state, version)
             return False
-            
-        print(f"   Found {len(commits)} commits and {len(prs)} PRs")
-        
-        # Categorize changes
-        categories = self.categorize_changes(commits, prs)
-        
-        # Generate new version section
-        version_section = self.generate_version_section(version, date, categories)
-        contributors_section = self.get_contributors_section(commits, prs)
-        
+
+        print(f"   Found {len(commits)} new commits and {len(prs)} new PRs")
+
+        # Categorize the new changes and merge them into the release
+        for category, changes in self.categorize_changes(commits, prs).items():
+            release['categories'].setdefault(category, []).extend(changes)
+        release['date'] = date
+        pr_dates = [pr['merged_at'] for pr in prs]
+        if pr_dates:
+            release['last_pr_date'] = max(pr_dates + [release.get('last_pr_date') or ''])
+        state.releases[version_clean] = release
+
+        release_section = self.render_release(version, release)
+
         # Load existing changelog
         existing_content = self.load_existing_changelog()
-        
+
         if full_rebuild:
             # For full rebuild, replace entire changelog
-            new_content = existing_content.split('\n')[:6]  # Keep header
-            new_content.extend(['', version_section, contributors_section])
-            updated_content = '\n'.join(new_content)
+            header, _, footer = self.split_changelog(existing_content)
+            updated_content = '\n'.join(header + ['', release_section] + footer)
         else:
-            # Insert new version at the top
-            lines = existing_content.split('\n')
-            
-            # Find insertion point (after header)
-            insert_idx = 6  # Default after standard header
-            for i, line in enumerate(lines):
-                if line.startswith('## ['):
-                    insert_idx = i
-                    break
-                    
-            # Insert new content
-            new_lines = (lines[:insert_idx] +
-                        ['', version_section, contributors_section] +
-                        lines[insert_idx:])
-            updated_content = '\n'.join(new_lines)
-        
+            updated_content = self.replace_version_section(existing_content, version, release_section)
+
         # Write updated changelog
         changelog_path = Path('CHANGELOG.md')
         changelog_path.write_text(updated_content, encoding='utf-8')
-        
+
+        state.last_sha = head
+        state.save()
+        self.write_exports(state, version)
+
         print("✅ Changelog updated successfully")
         return True
 
 
+def run_query(generator: 'ChangelogGenerator', args) -> int:
+    """Answer a query from the changelog store without touching CHANGELOG.md."""
+    state = ChangelogState.load()
+
+    if args.find_sha:
+        version = state.first_release(args.find_sha)
+        if version is None:
+            print(f"Commit {args.find_sha} is not recorded in any release")
+            return 1
+        print(version)
+        return 0
+
+    category = args.category
+    if category in generator.commit_types:
+        category = generator.commit_types[category]['label']
+
+    for version, label, change in state.find_changes(category, args.author, args.since):
+        text = f"#{change['number']} {change['title']}" if change['type'] == 'pr' else f"{change['sha']} {change['message']}"
+        print(f"{version}\t{label}\t{text} ({change['author']})")
+    return 0
+
+
 def main():
     """Main execution function."""
-    generator = ChangelogGenerator(os.getenv('GITHUB_TOKEN'))
+    import argparse
+
+    parser = argparse.ArgumentParser(
+        description="Generate the changelog (configured through environment variables) or query the changelog store"
+    )
+    parser.add_argument('--find-sha', metavar='SHA',
+                        help='Print the first release that contained a commit')
+    parser.add_argument('--changes', action='store_true',
+                        help='List recorded changes matching --category/--author/--since')
+    parser.add_argument('--category', help='Commit type (e.g. perf) or category label')
+    parser.add_argument('--author', help='Change author')
+    parser.add_argument('--since', metavar='VERSION', help='Only releases newer than VERSION (e.g. 0.3)')
+    parser.add_argument('--graphql', action='store_true',
+                        help='Fetch pull requests with batched GraphQL queries instead of REST pages')
+    args = parser.parse_args()
+
+    generator = ChangelogGenerator(os.getenv('GITHUB_TOKEN'), use_graphql=args.graphql)
+
+    if args.find_sha or args.changes:
+        sys.exit(run_query(generator, args))
     
     version = os.getenv('CURRENT_VERSION', 'v0.1.0')
     since_tag = os.getenv('SINCE_TAG')
     date = os.getenv('RELEASE_DATE', datetime.now().strftime('%Y-%m-%d'))
     full_rebuild = os.getenv('FULL_REBUILD', 'false').lower() == 'true'
+    all_releases = os.getenv('ALL_RELEASES', 'false').lower() == 'true'
     
     try:
-        success = generator.update_changelog(version, since_tag, date, full_rebuild)
+        if all_releases:
+            success = generator.rebuild_all_releases(version, date)
+        else:
+            success = generator.update_changelog(version, since_tag, date, full_rebuild)
         
         if not success:
             print("ℹ️  Changelog is already up to date")
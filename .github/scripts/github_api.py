@@ -0,0 +1,201 @@
+#!/usr/bin/env python3
+"""
+Rate-limit-aware GitHub API client shared by the automation scripts.
+
+Imported by collect-metrics.py and generate-changelog.py, which find it on
+the path because Python puts a script's own directory first.
+"""
+
+import os
+import random
+import threading
+import time
+from typing import Callable, Dict, Optional
+
+import requests
+from requests.adapters import HTTPAdapter
+
+GRAPHQL_URL = os.environ.get('GITHUB_GRAPHQL_URL', 'https://api.github.com/graphql')
+
+# Request priorities; lower numbers are served first when the budget is low
+HIGH = 0
+NORMAL = 1
+LOW = 2
+
+# Requests per second the scripts pace themselves to; 0 turns pacing off.
+# Keeps bursts well under GitHub's secondary limits on concurrent requests
+DEFAULT_RATE = float(os.environ.get('GITHUB_API_RATE', '10'))
+
+# Requests left in the hourly budget below which each priority waits for the reset
+DEFAULT_RESERVE = {HIGH: 0, NORMAL: 50, LOW: 200}
+
+# GitHub asks clients to wait at least a minute after a secondary rate limit
+SECONDARY_LIMIT_WAIT = 60
+
+RETRY_STATUSES = (500, 502, 503, 504)
+
+
+class RateLimitExceeded(requests.RequestException):
+    """The budget for a request's priority is spent and the reset is too far away."""
+
+
+class GraphQLError(requests.RequestException):
+    """A GraphQL response that carried errors."""
+
+
+class GitHubClient:
+    """
+    A pooled session that paces requests and honors GitHub's rate limits.
+
+    Every response's ``X-RateLimit-Remaining`` and ``X-RateLimit-Reset`` are
+    tracked. A token bucket spreads requests out (``rate`` per second, bursts
+    up to ``burst``); when the remaining budget drops to a priority's reserve,
+    requests of that priority wait for the reset while more important ones
+    still go through. Secondary limits, ``Retry-After`` and server errors are
+    retried with exponential backoff and jitter. Waits longer than
+    ``max_wait`` seconds are not taken: the limited response is returned, or
+    RateLimitExceeded raised when the budget gate would block.
+
+    Safe to share between threads.
+    """
+
+    def __init__(self, token: Optional[str] = None, pool_size: int = 10,
+                 rate: Optional[float] = None, burst: int = 10, max_retries: int = 3,
+                 backoff: float = 1.0, max_wait: float = 900,
+                 reserve: Optional[Dict[int, int]] = None,
+                 sleep: Callable[[float], None] = time.sleep):
+        self.session = requests.Session()
+        self.session.headers.update({
+            'Accept': 'application/vnd.github.v3+json',
+            'User-Agent': 'AILIS-Automation/1.0'
+        })
+        if token:
+            self.session.headers['Authorization'] = f'token {token}'
+        adapter = HTTPAdapter(pool_connections=1, pool_maxsize=pool_size)
+        self.session.mount('https://', adapter)
+        self.session.mount('http://', adapter)
+
+        self.rate = rate
+        self.burst = burst
+        self.max_retries = max_retries
+        self.backoff = backoff
+        self.max_wait = max_wait
+        self.reserve = {**DEFAULT_RESERVE, **(reserve or {})}
+        self.sleep = sleep
+
+        self.lock = threading.Lock()
+        self.tokens = float(burst)
+        self.refilled = time.monotonic()
+        self.remaining = None
+        self.reset_at = None
+        self.stats = {'requests': 0, 'retries': 0, 'waited_seconds': 0.0}
+
+    def close(self):
+        self.session.close()
+
+    def wait(self, seconds: float):
+        if seconds > 0:
+            with self.lock:
+                self.stats['waited_seconds'] += seconds
+            self.sleep(seconds)
+
+    def take_token(self):
+        """Reserve a slot in the token bucket, sleeping until it is due."""
+        if not self.rate:
+            return
+        with self.lock:
+            now = time.monotonic()
+            self.tokens = min(self.burst, self.tokens + (now - self.refilled) * self.rate)
+            self.refilled = now
+            self.tokens -= 1
+            delay = -self.tokens / self.rate if self.tokens < 0 else 0
+        self.wait(delay)
+
+    def check_budget(self, priority: int):
+        """Hold a request back while the remaining budget is within its priority's reserve."""
+        with self.lock:
+            if self.remaining is None or self.remaining > self.reserve.get(priority, 0):
+                return
+            delay = (self.reset_at or 0) - time.time() + 1
+            if delay <= 0:
+                self.remaining = None
+                return
+        if delay > self.max_wait:
+            raise RateLimitExceeded(
+                f"Rate limit budget reserved for higher priority requests; resets in {int(delay)}s"
+            )
+        self.wait(delay)
+        with self.lock:
+            self.remaining = None
+
+    def record(self, response: requests.Response):
+        """Track the budget reported by a response."""
+        remaining = response.headers.get('X-RateLimit-Remaining')
+        reset = response.headers.get('X-RateLimit-Reset')
+        with self.lock:
+            self.stats['requests'] += 1
+            if remaining is not None and remaining.isdigit():
+                self.remaining = int(remaining)
+            if reset is not None and reset.isdigit():
+                self.reset_at = int(reset)
+
+    def retry_delay(self, response: Optional[requests.Response], attempt: int) -> Optional[float]:
+        """Seconds to wait before retrying, or None if the response is final."""
+        jitter = random.uniform(0, self.backoff)
+        if response is None or response.status_code in RETRY_STATUSES:
+            return self.backoff * 2 ** attempt + jitter
+        if response.status_code not in (403, 429):
+            return None
+
+        retry_after = response.headers.get('Retry-After')
+        if retry_after and retry_after.isdigit():
+            return int(retry_after)
+        if response.headers.get('X-RateLimit-Remaining') == '0':
+            return max((self.reset_at or 0) - time.time() + 1, 0)
+        if 'secondary rate limit' in response.text.lower():
+            return SECONDARY_LIMIT_WAIT * 2 ** attempt + jitter
+        # A plain 403 is a permissions problem, not a limit
+        return None
+
+    def get(self, url: str, params: Optional[Dict] = None, headers: Optional[Dict] = None,
+            timeout: float = 30, priority: int = NORMAL) -> requests.Response:
+        """GET a URL, pacing, prioritizing and retrying as needed."""
+        return self.request('GET', url, params=params, headers=headers, timeout=timeout, priority=priority)
+
+    def post(self, url: str, json: Optional[Dict] = None, headers: Optional[Dict] = None,
+             timeout: float = 30, priority: int = NORMAL) -> requests.Response:
+        """POST a JSON body, pacing, prioritizing and retrying as needed."""
+        return self.request('POST', url, json=json, headers=headers, timeout=timeout, priority=priority)
+
+    def graphql(self, query: str, variables: Optional[Dict] = None, url: Optional[str] = None,
+                priority: int = NORMAL) -> Dict:
+        """Run a GraphQL query and return its data, raising GraphQLError on errors."""
+        response = self.post(url or GRAPHQL_URL, json={'query': query, 'variables': variables or {}},
+                             priority=priority)
+        response.raise_for_status()
+        body = response.json()
+        if body.get('errors'):
+            raise GraphQLError('; '.join(error.get('message', str(error)) for error in body['errors']))
+        return body['data']
+
+    def request(self, method: str, url: str, priority: int = NORMAL, **kwargs) -> requests.Response:
+        for attempt in range(self.max_retries + 1):
+            self.check_budget(priority)
+            self.take_token()
+
+            try:
+                response = self.session.request(method, url, **kwargs)
+            except requests.ConnectionError:
+                if attempt == self.max_retries:
+                    raise
+                response = None
+            else:
+                self.record(response)
+
+            delay = self.retry_delay(response, attempt)
+            if delay is None or attempt == self.max_retries or delay > self.max_wait:
+                return response
+            with self.lock:
+                self.stats['retries'] += 1
+            self.wait(delay)
+        return response
@@ -5,26 +5,171 @@ This script ensures workflow files are valid YAML and checks for common issues.
 """
 
 import os
+import re
+import subprocess
 import sys
+import time
 import yaml
 import json
+import hashlib
+from concurrent.futures import ProcessPoolExecutor
+from functools import lru_cache
 from pathlib import Path
 
-def validate_yaml_file(filepath):
+# Optional imports with fallbacks
+try:
+    import jsonschema
+except ImportError:
+    jsonschema = None
+
+# Use libyaml's C loader when PyYAML was built with it; results are identical
+SafeLoader = getattr(yaml, 'CSafeLoader', yaml.SafeLoader)
+
+DEFAULT_CACHE_PATH = Path('.github/.cache/workflow-validation.json')
+
+# Local copy of the SchemaStore GitHub workflow schema, so validation needs no network
+SCHEMA_PATH = Path(__file__).resolve().parent.parent / 'schemas' / 'github-workflow.json'
+
+# Schema validation budget per workflow file, checked by --benchmark
+SCHEMA_BUDGET_MS_PER_FILE = 10.0
+
+# Assumed length of a job with no recorded duration, in minutes
+DEFAULT_JOB_MINUTES = 1.0
+
+@lru_cache(maxsize=None)
+def get_schema_validator():
+    """Compile the bundled workflow schema once per process and reuse it."""
+    if jsonschema is None:
+        return None
+    schema = json.loads(SCHEMA_PATH.read_text(encoding='utf-8'))
+    validator_class = jsonschema.validators.validator_for(schema)
+    validator_class.check_schema(schema)
+    return validator_class(schema)
+
+def load_workflow(content):
+    """
+    Parse YAML once, returning the node tree and the constructed data.
+
+    YAML 1.1 reads a bare ``on`` key as boolean True; it is renamed back to
+    'on' so checks and the schema see the key GitHub sees.
+    """
+    loader = SafeLoader(content)
+    try:
+        node = loader.get_single_node()
+        data = loader.construct_document(node) if node is not None else None
+    finally:
+        loader.dispose()
+
+    if isinstance(data, dict) and True in data and 'on' not in data:
+        data['on'] = data.pop(True)
+    return node, data
+
+def node_mark(node, path):
+    """Start mark of the deepest node along a JSON path, for line and column reporting."""
+    for key in path:
+        if isinstance(node, yaml.MappingNode):
+            child = next((value for key_node, value in node.value if key_node.value == str(key)), None)
+        elif isinstance(node, yaml.SequenceNode) and isinstance(key, int) and key < len(node.value):
+            child = node.value[key]
+        else:
+            child = None
+        if child is None:
+            break
+        node = child
+    return node.start_mark
+
+def schema_errors(node, data):
+    """Validate data against the workflow schema, reporting YAML positions."""
+    validator = get_schema_validator()
+    if validator is None:
+        return []
+
+    messages = []
+    for error in sorted(validator.iter_errors(data), key=lambda e: list(map(str, e.absolute_path))):
+        # oneOf/anyOf failures: follow the branch that got furthest into the document
+        while error.context:
+            error = max(error.context, key=lambda e: (len(e.absolute_path), e.validator != 'type'))
+        mark = node_mark(node, error.absolute_path)
+        location = '/'.join(map(str, error.absolute_path)) or '<root>'
+        message = error.message if len(error.message) <= 160 else error.message[:157] + '...'
+        messages.append(f"Line {mark.line + 1}, column {mark.column + 1}: Schema: {message} (at {location})")
+    return messages
+
+def benchmark_schema_validation(files=500, repeat=3):
+    """
+    Time parsing plus schema validation of a batch of synthetic workflows.
+
+    Returns milliseconds per file (best of ``repeat``) and whether that is
+    within SCHEMA_BUDGET_MS_PER_FILE.
+    """
+    template = """name: Benchmark {index}
+on:
+  push:
+    branches: [main]
+    paths: ['docs/**', '.github/workflows/bench-{index}.yml']
+  pull_request:
+jobs:
+  test:
+    runs-on: ${{{{ matrix.os }}}}
+    strategy:
+      matrix:
+        os: [ubuntu-latest, macos-latest]
+        python: ['3.10', '3.11', '3.12']
+    steps:
+      - uses: actions/checkout@v4
+      - uses: actions/setup-python@v5
+        with:
+          python-version: ${{{{ matrix.python }}}}
+      - name: Test
+        run: python -m pytest -q
+  deploy:
+    needs: test
+    if: github.ref == 'refs/heads/main'
+    runs-on: ubuntu-latest
+    concurrency:
+      group: deploy-${{{{ github.ref }}}}
+      cancel-in-progress: true
+    steps:
+      - run: echo deploy {index}
+"""
+    contents = [template.format(index=i) for i in range(files)]
+    get_schema_validator()
+
+    best = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        for content in contents:
+            node, data = load_workflow(content)
+            schema_errors(node, data)
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+
+    per_file = best * 1000 / files
+    return {
+        'files': files,
+        'ms_per_file': round(per_file, 3),
+        'budget_ms_per_file': SCHEMA_BUDGET_MS_PER_FILE,
+        'within_budget': per_file <= SCHEMA_BUDGET_MS_PER_FILE
+    }
+
+def validate_yaml_file(filepath, content=None):
     """Validate a single YAML file."""
     errors = []
     warnings = []
     
     try:
-        with open(filepath, 'r') as f:
-            content = f.read()
-            data = yaml.safe_load(content)
+        if content is None:
+            with open(filepath, 'r') as f:
+                content = f.read()
+        node, data = load_workflow(content)
             
         # Check for common issues
         if data is None:
             errors.append(f"Empty or invalid YAML structure")
             return errors, warnings
             
+        errors.extend(schema_errors(node, data))
+            
         # Check for required top-level keys
         if 'name' not in data:
             warnings.append("Missing 'name' field")
@@ -34,8 +179,7 @@ def validate_yaml_file(filepath):
             errors.append("Missing 'jobs' field")
             
         # Check for problematic patterns
-        lines = content.split('\n')
-        for i, line in enumerate(lines, 1):
+        for i, line in enumerate(content.splitlines(), 1):
             # Check for template literals in body fields (potential YAML parsing issues)
             if 'body: `' in line:
                 warnings.append(f"Line {i}: Template literal in body field - consider using array.join() format")
@@ -62,7 +206,80 @@ def validate_yaml_file(filepath):
         
     return errors, warnings
 
-def validate_all_workflows(workflow_dir=".github/workflows"):
+def validation_signature():
+    """Identify the validator so cached results are dropped when it changes."""
+    digest = hashlib.sha256(Path(__file__).read_bytes())
+    digest.update(SafeLoader.__name__.encode('utf-8'))
+    if jsonschema is not None:
+        digest.update(SCHEMA_PATH.read_bytes())
+    return digest.hexdigest()
+
+
+def load_cache(cache_path, signature):
+    """Load cached results keyed by content hash, if made by this validator."""
+    if cache_path is None:
+        return {}
+    try:
+        data = json.loads(Path(cache_path).read_text(encoding='utf-8'))
+    except (OSError, ValueError):
+        return {}
+    return data.get('results', {}) if data.get('signature') == signature else {}
+
+def save_cache(cache_path, signature, results):
+    """Persist results keyed by content hash."""
+    if cache_path is None:
+        return
+    cache_path = Path(cache_path)
+    cache_path.parent.mkdir(parents=True, exist_ok=True)
+    tmp_path = cache_path.with_suffix('.tmp')
+    tmp_path.write_text(json.dumps({'signature': signature, 'results': results}), encoding='utf-8')
+    tmp_path.replace(cache_path)
+
+def find_workflow_files(workflow_dir):
+    """Workflow files in the directory, sorted."""
+    workflow_path = Path(workflow_dir)
+    return sorted(list(workflow_path.glob("*.yml")) + list(workflow_path.glob("*.yaml")))
+
+def validate_workflows(workflow_files, jobs=1, cache_path=None):
+    """
+    Validate workflow files once, for both the text and JSON reports.
+
+    Each file is read once; files whose content hash is in the cache are
+    not parsed again. The rest are validated from the content that was
+    hashed, in a process pool when more than one job is requested.
+    """
+    signature = validation_signature()
+    cache = load_cache(cache_path, signature)
+
+    contents = {str(f): Path(f).read_bytes() for f in workflow_files}
+    hashes = {name: hashlib.sha256(data).hexdigest() for name, data in contents.items()}
+    pending = [name for name in contents if hashes[name] not in cache]
+
+    # Validate the bytes that were hashed, so each file is read once
+    texts = [contents[name].decode('utf-8') for name in pending]
+    if jobs > 1 and len(pending) > 1:
+        with ProcessPoolExecutor(max_workers=jobs) as pool:
+            fresh = list(pool.map(validate_yaml_file, pending, texts))
+    else:
+        fresh = [validate_yaml_file(name, text) for name, text in zip(pending, texts)]
+
+    for name, (errors, warnings) in zip(pending, fresh):
+        cache[hashes[name]] = {'errors': errors, 'warnings': warnings}
+
+    save_cache(cache_path, signature, {hashes[name]: cache[hashes[name]] for name in contents})
+
+    results = []
+    for name in contents:
+        entry = cache[hashes[name]]
+        results.append({
+            'file': name,
+            'errors': entry['errors'],
+            'warnings': entry['warnings'],
+            'valid': len(entry['errors']) == 0
+        })
+    return results
+
+def validate_all_workflows(workflow_dir=".github/workflows", jobs=1, cache_path=None, results=None):
     """Validate all workflow files in the directory."""
     workflow_path = Path(workflow_dir)
     
@@ -70,7 +287,7 @@ def validate_all_workflows(workflow_dir=".github/workflows"):
         print(f"❌ Workflow directory '{workflow_dir}' does not exist")
         return False
         
-    workflow_files = list(workflow_path.glob("*.yml")) + list(workflow_path.glob("*.yaml"))
+    workflow_files = find_workflow_files(workflow_dir)
     
     if not workflow_files:
         print(f"⚠️  No workflow files found in '{workflow_dir}'")
@@ -78,13 +295,16 @@ def validate_all_workflows(workflow_dir=".github/workflows"):
         
     print(f"🔍 Validating {len(workflow_files)} workflow files...\n")
     
+    if results is None:
+        results = validate_workflows(workflow_files, jobs, cache_path)
+    
     total_errors = 0
     total_warnings = 0
     failed_files = []
     
-    for filepath in sorted(workflow_files):
-        relative_path = filepath
-        errors, warnings = validate_yaml_file(filepath)
+    for result in results:
+        relative_path = result['file']
+        errors, warnings = result['errors'], result['warnings']
         
         if errors:
             print(f"❌ {relative_path}")
@@ -116,6 +336,424 @@ def validate_all_workflows(workflow_dir=".github/workflows"):
         print(f"\n✅ All workflow files are valid!")
         return True
 
+def expand_matrix(strategy):
+    """
+    Number of jobs a strategy matrix expands to.
+
+    Follows GitHub's rules: the product of the list-valued keys, minus
+    combinations matched by ``exclude``, plus ``include`` entries that do not
+    extend an existing combination. Matrices built from expressions count as
+    one job since their size is only known at run time.
+    """
+    matrix = strategy.get('matrix') if isinstance(strategy, dict) else None
+    if not isinstance(matrix, dict):
+        return 1
+
+    base = {k: v for k, v in matrix.items() if k not in ('include', 'exclude')}
+    combos = [{}]
+    for key, values in base.items():
+        values = values if isinstance(values, list) else [values]
+        combos = [dict(combo, **{key: value}) for combo in combos for value in values]
+    if not base:
+        combos = []
+
+    excludes = matrix.get('exclude') if isinstance(matrix.get('exclude'), list) else []
+    combos = [
+        combo for combo in combos
+        if not any(isinstance(e, dict) and all(combo.get(k) == v for k, v in e.items()) for e in excludes)
+    ]
+
+    legs = len(combos)
+    includes = matrix.get('include') if isinstance(matrix.get('include'), list) else []
+    for entry in includes:
+        if not isinstance(entry, dict):
+            continue
+        extends = any(all(combo[k] == v for k, v in entry.items() if k in combo) for combo in combos)
+        if not extends:
+            legs += 1
+    return max(legs, 1)
+
+def job_graph(data):
+    """Jobs of a parsed workflow with their needs and matrix size."""
+    jobs = data.get('jobs') if isinstance(data, dict) else None
+    if not isinstance(jobs, dict):
+        return {}
+
+    graph = {}
+    for job_id, config in jobs.items():
+        config = config if isinstance(config, dict) else {}
+        needs = config.get('needs', [])
+        needs = [needs] if isinstance(needs, str) else list(needs or [])
+        strategy = config.get('strategy') if isinstance(config.get('strategy'), dict) else {}
+        max_parallel = strategy.get('max-parallel')
+        graph[str(job_id)] = {
+            'needs': [str(n) for n in needs],
+            'legs': expand_matrix(strategy),
+            'max_parallel': max_parallel if isinstance(max_parallel, int) and max_parallel > 0 else None
+        }
+    return graph
+
+def topological_order(graph):
+    """Job ids ordered so every job follows its needs; raises ValueError on a cycle."""
+    order = []
+    state = {}
+
+    def visit(job_id, trail):
+        if state.get(job_id) == 'done':
+            return
+        if state.get(job_id) == 'visiting':
+            raise ValueError(f"Dependency cycle: {' -> '.join(trail + [job_id])}")
+        state[job_id] = 'visiting'
+        for need in graph[job_id]['needs']:
+            if need in graph:
+                visit(need, trail + [job_id])
+        state[job_id] = 'done'
+        order.append(job_id)
+
+    for job_id in graph:
+        visit(job_id, [])
+    return order
+
+def job_minutes(durations, job_id):
+    """
+    Historical duration of one matrix leg of a job, in minutes.
+
+    ``durations`` maps job ids to seconds, or to a mapping of step names to
+    seconds which are summed. Returns (minutes, measured).
+    """
+    entry = durations.get(job_id)
+    if isinstance(entry, dict):
+        seconds = sum(v for v in entry.values() if isinstance(v, (int, float)))
+    elif isinstance(entry, (int, float)):
+        seconds = entry
+    else:
+        return DEFAULT_JOB_MINUTES, False
+    return seconds / 60, True
+
+def longest_path(graph, order, minutes):
+    """Earliest start and finish of every job when each starts as soon as its needs finish."""
+    start, finish = {}, {}
+    for job_id in order:
+        start[job_id] = max((finish[n] for n in graph[job_id]['needs'] if n in finish), default=0.0)
+        finish[job_id] = start[job_id] + minutes[job_id]
+    return start, finish
+
+def analyze_workflow(data, durations=None):
+    """
+    Critical path and cost of one workflow's job graph.
+
+    Matrix legs of a job run side by side, in waves of ``max-parallel``. The
+    critical path is the longest chain through ``needs``; runner minutes
+    count every leg. For each job, ``gain_if_halved`` is how much wall time
+    drops if that job ran twice as fast, so the best candidates for speeding
+    up come first in ``speedup_candidates``.
+    """
+    durations = durations or {}
+    graph = job_graph(data)
+    order = topological_order(graph)
+
+    leg_minutes, minutes, measured = {}, {}, {}
+    for job_id, job in graph.items():
+        leg_minutes[job_id], measured[job_id] = job_minutes(durations, job_id)
+        waves = -(-job['legs'] // (job['max_parallel'] or job['legs']))
+        minutes[job_id] = leg_minutes[job_id] * waves
+
+    start, finish = longest_path(graph, order, minutes)
+    wall = max(finish.values(), default=0.0)
+
+    # Walk back from the last job to finish along needs that gate each start
+    path = []
+    current = max(finish, key=finish.get) if finish else None
+    while current is not None:
+        path.append(current)
+        gating = [n for n in graph[current]['needs'] if n in finish and finish[n] == start[current]]
+        current = gating[0] if gating and start[current] > 0 else None
+    path.reverse()
+
+    # Peak number of runners busy at once
+    events = []
+    for job_id, job in graph.items():
+        runners = min(job['legs'], job['max_parallel'] or job['legs'])
+        events.append((start[job_id], 1, runners))
+        events.append((finish[job_id], 0, -runners))
+    width = busy = 0
+    for _, _, delta in sorted(events):
+        busy += delta
+        width = max(width, busy)
+
+    # Latest finish that does not delay the workflow
+    latest = {}
+    for job_id in reversed(order):
+        dependents = [d for d in graph if job_id in graph[d]['needs']]
+        latest[job_id] = min((latest[d] - minutes[d] for d in dependents), default=wall)
+
+    jobs = {}
+    for job_id, job in graph.items():
+        halved = dict(minutes, **{job_id: minutes[job_id] / 2})
+        _, faster = longest_path(graph, order, halved)
+        jobs[job_id] = {
+            'needs': job['needs'],
+            'legs': job['legs'],
+            'minutes': round(minutes[job_id], 2),
+            'runner_minutes': round(leg_minutes[job_id] * job['legs'], 2),
+            'measured': measured[job_id],
+            'start': round(start[job_id], 2),
+            'finish': round(finish[job_id], 2),
+            'slack': round(latest[job_id] - finish[job_id], 2),
+            'gain_if_halved': round(wall - max(faster.values(), default=0.0), 2)
+        }
+
+    candidates = sorted((j for j in jobs if jobs[j]['gain_if_halved'] > 0),
+                        key=lambda j: -jobs[j]['gain_if_halved'])
+    return {
+        'wall_minutes': round(wall, 2),
+        'runner_minutes': round(sum(j['runner_minutes'] for j in jobs.values()), 2),
+        'critical_path': path,
+        'parallelism': width,
+        'jobs': jobs,
+        'speedup_candidates': candidates
+    }
+
+def analyze_workflows(workflow_files, durations_path=None):
+    """Analyze every parseable workflow, with durations keyed by workflow filename."""
+    durations = {}
+    if durations_path:
+        durations = json.loads(Path(durations_path).read_text(encoding='utf-8'))
+
+    analysis = {}
+    for filepath in workflow_files:
+        name = Path(filepath).name
+        try:
+            _, data = load_workflow(Path(filepath).read_text(encoding='utf-8'))
+            analysis[name] = analyze_workflow(data, durations.get(name))
+        except (yaml.YAMLError, ValueError) as e:
+            analysis[name] = {'error': str(e).splitlines()[0]}
+    return analysis
+
+def print_analysis(analysis):
+    """Print the critical path and cost of each workflow."""
+    print(f"🕸️  Job graph analysis for {len(analysis)} workflows\n")
+
+    total_runner = 0.0
+    for name, result in analysis.items():
+        if 'error' in result:
+            print(f"❌ {name}: {result['error']}")
+            continue
+        total_runner += result['runner_minutes']
+        print(f"📄 {name}")
+        print(f"   Wall time: {result['wall_minutes']} min | Runner minutes: {result['runner_minutes']} "
+              f"| Parallelism: {result['parallelism']}")
+        print(f"   Critical path: {' -> '.join(result['critical_path']) or '-'}")
+        for job_id in result['speedup_candidates'][:3]:
+            job = result['jobs'][job_id]
+            estimated = '' if job['measured'] else ' (estimated)'
+            print(f"   ⚡ {job_id}: halving it saves {job['gain_if_halved']} min{estimated}")
+
+    print(f"\n📊 Total runner minutes per full run of every workflow: {round(total_runner, 2)}")
+
+# Events simulated against sampled changes; pull_request runs again on every push to the PR branch
+CHANGE_EVENTS = ('push', 'pull_request', 'pull_request_target')
+
+def workflow_triggers(data):
+    """The workflow's 'on' section as a mapping of event to filters."""
+    on = data.get('on') if isinstance(data, dict) else None
+    if isinstance(on, str):
+        return {on: {}}
+    if isinstance(on, list):
+        return {str(event): {} for event in on}
+    if isinstance(on, dict):
+        return {str(event): filters if isinstance(filters, dict) else {} for event, filters in on.items()}
+    return {}
+
+def concurrency_status(data):
+    """
+    How runs of a workflow are deduplicated: 'cancel', 'queue' or 'none'.
+
+    A workflow-level group counts, as does a group on every job. Expressions
+    for cancel-in-progress are treated as cancelling.
+    """
+    def status(concurrency):
+        if isinstance(concurrency, str):
+            return 'queue'
+        if isinstance(concurrency, dict) and concurrency.get('group'):
+            return 'cancel' if concurrency.get('cancel-in-progress') not in (None, False) else 'queue'
+        return 'none'
+
+    workflow = status(data.get('concurrency'))
+    if workflow != 'none':
+        return workflow
+    jobs = data.get('jobs') if isinstance(data.get('jobs'), dict) else {}
+    job_statuses = {status(job.get('concurrency')) for job in jobs.values() if isinstance(job, dict)}
+    if not job_statuses or 'none' in job_statuses:
+        return 'none'
+    return 'queue' if 'queue' in job_statuses else 'cancel'
+
+@lru_cache(maxsize=None)
+def filter_pattern(pattern):
+    """Compile a GitHub branch or path filter pattern."""
+    regex = []
+    i = 0
+    while i < len(pattern):
+        char = pattern[i]
+        if pattern.startswith('**', i):
+            regex.append('.*')
+            i += 2
+            continue
+        if char == '*':
+            regex.append('[^/]*')
+        elif char in '?+':
+            regex.append(char)
+        elif char == '[':
+            end = pattern.find(']', i)
+            if end == -1:
+                regex.append(re.escape(char))
+            else:
+                regex.append(pattern[i:end + 1])
+                i = end
+        else:
+            regex.append(re.escape(char))
+        i += 1
+    return re.compile(''.join(regex) + r'\Z')
+
+def filter_includes(patterns, value):
+    """Whether the last pattern matching value is a positive one."""
+    included = False
+    for pattern in patterns:
+        negated = pattern.startswith('!')
+        if filter_pattern(pattern[1:] if negated else pattern).match(value):
+            included = not negated
+    return included
+
+def event_fires(event, filters, branch, changed_files):
+    """Whether an event with these filters fires for a change to branch touching changed_files."""
+    if event.startswith('pull_request'):
+        types = filters.get('types')
+        if types and 'synchronize' not in types:
+            return False
+    elif ('tags' in filters or 'tags-ignore' in filters) and not (
+            'branches' in filters or 'branches-ignore' in filters):
+        # A push filtered only on tags does not run for branch pushes
+        return False
+
+    if 'branches' in filters and not filter_includes(filters['branches'] or [], branch):
+        return False
+    if 'branches-ignore' in filters and filter_includes(filters['branches-ignore'] or [], branch):
+        return False
+
+    if 'paths' in filters:
+        return any(filter_includes(filters['paths'] or [], path) for path in changed_files)
+    if 'paths-ignore' in filters:
+        return not all(filter_includes(filters['paths-ignore'] or [], path) for path in changed_files)
+    return True
+
+def recent_changes(limit=50, repo='.'):
+    """Files changed by each of the last ``limit`` commits reachable from HEAD."""
+    result = subprocess.run(
+        ['git', 'log', f'-n{limit}', '--no-merges', '--format=%x00%H', '--name-only', 'HEAD'],
+        cwd=repo, capture_output=True, text=True, check=True
+    )
+    changes = []
+    for chunk in result.stdout.split('\0')[1:]:
+        lines = [line for line in chunk.splitlines() if line]
+        if len(lines) > 1:
+            changes.append({'sha': lines[0], 'files': lines[1:]})
+    return changes
+
+def analyze_triggers(workflow_files, changes, branch='main'):
+    """
+    Which workflows fire together and how many runs each push wastes.
+
+    Every sampled commit is replayed as a push to ``branch`` and as a push
+    to a pull request targeting it. A run is counted as redundant when the
+    same commit also runs the workflow through another event, or when a
+    pull_request workflow has no cancel-in-progress group, so the run for
+    the superseded commit keeps going after the next push.
+    """
+    workflows = {}
+    for filepath in workflow_files:
+        name = Path(filepath).name
+        try:
+            _, data = load_workflow(Path(filepath).read_text(encoding='utf-8'))
+        except yaml.YAMLError as e:
+            workflows[name] = {'error': str(e).splitlines()[0]}
+            continue
+        triggers = workflow_triggers(data)
+        workflows[name] = {
+            'events': sorted(triggers),
+            'concurrency': concurrency_status(data) if isinstance(data, dict) else 'none',
+            'triggers': triggers,
+            'fired': {}
+        }
+
+    parsed = {name: w for name, w in workflows.items() if 'error' not in w}
+    co_fired = {}
+    totals = {'runs': 0, 'redundant': 0}
+    for change in changes:
+        for name, workflow in parsed.items():
+            events = [e for e in CHANGE_EVENTS if e in workflow['triggers']
+                      and event_fires(e, workflow['triggers'][e], branch, change['files'])]
+            for event in events:
+                workflow['fired'][event] = workflow['fired'].get(event, 0) + 1
+            totals['runs'] += len(events)
+            # Push plus pull_request on the same change, and stale PR runs left running
+            redundant = max(len(events) - 1, 0)
+            if workflow['concurrency'] != 'cancel' and any(e.startswith('pull_request') for e in events):
+                redundant += 1
+            totals['redundant'] += redundant
+            workflow.setdefault('redundant', 0)
+            workflow['redundant'] += redundant
+
+        for event in CHANGE_EVENTS:
+            firing = sorted(name for name, w in parsed.items() if event in w['triggers']
+                            and event_fires(event, w['triggers'][event], branch, change['files']))
+            for i, first in enumerate(firing):
+                for second in firing[i + 1:]:
+                    key = (event, first, second)
+                    co_fired[key] = co_fired.get(key, 0) + 1
+
+    overlaps = [
+        {'event': event, 'workflows': [first, second], 'changes': count}
+        for (event, first, second), count in sorted(co_fired.items(), key=lambda item: -item[1])
+    ]
+    samples = len(changes) or 1
+    return {
+        'sampled_changes': len(changes),
+        'branch': branch,
+        'runs_per_push': round(totals['runs'] / samples, 2),
+        'redundant_runs_per_push': round(totals['redundant'] / samples, 2),
+        'missing_concurrency': sorted(n for n, w in parsed.items() if w['concurrency'] == 'none'),
+        'no_cancel_in_progress': sorted(n for n, w in parsed.items() if w['concurrency'] == 'queue'),
+        'overlaps': overlaps,
+        'workflows': {
+            name: {k: v for k, v in w.items() if k != 'triggers'} for name, w in workflows.items()
+        }
+    }
+
+def print_trigger_analysis(report):
+    """Print overlapping triggers and missing concurrency groups."""
+    print(f"🔁 Trigger analysis over {report['sampled_changes']} recent changes to '{report['branch']}'\n")
+    print(f"   Runs per push: {report['runs_per_push']}")
+    print(f"   Estimated redundant runs per push: {report['redundant_runs_per_push']}")
+
+    if report['missing_concurrency']:
+        print("\n⚠️  No concurrency group:")
+        for name in report['missing_concurrency']:
+            print(f"   - {name}")
+    if report['no_cancel_in_progress']:
+        print("\n⚠️  Concurrency group without cancel-in-progress:")
+        for name in report['no_cancel_in_progress']:
+            print(f"   - {name}")
+
+    if report['overlaps']:
+        print("\n🔀 Workflows firing on the same changes:")
+        for overlap in report['overlaps'][:10]:
+            first, second = overlap['workflows']
+            print(f"   - {overlap['event']}: {first} + {second} ({overlap['changes']} changes)")
+
+    for name, workflow in report['workflows'].items():
+        if 'error' in workflow:
+            print(f"\n❌ {name}: {workflow['error']}")
+
 def main():
     """Main entry point."""
     import argparse
@@ -127,31 +765,69 @@ def main():
                         help='Treat warnings as errors')
     parser.add_argument('--json', action='store_true',
                         help='Output results in JSON format')
+    parser.add_argument('--jobs', type=int, default=1,
+                        help='Validate changed files in a pool of this many processes (default: 1)')
+    parser.add_argument('--no-cache', action='store_true',
+                        help=f'Ignore and do not update the result cache ({DEFAULT_CACHE_PATH})')
+    parser.add_argument('--analyze', action='store_true',
+                        help='Report job graph critical paths and runner minutes instead of validating')
+    parser.add_argument('--durations', metavar='FILE',
+                        help='JSON of historical job or step durations in seconds, keyed by workflow file')
+    parser.add_argument('--triggers', action='store_true',
+                        help='Report overlapping triggers and missing concurrency groups instead of validating')
+    parser.add_argument('--branch', default='main',
+                        help='Branch that sampled changes are replayed against (default: main)')
+    parser.add_argument('--commits', type=int, default=50,
+                        help='Number of recent commits to sample for --triggers (default: 50)')
+    parser.add_argument('--benchmark', type=int, nargs='?', const=500, metavar='FILES',
+                        help='Time schema validation over synthetic workflows (default: 500)')
     
     args = parser.parse_args()
     
+    if args.benchmark:
+        if jsonschema is None:
+            print("❌ jsonschema is not installed; schema validation is disabled")
+            sys.exit(1)
+        report = benchmark_schema_validation(args.benchmark)
+        print(f"⏱️  Schema validation: {report['ms_per_file']} ms per file over {report['files']} files "
+              f"(budget {report['budget_ms_per_file']} ms)")
+        sys.exit(0 if report['within_budget'] else 1)
+    
+    if args.triggers:
+        report = analyze_triggers(find_workflow_files(args.dir), recent_changes(args.commits), args.branch)
+        if args.json:
+            print(json.dumps(report, indent=2))
+        else:
+            print_trigger_analysis(report)
+        sys.exit(0)
+    
+    if args.analyze:
+        analysis = analyze_workflows(find_workflow_files(args.dir), args.durations)
+        if args.json:
+            print(json.dumps(analysis, indent=2))
+        else:
+            print_analysis(analysis)
+        sys.exit(0)
+    
+    cache_path = None if args.no_cache else DEFAULT_CACHE_PATH
+    
     if args.json:
         # JSON output for CI integration
         results = []
-        workflow_path = Path(args.dir)
-        if workflow_path.exists():
-            for filepath in sorted(workflow_path.glob("*.yml")) + sorted(workflow_path.glob("*.yaml")):
-                errors, warnings = validate_yaml_file(filepath)
-                results.append({
-                    'file': str(filepath.relative_to(Path.cwd())),
-                    'errors': errors,
-                    'warnings': warnings,
-                    'valid': len(errors) == 0
-                })
+        if Path(args.dir).exists():
+            results = validate_workflows(find_workflow_files(args.dir), max(1, args.jobs), cache_path)
         print(json.dumps(results, indent=2))
         success = all(r['valid'] for r in results)
-        if args.strict:
-            success = success and all(len(r['warnings']) == 0 for r in results)
-        sys.exit(0 if success else 1)
     else:
         # Regular output
-        success = validate_all_workflows(args.dir)
-        sys.exit(0 if success else 1)
+        results = None
+        if Path(args.dir).exists():
+            results = validate_workflows(find_workflow_files(args.dir), max(1, args.jobs), cache_path)
+        success = validate_all_workflows(args.dir, results=results)
+        
+    if args.strict and results:
+        success = success and all(len(r['warnings']) == 0 for r in results)
+    sys.exit(0 if success else 1)
 
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    main()
@@ -11,9 +11,6 @@ document.addEventListener('DOMContentLoaded', function() {
   // Add copy buttons to code blocks (if not already present)
   safeExecute(enhanceCodeBlocks);
 
-  // Add status badges to proposals
-  safeExecute(addStatusBadges);
-
   // Track outbound links
   safeExecute(trackOutboundLinks);
 
@@ -25,6 +22,9 @@ document.addEventListener('DOMContentLoaded', function() {
 
   // Restore labels on generated cheat sheet lists
   safeExecute(labelCheatSheetLists);
+
+  // Show page dates relative to now
+  safeExecute(renderRelativeDates);
 });
 
 /**
@@ -179,41 +179,6 @@ function enhanceCodeBlocks() {
   });
 }
 
-/**
- * Add status badges to proposal titles
- */
-function addStatusBadges() {
-  const title = document.querySelector('.md-content h1');
-  if (!title) return;
-
-  // Check for status in page metadata or infer from path
-  const isDraft = window.location.pathname.includes('draft');
-  const isReview = document.querySelector('meta[name="status"]')?.content === 'review';
-  const isFinal = document.querySelector('meta[name="status"]')?.content === 'final';
-
-  let status = '';
-  let statusClass = '';
-
-  if (isDraft) {
-    status = 'Draft';
-    statusClass = 'status-draft';
-  } else if (isReview) {
-    status = 'In Review';
-    statusClass = 'status-review';
-  } else if (isFinal) {
-    status = 'Final';
-    statusClass = 'status-final';
-  }
-
-  if (status && !title.querySelector('.status-badge')) {
-    const badge = document.createElement('span');
-    badge.className = `status-badge ${statusClass}`;
-    badge.textContent = status;
-    badge.style.marginLeft = '1rem';
-    title.appendChild(badge);
-  }
-}
-
 /**
  * Track outbound links for analytics
  */
@@ -374,6 +339,34 @@ function addReadingTime() {
   }
 }
 
+/**
+ * Show page dates as relative times ("3 weeks ago")
+ * The build writes absolute dates, which are kept as the tooltip
+ */
+function renderRelativeDates() {
+  if (typeof Intl === 'undefined' || !Intl.RelativeTimeFormat) return;
+
+  const format = new Intl.RelativeTimeFormat(document.documentElement.lang || 'en', { numeric: 'auto' });
+  const units = [
+    ['year', 365 * 24 * 3600],
+    ['month', 30 * 24 * 3600],
+    ['week', 7 * 24 * 3600],
+    ['day', 24 * 3600],
+    ['hour', 3600],
+    ['minute', 60]
+  ];
+
+  document.querySelectorAll('.md-source-file .timeago[datetime]').forEach(element => {
+    const date = new Date(element.getAttribute('datetime'));
+    if (isNaN(date)) return;
+
+    const seconds = (date - Date.now()) / 1000;
+    const [unit, size] = units.find(([, size]) => Math.abs(seconds) >= size) || ['second', 1];
+    if (!element.title) element.title = element.textContent.trim();
+    element.textContent = format.format(Math.round(seconds / size), unit);
+  });
+}
+
 // Initialize reading time with error handling
 safeExecute(addReadingTime);
 
@@ -383,11 +376,11 @@ if (typeof document$ !== 'undefined') {
     safeExecute(addExploratoryNotice);
     safeExecute(enhanceLayerReferences);
     safeExecute(enhanceCodeBlocks);
-    safeExecute(addStatusBadges);
     safeExecute(trackOutboundLinks);
     safeExecute(improveAccessibility);
     safeExecute(highlightDiscussionPrompts);
     safeExecute(labelCheatSheetLists);
+    safeExecute(renderRelativeDates);
     safeExecute(addReadingTime);
   });
 }
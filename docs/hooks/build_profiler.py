@@ -0,0 +1,129 @@
+"""
+AILIS Build Profiler Hook
+
+Times MkDocs build events, per page and in total, to show where build time
+goes. Each profiled event gets a handler that runs first and one that runs
+last, so the measured time covers every plugin and hook for that event.
+
+Enable with MKDOCS_PROFILE=1. When it is not set no handlers are
+registered, so the hook costs nothing. At the end of the build a table of
+the slowest pages is logged and a JSON report is written to
+MKDOCS_PROFILE_REPORT (default: build-profile.json).
+"""
+
+import json
+import logging
+import os
+import time
+
+from mkdocs.plugins import CombinedEvent, event_priority
+
+log = logging.getLogger('mkdocs.hooks.build_profiler')
+
+ENABLED = os.environ.get('MKDOCS_PROFILE', '').lower() in ('1', 'true', 'yes')
+REPORT_PATH = os.environ.get('MKDOCS_PROFILE_REPORT', 'build-profile.json')
+
+# Page column the console table is sorted by, and how many rows it shows
+SORT_BY = os.environ.get('MKDOCS_PROFILE_SORT', 'total_ms')
+TABLE_ROWS = 15
+
+PAGE_EVENTS = ('page_markdown', 'page_content', 'post_page')
+
+started = {}
+events = {}
+pages = {}
+
+
+def reset(config=None) -> None:
+    """Forget timings from a previous build."""
+    started.clear()
+    events.clear()
+    pages.clear()
+
+
+def page_key(page) -> str:
+    file = getattr(page, 'file', None)
+    return getattr(file, 'src_path', None) or str(page)
+
+
+def start_timer(event: str):
+    """A first-priority handler that notes when an event starts."""
+    @event_priority(100)
+    def start(*args, page=None, **kwargs):
+        started[event, page_key(page) if page is not None else None] = time.perf_counter()
+
+    return start
+
+
+def stop_timer(event: str):
+    """A last-priority handler that records how long an event took."""
+    @event_priority(-100)
+    def stop(*args, page=None, **kwargs):
+        key = page_key(page) if page is not None else None
+        began = started.pop((event, key), None)
+        if began is None:
+            return
+        elapsed = (time.perf_counter() - began) * 1000
+
+        totals = events.setdefault(event, {'calls': 0, 'total_ms': 0.0, 'max_ms': 0.0})
+        totals['calls'] += 1
+        totals['total_ms'] += elapsed
+        totals['max_ms'] = max(totals['max_ms'], elapsed)
+
+        if key is not None:
+            timings = pages.setdefault(key, {'page': key, 'total_ms': 0.0})
+            timings[f'{event}_ms'] = timings.get(f'{event}_ms', 0.0) + elapsed
+            timings['total_ms'] += elapsed
+
+        if event == 'post_build':
+            write_report()
+
+    return stop
+
+
+def build_report() -> dict:
+    """Event totals and per-page timings, slowest pages first."""
+    rows = [
+        {name: round(value, 3) if isinstance(value, float) else value for name, value in timings.items()}
+        for timings in pages.values()
+    ]
+    return {
+        'events': {
+            name: {'calls': t['calls'], 'total_ms': round(t['total_ms'], 3), 'max_ms': round(t['max_ms'], 3)}
+            for name, t in events.items()
+        },
+        'pages': sorted(rows, key=lambda row: row['total_ms'], reverse=True)
+    }
+
+
+def format_table(report: dict, sort_by: str = SORT_BY, rows: int = TABLE_ROWS) -> str:
+    """Render the slowest pages and event totals as a text table."""
+    columns = ['total_ms'] + [f'{event}_ms' for event in PAGE_EVENTS]
+    ordered = sorted(report['pages'], key=lambda row: row.get(sort_by, 0), reverse=True)[:rows]
+    width = max([len('Page')] + [len(row['page']) for row in ordered])
+
+    lines = [f"{'Page':<{width}}  " + '  '.join(f'{c:>18}' for c in columns)]
+    for row in ordered:
+        lines.append(f"{row['page']:<{width}}  " + '  '.join(f"{row.get(c, 0):>18.2f}" for c in columns))
+    lines.append('')
+    for name, totals in report['events'].items():
+        lines.append(f"{name:<14} {totals['calls']:>5} calls  {totals['total_ms']:>10.2f} ms total  "
+                     f"{totals['max_ms']:>8.2f} ms max")
+    return '\n'.join(lines)
+
+
+def write_report() -> None:
+    report = build_report()
+    with open(REPORT_PATH, 'w', encoding='utf-8') as f:
+        json.dump(report, f, indent=2)
+    log.info("Build profile (slowest pages by %s):\n%s", SORT_BY, format_table(report))
+    log.info("Build profile written to %s", REPORT_PATH)
+
+
+if ENABLED:
+    on_pre_build = reset
+    on_files = CombinedEvent(start_timer('files'), stop_timer('files'))
+    on_page_markdown = CombinedEvent(start_timer('page_markdown'), stop_timer('page_markdown'))
+    on_page_content = CombinedEvent(start_timer('page_content'), stop_timer('page_content'))
+    on_post_page = CombinedEvent(start_timer('post_page'), stop_timer('post_page'))
+    on_post_build = CombinedEvent(start_timer('post_build'), stop_timer('post_build'))
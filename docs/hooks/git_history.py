@@ -0,0 +1,287 @@
+"""
+AILIS Git History Hook
+
+Supplies each page's creation date, last update date and authors from one
+walk of the repository history, instead of running git once or more per
+page. The history index is built in on_config with a single `git log`, and
+authors are counted with one batched `git blame` pass over the pages that
+show them. Both are cached in .github/.cache/git-history.json: the index is
+reused while HEAD is unchanged, and blame results are kept per blob, so
+only files that changed are blamed again.
+
+Dates are exposed the way the theme expects them (page.meta's
+git_revision_date_localized and git_creation_date_localized), and authors
+as the git_info template variable.
+"""
+
+import fnmatch
+import json
+import logging
+import os
+import subprocess
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timezone
+from mkdocs.config import Config
+from mkdocs.structure.pages import Page
+
+log = logging.getLogger('mkdocs.hooks.git_history')
+
+# Part of the cache; bump whenever the cached data changes shape
+HOOK_VERSION = '1'
+
+CACHE_PATH = os.path.join('.github', '.cache', 'git-history.json')
+
+# Pages that do not list authors (paths relative to docs/, fnmatch patterns)
+AUTHORS_EXCLUDE = [
+    'index.md',
+    'README.md',
+    'CONTRIBUTING.md',
+    'FEEDBACK.md',
+    'CHANGELOG.md',
+    'LICENSE',
+    'proposals/*',
+    'reference/*',
+    'studies/*',
+]
+
+# Concurrent git blame processes
+BLAME_WORKERS = 8
+
+# Marks the start of each commit in the `git log` output
+COMMIT_MARKER = '\x1e'
+
+DATE_FORMAT = '%B %d, %Y'
+
+state = {'root': None, 'head': None, 'history': {}, 'blame': {}}
+pages = {}
+
+
+def git(*args, cwd=None) -> str:
+    result = subprocess.run(
+        ['git', '-c', 'core.quotePath=false', *args],
+        cwd=cwd, capture_output=True, text=True, encoding='utf-8', check=True
+    )
+    return result.stdout
+
+
+def parse_log(output: str) -> dict:
+    """
+    Index `git log --name-status` output by file.
+
+    The log runs newest first, so renames are followed by remembering where
+    each old path went: older commits touching it count for the new path.
+
+    Returns:
+        Path to {'created', 'updated'} timestamps and 'commits' in the file's history
+    """
+    history = {}
+    renamed_to = {}
+
+    def current(path):
+        seen = set()
+        while path in renamed_to and path not in seen:
+            seen.add(path)
+            path = renamed_to[path]
+        return path
+
+    for block in output.split(COMMIT_MARKER):
+        lines = block.strip('\n').split('\n')
+        header = lines[0].split('\t')
+        if len(header) < 2 or not header[1].isdigit():
+            continue
+        timestamp = int(header[1])
+
+        for line in lines[1:]:
+            parts = line.split('\t')
+            if len(parts) < 2:
+                continue
+            if parts[0].startswith(('R', 'C')) and len(parts) == 3:
+                path = current(parts[2])
+                if parts[0].startswith('R'):
+                    renamed_to[parts[1]] = path
+            else:
+                path = current(parts[1])
+
+            entry = history.setdefault(path, {'created': timestamp, 'updated': timestamp, 'commits': 0})
+            entry['created'] = min(entry['created'], timestamp)
+            entry['updated'] = max(entry['updated'], timestamp)
+            entry['commits'] += 1
+
+    return history
+
+
+def parse_blame(output: str) -> list:
+    """
+    Count non-empty lines per author in `git blame --line-porcelain` output.
+
+    Returns:
+        [name, email, lines] rows, most lines first
+    """
+    counts = {}
+    name = email = None
+    for line in output.split('\n'):
+        if line.startswith('author '):
+            name = line[len('author '):]
+        elif line.startswith('author-mail '):
+            email = line[len('author-mail '):].strip('<>')
+        elif line.startswith('\t'):
+            if line.strip() and name is not None:
+                key = (name, email)
+                counts[key] = counts.get(key, 0) + 1
+
+    rows = [[name, email, lines] for (name, email), lines in counts.items()]
+    return sorted(rows, key=lambda row: (-row[2], row[0]))
+
+
+def load_cache(path: str) -> dict:
+    try:
+        with open(path, encoding='utf-8') as f:
+            cache = json.load(f)
+    except (OSError, ValueError):
+        return {}
+    return cache if cache.get('version') == HOOK_VERSION else {}
+
+
+def save_cache(path: str) -> None:
+    try:
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with open(path, 'w', encoding='utf-8') as f:
+            json.dump({
+                'version': HOOK_VERSION,
+                'head': state['head'],
+                'history': state['history'],
+                'blame': state['blame'],
+            }, f)
+    except OSError as e:
+        log.warning("Could not write git history cache %s: %s", path, e)
+
+
+def on_config(config: Config) -> Config:
+    """Build (or reuse) the history index for the current HEAD."""
+    docs_dir = config['docs_dir']
+    try:
+        root = git('rev-parse', '--show-toplevel', cwd=docs_dir).strip()
+        head = git('rev-parse', 'HEAD', cwd=root).strip()
+    except (OSError, subprocess.CalledProcessError) as e:
+        log.warning("Git history unavailable, using the build date for every page: %s", e)
+        state.update(root=None, head=None, history={})
+        return config
+
+    if state['root'] == root and state['head'] == head:
+        return config
+
+    cache_path = os.path.join(root, CACHE_PATH)
+    cache = load_cache(cache_path)
+    state['root'] = root
+    state['blame'] = cache.get('blame', {})
+
+    if cache.get('head') == head:
+        state['head'] = head
+        state['history'] = cache['history']
+        log.debug("Git history for %s loaded from cache", head[:7])
+        return config
+
+    started = time.perf_counter()
+    output = git('log', f'--format={COMMIT_MARKER}%H\t%at', '--name-status', '-M', cwd=root)
+    state['head'] = head
+    state['history'] = parse_log(output)
+    log.debug("Indexed git history of %d files in %.0f ms",
+              len(state['history']), (time.perf_counter() - started) * 1000)
+    save_cache(cache_path)
+    return config
+
+
+def repo_path(abs_path: str) -> str:
+    """The tracked path of a docs file, following symlinks into the repository."""
+    return os.path.relpath(os.path.realpath(abs_path), state['root']).replace(os.sep, '/')
+
+
+def shows_authors(src_path: str) -> bool:
+    return not any(fnmatch.fnmatch(src_path, pattern) for pattern in AUTHORS_EXCLUDE)
+
+
+def blame(path: str) -> list:
+    try:
+        return parse_blame(git('blame', '--line-porcelain', 'HEAD', '--', path, cwd=state['root']))
+    except subprocess.CalledProcessError:
+        return []
+
+
+def on_files(files, config: Config):
+    """Look up every page in the index, blaming the pages that list authors."""
+    pages.clear()
+    if state['root'] is None:
+        return files
+
+    blobs = {}
+    for line in git('ls-files', '-s', cwd=state['root']).splitlines():
+        info, _, path = line.partition('\t')
+        blobs[path] = info.split()[1]
+
+    wanted = {}
+    for file in files.documentation_pages():
+        path = repo_path(file.abs_src_path)
+        pages[file.src_path] = {'path': path, 'blob': blobs.get(path)}
+        blob = blobs.get(path)
+        if blob and shows_authors(file.src_path) and blob not in state['blame']:
+            wanted[blob] = path
+
+    if wanted:
+        started = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=BLAME_WORKERS) as pool:
+            for blob, rows in zip(wanted, pool.map(blame, wanted.values())):
+                state['blame'][blob] = rows
+        log.debug("Blamed %d files in %.0f ms", len(wanted), (time.perf_counter() - started) * 1000)
+
+        # Drop blame results for blobs that are no longer part of the site
+        current = {entry['blob'] for entry in pages.values()}
+        state['blame'] = {blob: rows for blob, rows in state['blame'].items() if blob in current}
+        save_cache(os.path.join(state['root'], CACHE_PATH))
+
+    return files
+
+
+def format_date(timestamp: int) -> str:
+    """A date the theme shows as-is and extra.js turns into a relative time."""
+    moment = datetime.fromtimestamp(timestamp, tz=timezone.utc)
+    return f'<span class="timeago" datetime="{moment.isoformat()}">{moment.strftime(DATE_FORMAT)}</span>'
+
+
+def page_history(src_path: str) -> dict:
+    """Creation and update timestamps for a page, falling back to the build time."""
+    entry = pages.get(src_path)
+    history = state['history'].get(entry['path']) if entry else None
+    if history is None:
+        now = int(time.time())
+        return {'created': now, 'updated': now}
+    return history
+
+
+def page_authors(src_path: str) -> list:
+    """Authors of a page with their line counts and share, most lines first."""
+    entry = pages.get(src_path)
+    if not entry or not shows_authors(src_path):
+        return []
+    rows = state['blame'].get(entry['blob']) or []
+    total = sum(row[2] for row in rows) or 1
+    return [
+        {'name': name, 'email': email, 'lines': lines, 'contribution': round(lines / total * 100, 2)}
+        for name, email, lines in rows
+    ]
+
+
+def on_page_markdown(markdown: str, page: Page, config: Config, files) -> str:
+    """Add the page's dates to its metadata."""
+    history = page_history(page.file.src_path)
+    page.meta['git_revision_date_localized'] = format_date(history['updated'])
+    page.meta['git_creation_date_localized'] = format_date(history['created'])
+    return markdown
+
+
+def on_page_context(context: dict, page: Page, config: Config, nav) -> dict:
+    """Expose the page's authors to the source-file partial."""
+    authors = page_authors(page.file.src_path)
+    if authors:
+        context['git_info'] = {'page_authors': authors}
+    return context
@@ -3,11 +3,138 @@ AILIS Proposal Metadata Hook
 
 Automatically extracts and processes metadata from proposal documents.
 Enhances proposals with status, authors, and other RFC-style metadata.
+
+A registry of every proposal is built once per build in on_files. It adds
+status badges to proposal titles, fills any page containing the
+REGISTRY_MARKER comment with a table of proposals, and is published as
+proposals/index.json.
 """
 
+import hashlib
+import json
+import logging
+import posixpath
 import re
+import time
+from collections import OrderedDict
+from mkdocs.structure.files import File
 from mkdocs.structure.pages import Page
 from mkdocs.config import Config
+from mkdocs.utils import meta as front_matter
+
+log = logging.getLogger('mkdocs.hooks.proposal_metadata')
+
+# Part of every cache key; bump whenever the generated markdown changes
+HOOK_VERSION = '2'
+
+# Processed pages kept across rebuilds of `mkdocs serve`, least recently used first
+CACHE_SIZE = 512
+page_cache = OrderedDict()
+cache_stats = {'hits': 0, 'misses': 0}
+
+# Metadata is only read from the top of a page; this many lines at most
+HEADER_LINES = 30
+
+# One pass over the header finds every field; indentation is allowed
+METADATA_PATTERN = re.compile(
+    r'^[ \t]*(?P<key>Status|Authors?|Date|RFC|Proposal|Version)[ \t]*:[ \t]*(?P<value>\S.*?)[ \t]*$',
+    re.MULTILINE | re.IGNORECASE
+)
+FIRST_HEADING_PATTERN = re.compile(r'^# .+$', re.MULTILINE)
+
+# Metadata key (lowercased) to the field it fills
+METADATA_FIELDS = {
+    'status': 'status',
+    'author': 'authors',
+    'authors': 'authors',
+    'date': 'date',
+    'rfc': 'rfc',
+    'proposal': 'rfc',
+    'version': 'version',
+}
+
+# Proposal source path to its registry entry, rebuilt on every build
+registry = {}
+
+REGISTRY_PATH = 'proposals/index.json'
+
+# Replaced with a table of all proposals wherever it appears in a page
+REGISTRY_MARKER = '<!-- proposal-registry -->'
+
+# First word of a status (lowercased) to its badge label and class
+STATUS_BADGES = {
+    'draft': ('Draft', 'status-draft'),
+    'review': ('In Review', 'status-review'),
+    'final': ('Final', 'status-final'),
+    'declined': ('Declined', 'status-declined'),
+}
+
+FIRST_H1_END_PATTERN = re.compile(r'<h1\b[^>]*>.*?(?=</h1>)', re.DOTALL)
+
+
+def is_proposal(src_path: str) -> bool:
+    return src_path.startswith('proposals/') and src_path.rsplit('/', 1)[-1] not in ('index.md', 'README.md')
+
+
+def on_files(files, config: Config):
+    """
+    Build the proposal registry and publish it as a static JSON file.
+
+    Each proposal's header is read once here; later events look pages up
+    instead of re-deriving their metadata.
+    """
+    registry.clear()
+    for file in files.documentation_pages():
+        if not is_proposal(file.src_path):
+            continue
+        try:
+            markdown, meta = front_matter.get_data(file.content_string)
+        except (OSError, ValueError) as e:
+            print(f"Warning: Failed to read proposal {file.src_path}: {e}")
+            continue
+        registry[file.src_path] = registry_entry(file, markdown, meta)
+
+    entries = [
+        {field: value for field, value in entry.items() if field != 'metadata'}
+        for entry in sorted(registry.values(), key=lambda entry: entry['path'])
+    ]
+    files.append(File.generated(
+        config, REGISTRY_PATH,
+        content=json.dumps({'proposals': entries}, indent=2, ensure_ascii=False)
+    ))
+    return files
+
+
+def registry_entry(file, markdown: str, meta: dict) -> dict:
+    """The registry record of one proposal."""
+    metadata = extract_metadata(markdown, meta)
+    heading = FIRST_HEADING_PATTERN.search(header_region(markdown))
+    title = meta.get('title') or (heading.group(0)[2:].strip() if heading else file.name)
+    return {
+        'path': file.src_path,
+        'url': file.url,
+        'title': str(title),
+        'status': metadata.get('status'),
+        'authors': metadata.get('authors'),
+        'date': metadata.get('date'),
+        'rfc': metadata.get('rfc'),
+        'version': metadata.get('version'),
+        'metadata': metadata,
+    }
+
+
+def registry_table(src_path: str = '') -> str:
+    """A markdown table of all registered proposals, linked relative to the page."""
+    if not registry:
+        return '_No proposals yet._'
+
+    base = posixpath.dirname(src_path)
+    lines = ['| Proposal | Status | Authors | Date | RFC |', '| --- | --- | --- | --- | --- |']
+    for entry in sorted(registry.values(), key=lambda entry: entry['path']):
+        cells = [f"[{entry['title']}]({posixpath.relpath(entry['path'], base or '.')})"]
+        cells += [entry[field] or '—' for field in ('status', 'authors', 'date', 'rfc')]
+        lines.append('| ' + ' | '.join(cell.replace('|', '\\|') for cell in cells) + ' |')
+    return '\n'.join(lines)
 
 
 def on_page_markdown(markdown: str, page: Page, config: Config, files) -> str:
@@ -27,33 +154,93 @@ def on_page_markdown(markdown: str, page: Page, config: Config, files) -> str:
         # Validate inputs
         if not isinstance(markdown, str):
             print(f"Warning: markdown is not a string (type: {type(markdown)})")
-            return markdown or ""
+            return "" if markdown is None else markdown
 
         if not hasattr(page, 'file') or not hasattr(page.file, 'src_path'):
             print("Warning: Invalid page object - missing file.src_path")
             return markdown
 
+        if REGISTRY_MARKER in markdown:
+            markdown = markdown.replace(REGISTRY_MARKER, registry_table(page.file.src_path))
+
         # Only process proposal pages
         if not page.file.src_path.startswith('proposals/'):
             return markdown
 
-        # Extract metadata from frontmatter or content
-        metadata = extract_metadata(markdown)
-
-        # Add metadata box if we found any
-        if metadata:
-            metadata_box = format_metadata_box(metadata)
-            # Insert after the first heading
-            markdown = insert_after_first_heading(markdown, metadata_box)
-
-        return markdown
+        return process_proposal(page.file.src_path, markdown, getattr(page, 'meta', None))
     except Exception as e:
         # Log error but don't fail the build
         print(f"Warning: Failed to process metadata for {page.file.src_path}: {e}")
         return markdown
 
 
-def extract_metadata(markdown: str) -> dict:
+def process_proposal(src_path: str, markdown: str, meta: dict = None) -> str:
+    """
+    Add the metadata box to a proposal, reusing the result of earlier builds.
+
+    Results are keyed by source path, a hash of the content and front
+    matter, and HOOK_VERSION, so an edited page or a changed hook is never
+    served stale. At most CACHE_SIZE pages are kept.
+    """
+    digest = hashlib.sha256(markdown.encode('utf-8'))
+    if meta:
+        digest.update(json.dumps(meta, sort_keys=True, default=str).encode('utf-8'))
+    key = (src_path, digest.hexdigest(), HOOK_VERSION)
+
+    if key in page_cache:
+        page_cache.move_to_end(key)
+        cache_stats['hits'] += 1
+        return page_cache[key]
+    cache_stats['misses'] += 1
+
+    # Reuse the registry's metadata, read from this same source in on_files
+    entry = registry.get(src_path)
+    metadata = entry['metadata'] if entry else extract_metadata(markdown, meta)
+
+    # Add metadata box if we found any
+    if metadata:
+        metadata_box = format_metadata_box(metadata)
+        # Insert after the first heading
+        markdown = insert_after_first_heading(markdown, metadata_box)
+
+    page_cache[key] = markdown
+    if len(page_cache) > CACHE_SIZE:
+        page_cache.popitem(last=False)
+    return markdown
+
+
+def on_post_build(config: Config) -> None:
+    """Log and reset the page cache counters for this build."""
+    log.debug(
+        "Proposal metadata cache: %d hits, %d misses, %d pages cached",
+        cache_stats['hits'], cache_stats['misses'], len(page_cache)
+    )
+    cache_stats['hits'] = cache_stats['misses'] = 0
+
+
+def header_region(markdown: str, max_lines: int = HEADER_LINES) -> str:
+    """
+    Return the leading part of a page where metadata can appear.
+
+    That is the first ``max_lines`` lines, cut short at the first
+    second-level heading, which starts the body. Only the header is
+    searched, so the cost does not grow with the length of the page.
+    """
+    end = 0
+    for _ in range(max_lines):
+        end = markdown.find('\n', end) + 1
+        if end == 0:
+            end = len(markdown)
+            break
+
+    header = markdown[:end]
+    if header.startswith('## '):
+        return ''
+    body = header.find('\n## ')
+    return header if body == -1 else header[:body + 1]
+
+
+def extract_metadata(markdown: str, meta: dict = None) -> dict:
     """
     Extract metadata from markdown content.
 
@@ -62,35 +249,50 @@ def extract_metadata(markdown: str) -> dict:
     - Author: Name
     - Date: YYYY-MM-DD
     - RFC: Number
+
+    When the page has YAML front matter, MkDocs has already parsed it into
+    ``meta`` and those values are used instead. Otherwise one compiled
+    pattern scans the header region; the first value of each field wins.
     """
     metadata = {}
 
-    # Status pattern
-    status_match = re.search(r'^Status:\s*(.+)$', markdown, re.MULTILINE | re.IGNORECASE)
-    if status_match:
-        metadata['status'] = status_match.group(1).strip()
+    for key, value in (meta or {}).items():
+        field = METADATA_FIELDS.get(str(key).lower())
+        if field and field not in metadata and value not in (None, ''):
+            if isinstance(value, (list, tuple)):
+                value = ', '.join(str(v) for v in value)
+            metadata[field] = str(value).strip()
+    if metadata:
+        return metadata
+
+    wanted = len(set(METADATA_FIELDS.values()))
+    for match in METADATA_PATTERN.finditer(header_region(markdown)):
+        field = METADATA_FIELDS[match.group('key').lower()]
+        if field not in metadata:
+            metadata[field] = match.group('value')
+            if len(metadata) == wanted:
+                break
 
-    # Author pattern
-    author_match = re.search(r'^Authors?:\s*(.+)$', markdown, re.MULTILINE | re.IGNORECASE)
-    if author_match:
-        metadata['authors'] = author_match.group(1).strip()
-
-    # Date pattern
-    date_match = re.search(r'^Date:\s*(.+)$', markdown, re.MULTILINE | re.IGNORECASE)
-    if date_match:
-        metadata['date'] = date_match.group(1).strip()
+    return metadata
 
-    # RFC/Proposal number pattern
-    rfc_match = re.search(r'^(?:RFC|Proposal):\s*(.+)$', markdown, re.MULTILINE | re.IGNORECASE)
-    if rfc_match:
-        metadata['rfc'] = rfc_match.group(1).strip()
 
-    # Version pattern
-    version_match = re.search(r'^Version:\s*(.+)$', markdown, re.MULTILINE | re.IGNORECASE)
-    if version_match:
-        metadata['version'] = version_match.group(1).strip()
+def benchmark_extraction(lengths=(1_000, 100_000, 1_000_000), repeat=200) -> dict:
+    """
+    Time extract_metadata on proposals whose bodies differ in length.
 
-    return metadata
+    Returns microseconds per page for each body length in characters; with
+    header-only scanning these stay roughly flat.
+    """
+    header = "Status: Draft\nAuthors: Jane Smith\nDate: 2025-01-15\n\n# Proposal\n\n"
+    paragraph = "Body text with Status: words and Date: mentions that are not metadata.\n"
+    results = {}
+    for length in lengths:
+        markdown = header + "## Section\n\n" + paragraph * (length // len(paragraph) + 1)
+        start = time.perf_counter()
+        for _ in range(repeat):
+            extract_metadata(markdown)
+        results[length] = round((time.perf_counter() - start) / repeat * 1_000_000, 2)
+    return results
 
 
 def format_metadata_box(metadata: dict) -> str:
@@ -143,7 +345,7 @@ def insert_after_first_heading(markdown: str, content: str) -> str:
         Modified markdown
     """
     # Find first H1 heading
-    heading_match = re.search(r'^# .+$', markdown, re.MULTILINE)
+    heading_match = FIRST_HEADING_PATTERN.search(markdown)
 
     if heading_match:
         insert_pos = heading_match.end()
@@ -153,6 +355,17 @@ def insert_after_first_heading(markdown: str, content: str) -> str:
     return content + '\n\n' + markdown
 
 
+def add_status_badge(html: str, status: str) -> str:
+    """Append a status badge to the first H1 heading, for known statuses."""
+    badge = STATUS_BADGES.get(status.split()[0].lower())
+    if badge is None or 'class="status-badge' in html:
+        return html
+    label, css_class = badge
+    return FIRST_H1_END_PATTERN.sub(
+        lambda match: f'{match.group(0)}<span class="status-badge {css_class}">{label}</span>', html, count=1
+    )
+
+
 def on_page_content(html: str, page: Page, config: Config, files) -> str:
     """
     Post-process HTML content.
@@ -171,8 +384,17 @@ def on_page_content(html: str, page: Page, config: Config, files) -> str:
         if page.file.src_path.startswith('proposals/'):
             html = html.replace('<article', '<article class="proposal-page"', 1)
 
+        entry = registry.get(page.file.src_path)
+        if entry and entry['status']:
+            html = add_status_badge(html, entry['status'])
+
         return html
     except Exception as e:
         # Log error but don't fail the build
         print(f"Warning: Failed to add proposal class to {page.file.src_path}: {e}")
         return html
+
+
+if __name__ == '__main__':
+    for length, micros in benchmark_extraction().items():
+        print(f"{length:>9} characters: {micros} µs per page")
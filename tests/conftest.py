@@ -0,0 +1,133 @@
+"""
+Shared fixtures for testing the repository scripts
+
+The automation scripts in .github/scripts are standalone files with hyphenated
+names, so they are loaded by path rather than imported as modules.
+"""
+
+import importlib.util
+import json
+import sys
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from urllib.parse import urlsplit, parse_qs
+
+import pytest
+
+SCRIPTS_DIR = Path(__file__).parent.parent / '.github' / 'scripts'
+FIXTURES_DIR = Path(__file__).parent / 'fixtures'
+
+
+@pytest.fixture(scope='session')
+def load_script():
+    """Return a loader that imports a script from .github/scripts by filename"""
+    if str(SCRIPTS_DIR) not in sys.path:
+        sys.path.insert(0, str(SCRIPTS_DIR))
+
+    loaded = {}
+
+    def _load(filename):
+        if filename not in loaded:
+            name = filename[:-3].replace('-', '_')
+            spec = importlib.util.spec_from_file_location(name, SCRIPTS_DIR / filename)
+            module = importlib.util.module_from_spec(spec)
+            sys.modules[name] = module
+            spec.loader.exec_module(module)
+            loaded[filename] = module
+        return loaded[filename]
+
+    return _load
+
+
+@pytest.fixture(scope='session')
+def load_fixture():
+    """Return a reader for recorded API responses in tests/fixtures"""
+    def _load(*parts):
+        return json.loads(FIXTURES_DIR.joinpath(*parts).read_text(encoding='utf-8'))
+
+    return _load
+
+
+class StubRequest:
+    """A request received by the stub server"""
+    def __init__(self, method, path, query, headers, body, client=None):
+        self.method = method
+        self.path = path
+        self.query = query
+        self.headers = headers
+        self.body = body
+        self.client = client
+
+
+class StubGitHub:
+    """
+    Minimal local stand-in for the GitHub API.
+
+    Routes map a path to a responder called with a StubRequest and returning
+    (status, headers, payload). Payloads are serialized as JSON.
+    """
+    def __init__(self):
+        self.routes = {}
+        self.requests = []
+        self.url = None
+
+    def route(self, path, responder):
+        self.routes[path] = responder
+
+    def handle(self, request):
+        self.requests.append(request)
+        responder = self.routes.get(request.path)
+        if responder is None:
+            return 404, {}, {'message': 'Not Found'}
+        return responder(request)
+
+
+@pytest.fixture
+def stub_github():
+    """Run a StubGitHub on a local port for the duration of a test"""
+    stub = StubGitHub()
+
+    class Handler(BaseHTTPRequestHandler):
+        # Keep-alive, so tests can see clients reusing connections
+        protocol_version = 'HTTP/1.1'
+
+        def _dispatch(self):
+            parts = urlsplit(self.path)
+            length = int(self.headers.get('Content-Length') or 0)
+            body = self.rfile.read(length) if length else b''
+            request = StubRequest(
+                self.command,
+                parts.path,
+                {k: v[0] for k, v in parse_qs(parts.query).items()},
+                dict(self.headers),
+                body,
+                self.client_address
+            )
+            status, headers, payload = stub.handle(request)
+            data = b'' if payload is None else json.dumps(payload).encode('utf-8')
+            self.send_response(status)
+            for key, value in headers.items():
+                self.send_header(key, value)
+            self.send_header('Content-Type', 'application/json')
+            self.send_header('Content-Length', str(len(data)))
+            self.end_headers()
+            self.wfile.write(data)
+
+        do_GET = _dispatch
+        do_POST = _dispatch
+
+        def log_message(self, format, *args):
+            pass
+
+    server = ThreadingHTTPServer(('127.0.0.1', 0), Handler)
+    server.daemon_threads = True
+    stub.url = f'http://127.0.0.1:{server.server_address[1]}'
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+
+    try:
+        yield stub
+    finally:
+        server.shutdown()
+        server.server_close()
@@ -0,0 +1,65 @@
+"""
+Tests for build_profiler.py hook
+
+Run with: python -m pytest tests/test_build_profiler.py
+"""
+
+import importlib
+import json
+
+import pytest
+
+from docs.hooks import build_profiler
+
+
+class MockPage:
+    """Mock Page object for testing"""
+    def __init__(self, src_path):
+        self.file = type('MockFile', (), {'src_path': src_path})()
+
+
+@pytest.fixture
+def profiler(monkeypatch, tmp_path):
+    """The profiler module loaded with profiling enabled"""
+    monkeypatch.setenv('MKDOCS_PROFILE', '1')
+    monkeypatch.setenv('MKDOCS_PROFILE_REPORT', str(tmp_path / 'profile.json'))
+    module = importlib.reload(build_profiler)
+    yield module
+    monkeypatch.delenv('MKDOCS_PROFILE')
+    importlib.reload(build_profiler)
+
+
+def run_event(event, *args, **kwargs):
+    """Run every handler of a CombinedEvent in priority order, like MkDocs does"""
+    handlers = sorted(event.methods, key=lambda m: -getattr(m, 'mkdocs_priority', 0))
+    for handler in handlers:
+        handler(*args, **kwargs)
+
+
+def test_disabled_profiler_registers_no_events():
+    """Without MKDOCS_PROFILE the hook defines no event handlers"""
+    assert not [name for name in dir(build_profiler) if name.startswith('on_')]
+
+
+def test_profiler_times_pages_and_events(profiler, tmp_path):
+    """Per-page and per-event timings end up in the JSON report and table"""
+    profiler.on_pre_build(config=None)
+    run_event(profiler.on_files, [], config=None)
+    for name in ('proposals/a.md', 'index.md'):
+        page = MockPage(name)
+        run_event(profiler.on_page_markdown, '# Page', page=page, config=None, files=[])
+        run_event(profiler.on_page_content, '<p>', page=page, config=None, files=[])
+        run_event(profiler.on_post_page, '<html>', page=page, config=None)
+    run_event(profiler.on_post_build, config=None)
+
+    report = json.loads((tmp_path / 'profile.json').read_text())
+    assert set(report['events']) == {'files', 'page_markdown', 'page_content', 'post_page', 'post_build'}
+    assert report['events']['page_markdown']['calls'] == 2
+    assert {row['page'] for row in report['pages']} == {'proposals/a.md', 'index.md'}
+    totals = [row['total_ms'] for row in report['pages']]
+    assert totals == sorted(totals, reverse=True)
+    assert all(set(row) == {'page', 'total_ms', 'page_markdown_ms', 'page_content_ms', 'post_page_ms'}
+               for row in report['pages'])
+
+    table = profiler.format_table(report, sort_by='page_content_ms')
+    assert 'proposals/a.md' in table and 'post_build' in table
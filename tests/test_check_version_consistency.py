@@ -0,0 +1,145 @@
+"""
+Tests for .github/scripts/check-version-consistency.py
+
+Run with: python -m pytest tests/test_check_version_consistency.py
+"""
+
+import pytest
+
+
+@pytest.fixture
+def version_check(load_script):
+    return load_script('check-version-consistency.py')
+
+
+@pytest.fixture
+def repo_tree(tmp_path, monkeypatch):
+    """A small repository with version files, docs and directories to prune"""
+    (tmp_path / 'VERSION').write_text('1.2.0\n')
+    (tmp_path / 'package.json').write_text('{"version": "1.2.0"}')
+    (tmp_path / 'docs').mkdir()
+    (tmp_path / 'docs' / 'guide.md').write_text('Install Version 1.2.0 today.\n')
+    (tmp_path / 'docs' / 'VERSION').write_text('9.9.9\n')  # Only read at the root
+    for pruned in ('.git', 'site', 'node_modules'):
+        (tmp_path / pruned).mkdir()
+        (tmp_path / pruned / 'package.json').write_text('{"version": "0.0.1"}')
+        (tmp_path / pruned / 'stale.md').write_text('Version 0.0.1\n')
+    monkeypatch.chdir(tmp_path)
+    return tmp_path
+
+
+def test_scan_repository_single_pruned_walk(version_check, repo_tree):
+    """One walk dispatches by file name and never enters pruned directories"""
+    checker = version_check.VersionChecker()
+    checker.scan_repository()
+
+    assert sorted(checker.versions) == ['VERSION', 'docs/guide.md', 'package.json']
+    assert checker.versions['VERSION']['type'] == 'primary'
+    assert checker.versions['docs/guide.md']['type'] == 'reference'
+    assert checker.scan_stats['files_scanned'] == 3
+    assert checker.scan_stats['bytes_scanned'] > 0
+
+
+def test_changelog_is_a_primary_version_source(version_check, repo_tree):
+    """The newest released changelog section counts as a primary version"""
+    (repo_tree / 'CHANGELOG.md').write_text(
+        '# Changelog\n\n## [Unreleased]\n\n## [1.2.0] - 2025-01-01\n\n## [1.1.0] - 2024-12-01\n'
+    )
+    checker = version_check.VersionChecker()
+    checker.scan_repository()
+
+    assert checker.versions['CHANGELOG.md'] == {'version': '1.2.0', 'type': 'primary', 'consistent': True}
+    assert checker.issues == []
+    assert checker.analyze_consistency()
+
+
+def test_find_version_references_positions(version_check):
+    """Every reference form is found in one pass with its line and column"""
+    content = 'Intro\nSee v1.2.3 and [0.1.0] here.\n  Version: 2.0.0-rc.1, dev1.0.0\n[1.0.0 unclosed'
+
+    references = version_check.find_version_references(content)
+
+    assert [(r['version'], r['line'], r['column'], r['kind']) for r in references] == [
+        ('1.2.3', 2, 6, 'prefixed'),
+        ('0.1.0', 2, 17, 'bracketed'),
+        ('2.0.0-rc.1', 3, 12, 'labeled'),
+    ]
+    assert content[references[1]['offset']:].startswith('0.1.0]')
+
+
+def test_scan_reuses_cached_references(version_check, repo_tree):
+    """Only markdown files whose content changed are rescanned"""
+    cache_path = repo_tree / 'cache.json'
+    (repo_tree / 'docs' / 'other.md').write_text('Pinned to v1.2.0.\n')
+
+    first = version_check.VersionChecker(cache_path=cache_path)
+    first.scan_repository()
+    assert first.cache.misses == 2
+
+    (repo_tree / 'docs' / 'other.md').write_text('Now on v1.3.0, see [1.3.0].\n')
+    second = version_check.VersionChecker(cache_path=cache_path)
+    second.scan_repository()
+
+    assert (second.cache.hits, second.cache.misses) == (1, 1)
+    assert second.versions['docs/other.md']['version'] == '1.3.0'
+    assert second.versions['docs/guide.md'] == first.versions['docs/guide.md']
+
+
+def test_parallel_scan_matches_serial(version_check, repo_tree, monkeypatch):
+    """The process pool produces the same results as a serial scan"""
+    for i in range(6):
+        (repo_tree / 'docs' / f'page{i}.md').write_text(f'Release v1.{i}.0\n')
+    monkeypatch.setattr(version_check, 'PARALLEL_SCAN_MIN_FILES', 1)
+
+    serial = version_check.VersionChecker()
+    serial.scan_repository()
+    parallel = version_check.VersionChecker(jobs=2)
+    parallel.scan_repository()
+
+    assert parallel.versions == serial.versions
+
+
+def test_bump_version_rewrites_indexed_references(version_check, repo_tree):
+    """Every canonical reference is rewritten in place and other versions are kept"""
+    (repo_tree / 'docs' / 'guide.md').write_text('Install Version 1.2.0.\nUpgrade from v1.1.0 to v1.2.0.\n')
+    checker = version_check.VersionChecker()
+    checker.scan_repository()
+
+    assert checker.bump_version('v1.3.0')
+
+    assert (repo_tree / 'VERSION').read_text() == '1.3.0\n'
+    assert (repo_tree / 'package.json').read_text() == '{"version": "1.3.0"}'
+    assert (repo_tree / 'docs' / 'guide.md').read_text() == (
+        'Install Version 1.3.0.\nUpgrade from v1.1.0 to v1.3.0.\n'
+    )
+    assert (repo_tree / 'docs' / 'VERSION').read_text() == '9.9.9\n'
+
+
+def test_bump_version_keeps_crlf_offsets(version_check, repo_tree):
+    """CRLF files are rewritten at the scanned offsets with their line endings intact"""
+    (repo_tree / 'docs' / 'guide.md').write_bytes(b'Intro\r\nInstall Version 1.2.0.\r\nThen v1.2.0.\r\n')
+    checker = version_check.VersionChecker()
+    checker.scan_repository()
+
+    assert checker.bump_version('1.3.0')
+    assert (repo_tree / 'docs' / 'guide.md').read_bytes() == b'Intro\r\nInstall Version 1.3.0.\r\nThen v1.3.0.\r\n'
+
+
+def test_bump_version_fails_on_stale_references(version_check, repo_tree):
+    """References that moved since the scan are skipped and reported as a failure"""
+    checker = version_check.VersionChecker()
+    checker.scan_repository()
+    (repo_tree / 'docs' / 'guide.md').write_text('Now: Install Version 1.2.0 today.\n')
+
+    assert not checker.bump_version('1.3.0')
+    assert (repo_tree / 'docs' / 'guide.md').read_text() == 'Now: Install Version 1.2.0 today.\n'
+
+
+def test_bump_version_requires_one_canonical_version(version_check, repo_tree):
+    """Inconsistent primary versions are not bumped"""
+    (repo_tree / 'package.json').write_text('{"version": "1.1.0"}')
+    checker = version_check.VersionChecker()
+    checker.scan_repository()
+
+    assert not checker.bump_version('1.3.0')
+    assert (repo_tree / 'VERSION').read_text() == '1.2.0\n'
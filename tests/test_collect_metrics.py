@@ -0,0 +1,269 @@
+"""
+Tests for .github/scripts/collect-metrics.py
+
+Run with: python -m pytest tests/test_collect_metrics.py
+"""
+
+import time
+
+import pytest
+
+WORKFLOWS = ['a.yml', 'b.yml', 'c.yml', 'd.yml', 'e.yml', 'f.yml']
+
+
+@pytest.fixture
+def metrics(load_script, stub_github, monkeypatch):
+    module = load_script('collect-metrics.py')
+    monkeypatch.setattr(module, 'API_URL', stub_github.url)
+    return module
+
+
+def make_run(run_id, created_at='2025-03-01T10:00:00Z', updated_at='2025-03-01T10:05:00Z',
+             conclusion='success'):
+    """Build a GitHub workflow run payload"""
+    return {
+        'id': run_id,
+        'status': 'completed',
+        'conclusion': conclusion,
+        'created_at': created_at,
+        'updated_at': updated_at,
+    }
+
+
+def test_shared_client_is_paced(metrics, monkeypatch):
+    """The client every fetch shares goes through the token bucket"""
+    monkeypatch.setenv('GITHUB_TOKEN', 'token')
+    client = metrics.create_client(2)
+    try:
+        assert client.rate == metrics.DEFAULT_RATE > 0
+    finally:
+        client.close()
+
+
+def test_fetch_all_workflow_runs_is_concurrent_and_pooled(metrics, stub_github):
+    """Workflows are fetched in parallel over a bounded set of reused connections"""
+    delay = 0.2
+
+    def responder(request):
+        time.sleep(delay)
+        workflow = request.path.split('/')[-2]
+        return 200, {}, {'workflow_runs': [make_run(WORKFLOWS.index(workflow))]}
+
+    for workflow in WORKFLOWS:
+        stub_github.route(f'/repos/o/r/actions/workflows/{workflow}/runs', responder)
+
+    start = time.perf_counter()
+    runs = metrics.fetch_all_workflow_runs('o/r', WORKFLOWS, max_workers=3)
+    elapsed = time.perf_counter() - start
+
+    assert {w: [r['id'] for r in runs[w]] for w in WORKFLOWS} == {w: [i] for i, w in enumerate(WORKFLOWS)}
+    assert elapsed < delay * len(WORKFLOWS) / 2
+    assert len({request.client for request in stub_github.requests}) <= 3
+
+
+@pytest.fixture
+def paged_runs(stub_github):
+    """Serve two pages of runs for one workflow, newest first"""
+    path = '/repos/o/r/actions/workflows/ci.yml/runs'
+    runs = [
+        make_run(4, '2025-03-04T10:00:00Z', '2025-03-04T10:10:00Z'),
+        make_run(3, '2025-03-03T10:00:00Z', '2025-03-03T10:04:00Z', 'failure'),
+        make_run(2, '2025-02-10T10:00:00Z', '2025-02-10T10:02:00Z'),
+        make_run(1, '2025-01-01T10:00:00Z', '2025-01-01T10:02:00Z'),
+    ]
+
+    def responder(request):
+        since = request.query['created'].lstrip('>=')
+        matching = [run for run in runs if run['created_at'] >= since]
+        page = int(request.query.get('page', '1'))
+        headers = {}
+        if page * 2 < len(matching):
+            headers['Link'] = (f'<{stub_github.url}{path}?created={request.query["created"]}'
+                               f'&per_page=2&page={page + 1}>; rel="next"')
+        return 200, headers, {'workflow_runs': matching[(page - 1) * 2:page * 2]}
+
+    stub_github.route(path, responder)
+    return stub_github
+
+
+def test_sync_runs_paginates_and_resumes_from_high_water_mark(metrics, paged_runs):
+    """The first sync follows every page; the next asks only for newer runs"""
+    store = metrics.RunStore(':memory:')
+
+    assert metrics.sync_runs(store, 'o/r', ['ci.yml'], days=3650) == {'ci.yml': 4}
+    first = paged_runs.requests[0].query['created']
+    assert first.startswith('>=') and first.endswith('Z') and '.' not in first
+
+    paged_runs.requests.clear()
+    assert metrics.sync_runs(store, 'o/r', ['ci.yml']) == {'ci.yml': 1}
+    assert [r.query['created'] for r in paged_runs.requests] == ['>=2025-03-04T10:00:00Z']
+    assert store.conn.execute('SELECT COUNT(*) FROM runs').fetchone()[0] == 4
+
+
+def test_calculate_workflow_metrics_over_windows(metrics, paged_runs):
+    """Windows are answered from the store without further requests"""
+    store = metrics.RunStore(':memory:')
+    metrics.sync_runs(store, 'o/r', ['ci.yml'], days=3650)
+    requests_made = len(paged_runs.requests)
+    now = metrics.datetime(2025, 3, 5, tzinfo=metrics.timezone.utc)
+
+    week = metrics.calculate_workflow_metrics(store, 'ci.yml', 7, now)
+    quarter = metrics.calculate_workflow_metrics(store, 'ci.yml', 90, now)
+
+    assert week['total_runs'] == 2
+    assert week['success_rate'] == 50.0
+    assert week['avg_duration_minutes'] == 7.0
+    assert week['latest_status'] == 'success'
+    assert quarter['total_runs'] == 4
+    assert metrics.calculate_workflow_metrics(store, 'other.yml', 7, now)['total_runs'] == 0
+    assert len(paged_runs.requests) == requests_made
+
+
+def test_streaming_quantile_tracks_exact_percentiles(metrics):
+    """P² estimates stay close to exact percentiles of a skewed sample"""
+    import random
+
+    rng = random.Random(7)
+    values = [rng.lognormvariate(4, 0.6) for _ in range(20000)]
+    ordered = sorted(values)
+
+    summary = metrics.LatencySummary()
+    for value in values:
+        summary.add(value)
+    result = summary.summary()
+
+    assert result['count'] == len(values)
+    for p in metrics.PERCENTILES:
+        exact = ordered[int(p / 100 * (len(ordered) - 1))]
+        assert abs(result[f'p{p}_seconds'] - exact) / exact < 0.05
+    # Memory is five markers per percentile regardless of the stream length
+    assert all(len(e.heights) == 5 for e in summary.estimators.values())
+
+
+def test_calculate_latency_splits_queue_and_execution(metrics, stub_github):
+    """Run, job and step timings come from the runs and jobs endpoints"""
+    runs = [dict(make_run(1, '2025-03-04T10:00:00Z', '2025-03-04T10:10:00Z'),
+                 run_started_at='2025-03-04T10:01:00Z')]
+    stub_github.route('/repos/o/r/actions/workflows/ci.yml/runs',
+                      lambda request: (200, {}, {'workflow_runs': runs}))
+    stub_github.route('/repos/o/r/actions/runs/1/jobs', lambda request: (200, {}, {'jobs': [{
+        'id': 11, 'name': 'test', 'conclusion': 'success',
+        'created_at': '2025-03-04T10:01:00Z', 'started_at': '2025-03-04T10:01:30Z',
+        'completed_at': '2025-03-04T10:09:30Z',
+        'steps': [{'number': 1, 'name': 'pytest', 'conclusion': 'success',
+                   'started_at': '2025-03-04T10:02:00Z', 'completed_at': '2025-03-04T10:09:00Z'}],
+    }]}))
+    store = metrics.RunStore(':memory:')
+    metrics.sync_runs(store, 'o/r', ['ci.yml'], days=3650)
+
+    assert metrics.sync_jobs(store, 'o/r', ['ci.yml'], days=3650) == 1
+    assert metrics.sync_jobs(store, 'o/r', ['ci.yml'], days=3650) == 0
+
+    now = metrics.datetime(2025, 3, 5, tzinfo=metrics.timezone.utc)
+    latency = metrics.calculate_latency(store, 'ci.yml', 7, now)
+
+    assert latency['queue']['p50_seconds'] == 60.0
+    assert latency['execution']['p50_seconds'] == 540.0
+    assert latency['total']['p99_seconds'] == 600.0
+    assert latency['jobs']['test']['queue']['p50_seconds'] == 30.0
+    assert latency['jobs']['test']['execution']['p95_seconds'] == 480.0
+    assert latency['jobs']['test']['steps']['pytest'] == {
+        'count': 1, 'p50_seconds': 420.0, 'p90_seconds': 420.0, 'p95_seconds': 420.0, 'p99_seconds': 420.0
+    }
+
+
+def test_detect_regressions_flags_slower_runs_and_since_when(metrics):
+    """A sustained slowdown is reported with the run it started at; noise is not"""
+    import random
+
+    rng = random.Random(3)
+    store = metrics.RunStore(':memory:')
+
+    def run_lasting(run_id, created_at, minutes):
+        start = metrics.datetime.fromisoformat(created_at.replace('Z', '+00:00'))
+        end = start + metrics.timedelta(minutes=minutes + rng.uniform(-0.5, 0.5))
+        return make_run(run_id, created_at, metrics.utc_timestamp(end))
+
+    runs, steady = [], []
+    for i in range(40):
+        created_at = f'2025-03-{i // 2 + 1:02d}T{10 + i % 2}:00:00Z'
+        runs.append(run_lasting(i + 1, created_at, 5 if i < 30 else 8))
+        steady.append(run_lasting(100 + i, created_at, 5))
+    store.upsert('slow.yml', runs)
+    store.upsert('steady.yml', steady)
+
+    now = metrics.datetime(2025, 3, 25, tzinfo=metrics.timezone.utc)
+    regressions = metrics.detect_regressions(store, ['slow.yml', 'steady.yml'], days=90, now=now)
+
+    assert len(regressions) == 1
+    regression = regressions[0]
+    assert (regression['workflow'], regression['job'], regression['run_id']) == ('slow.yml', None, 31)
+    assert regression['since'] == '2025-03-16T10:00:00Z'
+    assert regression['runs_since'] == 10
+    assert 50 < regression['change_percent'] < 70
+
+
+def test_graphql_sync_batches_workflows_per_query(metrics, stub_github, monkeypatch, load_fixture):
+    """Every workflow's next page is requested in one query, from recorded responses"""
+    import json
+
+    workflows = load_fixture('graphql', 'workflows.json')
+    recorded = load_fixture('graphql', 'workflow-runs.json')
+
+    def graphql(request):
+        variables = json.loads(request.body)['variables']
+        data = {}
+        for key, node_id in variables.items():
+            if key.startswith('id_'):
+                alias = key[3:]
+                data[alias] = recorded[node_id][str(variables[f'after_{alias}'] or 'null')]
+        return 200, {}, {'data': data}
+
+    stub_github.route('/repos/o/r/actions/workflows', lambda request: (200, {}, workflows))
+    stub_github.route('/graphql', graphql)
+    # Not in the workflow listing yet, so fetched by file name with REST
+    stub_github.route('/repos/o/r/actions/workflows/missing.yml/runs', lambda request: (200, {}, {
+        'workflow_runs': [{'id': 900, 'status': 'completed', 'conclusion': 'success',
+                           'created_at': '2025-03-04T09:00:00Z', 'updated_at': '2025-03-04T09:05:00Z',
+                           'run_started_at': '2025-03-04T09:01:00Z'}]
+    }))
+    monkeypatch.setattr(metrics, 'GRAPHQL_URL', f'{stub_github.url}/graphql')
+    monkeypatch.setattr(metrics, 'API_URL', stub_github.url)
+    store = metrics.RunStore(':memory:')
+    store.upsert('ci.yml', [{'id': 9001, 'status': 'in_progress', 'created_at': '2025-03-02T10:00:00Z',
+                             'run_started_at': '2025-03-02T10:00:30Z'}])
+
+    synced = metrics.sync_runs(store, 'o/r', ['ci.yml', 'docs.yml', 'missing.yml'], days=3650, use_graphql=True)
+
+    assert synced == {'ci.yml': 3, 'docs.yml': 1, 'missing.yml': 1}
+    # Start times from an earlier REST sync survive a GraphQL refresh
+    started = store.conn.execute("SELECT run_started_at FROM runs WHERE id = 9001").fetchone()[0]
+    assert started == '2025-03-02T10:00:30Z'
+    queries = [json.loads(r.body) for r in stub_github.requests if r.path == '/graphql']
+    assert len(queries) == 2
+    assert len([k for k in queries[0]['variables'] if k.startswith('id_')]) == 2
+    assert store.high_water_mark('docs.yml') == '2025-03-04T11:00:00Z'
+    now = metrics.datetime(2025, 3, 5, tzinfo=metrics.timezone.utc)
+    assert metrics.calculate_workflow_metrics(store, 'ci.yml', 7, now)['successful_runs'] == 2
+
+
+def test_discovered_workflows_resolve_ids_through_cache(metrics, stub_github, tmp_path, load_fixture):
+    """Workflow files are found on disk and the id listing is only fetched for unknown files"""
+    workflow_dir = tmp_path / 'workflows'
+    workflow_dir.mkdir()
+    for name in ('docs.yml', 'ci.yml', 'notes.txt'):
+        (workflow_dir / name).write_text('on: push\n')
+    stub_github.route('/repos/o/r/actions/workflows', lambda request: (200, {}, load_fixture('graphql', 'workflows.json')))
+    cache_path = tmp_path / 'ids.json'
+
+    workflows = metrics.discover_workflows(workflow_dir)
+    assert workflows == ['ci.yml', 'docs.yml']
+
+    ids = metrics.resolve_workflow_ids('o/r', workflows, cache_path=cache_path)
+    assert ids['ci.yml']['id'] == 101
+    assert metrics.resolve_workflow_ids('o/r', workflows, cache_path=cache_path) == ids
+    assert len(stub_github.requests) == 1
+
+    # A new workflow triggers one refresh; one GitHub does not know yet is left out
+    assert metrics.resolve_workflow_ids('o/r', workflows + ['new.yml'], cache_path=cache_path) == ids
+    assert len(stub_github.requests) == 2
@@ -0,0 +1,324 @@
+"""
+Tests for .github/scripts/generate-changelog.py
+
+Run with: python -m pytest tests/test_generate_changelog.py
+"""
+
+import pytest
+
+
+@pytest.fixture
+def changelog(load_script):
+    return load_script('generate-changelog.py')
+
+
+def make_pr(number, merged_at, updated_at=None):
+    """Build a GitHub pull request payload"""
+    return {
+        'number': number,
+        'title': f'feat: change {number}',
+        'user': {'login': f'user{number}'},
+        'merged_at': merged_at,
+        'updated_at': updated_at or merged_at,
+        'body': '',
+        'html_url': f'https://github.com/DollhouseMCP/AILIS/pull/{number}',
+        'merge_commit_sha': f'{number:040d}'
+    }
+
+
+@pytest.fixture
+def paged_pulls(stub_github):
+    """Serve three pages of pull requests sorted by updated_at descending"""
+    pages = {
+        '1': [make_pr(6, '2025-03-05T00:00:00Z'), make_pr(5, None, '2025-03-04T00:00:00Z')],
+        '2': [make_pr(4, '2025-03-03T00:00:00Z'), make_pr(3, '2025-02-20T00:00:00Z')],
+        '3': [make_pr(2, '2025-01-10T00:00:00Z'), make_pr(1, '2025-01-01T00:00:00Z')],
+    }
+    path = '/repos/DollhouseMCP/AILIS/pulls'
+
+    def responder(request):
+        page = request.query.get('page', '1')
+        etag = f'"page-{page}"'
+        if request.headers.get('If-None-Match') == etag:
+            return 304, {'ETag': etag}, None
+        headers = {'ETag': etag}
+        if int(page) < len(pages):
+            headers['Link'] = f'<{stub_github.url}{path}?page={int(page) + 1}>; rel="next"'
+        return 200, headers, pages[page]
+
+    stub_github.route(path, responder)
+    return stub_github
+
+
+def test_fetch_merged_follows_link_pagination(changelog, paged_pulls, tmp_path):
+    """All pages are followed and unmerged pull requests are dropped"""
+    fetcher = changelog.PullRequestFetcher(
+        'DollhouseMCP', 'AILIS', 'token',
+        api_url=paged_pulls.url, cache_path=tmp_path / 'prs.json'
+    )
+
+    prs = fetcher.fetch_merged()
+
+    assert [pr['number'] for pr in prs] == [6, 4, 3, 2, 1]
+    assert fetcher.stats['pages'] == 3
+
+
+def test_fetch_merged_stops_before_since_date(changelog, paged_pulls, tmp_path):
+    """Pagination stops once a page ends before since_date"""
+    fetcher = changelog.PullRequestFetcher(
+        'DollhouseMCP', 'AILIS', 'token',
+        api_url=paged_pulls.url, cache_path=tmp_path / 'prs.json'
+    )
+
+    prs = fetcher.fetch_merged('2025-03-01')
+
+    assert [pr['number'] for pr in prs] == [6, 4]
+    assert fetcher.stats['pages'] == 2
+
+
+def test_fetch_merged_uses_etag_cache(changelog, paged_pulls, tmp_path):
+    """A second run sends If-None-Match and reuses cached pages"""
+    cache_path = tmp_path / 'prs.json'
+    first = changelog.PullRequestFetcher(
+        'DollhouseMCP', 'AILIS', 'token', api_url=paged_pulls.url, cache_path=cache_path
+    )
+    expected = first.fetch_merged()
+
+    second = changelog.PullRequestFetcher(
+        'DollhouseMCP', 'AILIS', 'token', api_url=paged_pulls.url, cache_path=cache_path
+    )
+    assert second.fetch_merged() == expected
+    assert second.stats['not_modified'] == 3
+    assert all('If-None-Match' in r.headers for r in paged_pulls.requests[3:])
+
+
+def test_get_github_prs_without_token(changelog):
+    """No token means no PR information"""
+    generator = changelog.ChangelogGenerator(None)
+
+    assert generator.get_github_prs() == []
+
+
+@pytest.fixture
+def git_repo(tmp_path, monkeypatch):
+    """A throwaway git repository to run the generator in"""
+    import subprocess
+
+    def git(*args):
+        return subprocess.run(['git', *args], cwd=tmp_path, check=True,
+                              capture_output=True, text=True).stdout.strip()
+
+    def commit(message):
+        filename = message.split(':')[0] + '.txt'
+        (tmp_path / filename).write_text(message)
+        git('add', filename)
+        git('commit', '-q', '-m', message)
+        return git('rev-parse', 'HEAD')
+
+    git('init', '-q')
+    git('config', 'user.name', 'Tester')
+    git('config', 'user.email', 'tester@example.com')
+    monkeypatch.chdir(tmp_path)
+    git.commit = commit
+    return git
+
+
+def test_update_changelog_is_incremental(changelog, git_repo, tmp_path):
+    """A second run only ingests commits after the watermark"""
+    generator = changelog.ChangelogGenerator(None)
+    git_repo.commit('feat: first feature')
+
+    assert generator.update_changelog('v0.2.0', None, '2025-01-01')
+    state = changelog.ChangelogState.load()
+    assert state.last_sha == git_repo('rev-parse', 'HEAD')
+
+    # Nothing new since the watermark
+    assert not generator.update_changelog('v0.2.0', None, '2025-01-01')
+
+    git_repo.commit('fix: a bug')
+    calls = []
+    original = generator.get_git_commits
+    generator.get_git_commits = lambda *a, **kw: calls.append(original(*a, **kw)) or calls[-1]
+    assert generator.update_changelog('v0.2.0', None, '2025-01-02')
+
+    assert [c['message'] for c in calls[0]] == ['fix: a bug']
+    content = (tmp_path / 'CHANGELOG.md').read_text()
+    assert content.count('## [0.2.0]') == 1
+    assert '- first feature' in content
+    assert '- a bug' in content
+
+
+def test_update_changelog_joins_commits_to_recorded_prs(changelog, git_repo, tmp_path):
+    """A squash commit arriving after its PR was recorded is not listed again"""
+    generator = changelog.ChangelogGenerator(None)
+    git_repo.commit('chore: setup')
+    pr = {'number': 12, 'title': 'feat: thing', 'author': 'a', 'merged_at': '2025-01-01T00:00:00Z',
+          'url': 'u', 'merge_commit_sha': None}
+
+    # Run 1 sees the merged PR before its squash commit reaches HEAD
+    generator.get_github_prs = lambda since_date=None: [pr]
+    assert generator.update_changelog('v0.2.0', None, '2025-01-01')
+
+    sha = git_repo.commit('feat: thing (#12)')
+    assert not generator.update_changelog('v0.2.0', None, '2025-01-02')
+
+    content = (tmp_path / 'CHANGELOG.md').read_text()
+    assert content.count('thing') == 1
+    assert 'feat: thing ([#12](u) by @a)' in content
+    state = changelog.ChangelogState.load()
+    assert state.last_sha == sha
+    recorded = [c for changes in state.releases['0.2.0']['categories'].values() for c in changes]
+    assert [c.get('sha') for c in recorded if c['type'] == 'pr'] == [sha[:7]]
+
+
+def test_rebuild_all_releases_in_one_walk(changelog, git_repo, tmp_path):
+    """Each commit lands in the oldest release that contains it"""
+    git_repo.commit('feat: initial')
+    git_repo('tag', 'v0.1.0')
+    git_repo('checkout', '-q', '-b', 'topic')
+    git_repo.commit('fix: on a branch')
+    git_repo('checkout', '-q', '-')
+    git_repo.commit('docs: on main')
+    git_repo('merge', '-q', '--no-ff', '-m', 'chore: merge topic', 'topic')
+    git_repo('tag', '-a', 'v0.2.0', '-m', 'Release 0.2.0')
+    git_repo.commit('perf: after release')
+
+    generator = changelog.ChangelogGenerator(None)
+    tags = generator.get_version_tags()
+    assert [tag['name'] for tag in tags] == ['v0.1.0', 'v0.2.0']
+
+    releases = generator.walk_releases(tags, 'v0.3.0')
+    messages = {label: sorted(c['message'] for c in commits) for label, commits in releases.items()}
+    assert messages == {
+        'v0.1.0': ['feat: initial'],
+        'v0.2.0': ['chore: merge topic', 'docs: on main', 'fix: on a branch'],
+        'v0.3.0': ['perf: after release'],
+    }
+
+    assert generator.rebuild_all_releases('v0.3.0', '2025-02-01')
+    content = (tmp_path / 'CHANGELOG.md').read_text()
+    positions = [content.index(f'## [{v}]') for v in ('0.3.0', '0.2.0', '0.1.0')]
+    assert positions == sorted(positions)
+    assert '## [0.3.0] - 2025-02-01' in content
+
+
+def test_categorize_changes_joins_commits_to_prs(changelog):
+    """Squash and merge commits are folded into their PR entries, once per PR"""
+    generator = changelog.ChangelogGenerator(None)
+    commits = [
+        {'sha': 'a' * 40, 'message': 'feat: squashed change (#12)', 'author': 'alice', 'date': '2025-01-02'},
+        {'sha': 'b' * 40, 'message': 'Merge pull request #13 from fork/branch', 'author': 'bob', 'date': '2025-01-03'},
+        {'sha': 'c' * 40, 'message': 'fix: merged by sha', 'author': 'carol', 'date': '2025-01-04'},
+        {'sha': 'd' * 40, 'message': 'docs: direct push', 'author': 'dave', 'date': '2025-01-05'},
+        {'sha': 'e' * 40, 'message': 'feat: squashed change, cherry-picked (#12)', 'author': 'alice',
+         'date': '2025-01-06'},
+    ]
+    prs = [
+        {'number': 12, 'title': 'feat: squashed change', 'author': 'alice', 'merged_at': '2025-01-02',
+         'url': 'https://example.com/12', 'merge_commit_sha': 'a' * 40},
+        {'number': 13, 'title': 'feat: merged change', 'author': 'bob', 'merged_at': '2025-01-03',
+         'url': 'https://example.com/13', 'merge_commit_sha': None},
+        {'number': 14, 'title': 'fix: merged by sha', 'author': 'carol', 'merged_at': '2025-01-04',
+         'url': 'https://example.com/14', 'merge_commit_sha': 'c' * 40},
+    ]
+
+    categories = generator.categorize_changes(commits, prs)
+    changes = [change for entries in categories.values() for change in entries]
+
+    assert len(changes) == 4
+    assert {c['number']: c['sha'] for c in changes if c['type'] == 'pr'} == {
+        12: 'aaaaaaa', 13: 'bbbbbbb', 14: 'ccccccc'
+    }
+    assert [c['sha'] for c in changes if c['type'] == 'commit'] == ['ddddddd']
+
+
+def test_release_renders_all_formats_from_one_model(changelog):
+    """Markdown, JSON and release notes share category ordering"""
+    generator = changelog.ChangelogGenerator(None)
+    release = {
+        'date': '2025-01-05',
+        'categories': {
+            '📚 Documentation': [{'type': 'commit', 'sha': 'ddddddd', 'message': 'guide',
+                                 'author': 'dave', 'date': '2025-01-05'}],
+            '✨ Features': [{'type': 'pr', 'number': 12, 'title': 'feat: thing', 'author': 'alice',
+                            'date': '2025-01-02', 'url': 'https://example.com/12'}],
+        }
+    }
+
+    markdown = generator.render_release('v1.0.0', release)
+    notes = generator.render_release_notes(release)
+    data = generator.render_json({'1.0.0': release, 'Unreleased': {'date': None, 'categories': {}}})
+
+    assert markdown.index('✨ Features') < markdown.index('📚 Documentation')
+    assert notes.index('✨ Features') < notes.index('📚 Documentation')
+    assert '- feat: thing (#12)' in notes
+    assert '**Contributors:** @alice, @dave' in notes
+    assert [r['version'] for r in data['releases']] == ['Unreleased', '1.0.0']
+    assert [c['label'] for c in data['releases'][1]['categories']] == ['✨ Features', '📚 Documentation']
+
+
+def test_changelog_store_queries(changelog):
+    """The store answers SHA, category, author and since queries from its indexes"""
+    perf = '⚡ Performance'
+    state = changelog.ChangelogState(releases={
+        '0.4.0': {'date': '2025-03-01', 'categories': {
+            perf: [{'type': 'pr', 'number': 7, 'title': 'perf: faster', 'author': 'bob',
+                    'date': '2025-03-01', 'url': 'u', 'sha': 'ccccccc'}],
+        }},
+        '0.3.0': {'date': '2025-02-01', 'categories': {
+            perf: [{'type': 'commit', 'sha': 'bbbbbbb', 'message': 'cache', 'author': 'alice',
+                    'date': '2025-02-01'}],
+        }},
+        '0.2.0': {'date': '2025-01-01', 'categories': {
+            '🐛 Bug Fixes': [{'type': 'commit', 'sha': 'aaaaaaa', 'message': 'fix', 'author': 'alice',
+                             'date': '2025-01-01'}],
+        }},
+    })
+
+    assert state.first_release('c' * 40) == '0.4.0'
+    assert state.first_release('deadbee') is None
+    assert [v for v, _, _ in state.find_changes(category=perf)] == ['0.3.0', '0.4.0']
+    assert [v for v, _, _ in state.find_changes(category=perf, since='0.3')] == ['0.4.0']
+    assert [v for v, _, _ in state.find_changes(author='alice')] == ['0.2.0', '0.3.0']
+
+
+def test_split_changelog_keeps_header_and_footer(changelog):
+    """Header and footer are found by structure rather than line counts"""
+    content = '\n'.join([
+        '# Changelog', '', 'Intro line one', 'Intro line two', 'More intro', 'Even more', 'Last intro', '',
+        '## [1.0.0] - 2025-01-01', '', '- change', '',
+        '---', '', '## Versioning Guidelines', '', '- notes',
+    ])
+
+    header, releases, footer = changelog.ChangelogGenerator.split_changelog(content)
+
+    assert header[-1] == 'Last intro'
+    assert releases[0] == '## [1.0.0] - 2025-01-01'
+    assert footer[0] == '---'
+    assert '## Versioning Guidelines' in footer
+
+
+def test_graphql_fetcher_follows_cursors(changelog, stub_github, load_fixture):
+    """Recorded GraphQL pages are followed by cursor and shaped like REST results"""
+    import json
+
+    pages = load_fixture('graphql', 'pull-requests.json')
+    stub_github.route('/graphql', lambda request: (
+        200, {}, pages[str(json.loads(request.body)['variables']['after'] or 'null')]))
+    fetcher = changelog.GraphQLPullRequestFetcher(
+        'DollhouseMCP', 'AILIS', 'token', graphql_url=f'{stub_github.url}/graphql'
+    )
+
+    prs = fetcher.fetch_merged()
+
+    assert [pr['number'] for pr in prs] == [6, 4, 2, 1]
+    assert prs[1]['author'] == 'ghost'
+    assert prs[0]['merge_commit_sha'] == '6' * 40
+    assert prs[3]['merge_commit_sha'] is None
+    assert fetcher.stats['pages'] == 2
+    assert all(r.method == 'POST' for r in stub_github.requests)
+
+    # The first page already ends before since_date
+    stub_github.requests.clear()
+    assert [pr['number'] for pr in fetcher.fetch_merged('2025-03-04')] == [6]
+    assert len(stub_github.requests) == 1
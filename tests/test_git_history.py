@@ -0,0 +1,121 @@
+"""
+Tests for git_history.py hook
+
+Run with: python -m pytest tests/test_git_history.py
+"""
+
+import json
+import os
+import subprocess
+
+import pytest
+from mkdocs.structure.files import File, Files
+
+from docs.hooks import git_history
+
+
+def commit(repo, message, when):
+    env = dict(os.environ, GIT_AUTHOR_DATE=f'@{when} +0000', GIT_COMMITTER_DATE=f'@{when} +0000')
+    subprocess.run(['git', 'add', '-A'], cwd=repo, check=True)
+    subprocess.run(['git', '-c', 'user.name=Ada', '-c', 'user.email=ada@example.com',
+                    'commit', '-q', '-m', message], cwd=repo, env=env, check=True)
+
+
+@pytest.fixture
+def repo(tmp_path, monkeypatch):
+    """A small repository with a docs/ directory and three commits"""
+    subprocess.run(['git', 'init', '-q'], cwd=tmp_path, check=True)
+    docs = tmp_path / 'docs'
+    (docs / 'layers').mkdir(parents=True)
+    (docs / 'index.md').write_text('# Home\n')
+    (docs / 'layers' / 'draft.md').write_text('# Layer\n\nFirst line\n')
+    commit(tmp_path, 'Add pages', 1_700_000_000)
+
+    (docs / 'layers' / 'draft.md').rename(docs / 'layers' / 'l0.md')
+    commit(tmp_path, 'Rename layer', 1_700_100_000)
+
+    with open(docs / 'layers' / 'l0.md', 'a') as f:
+        f.write('\nSecond line\n')
+    commit(tmp_path, 'Extend layer', 1_700_200_000)
+
+    monkeypatch.setattr(git_history, 'state', {'root': None, 'head': None, 'history': {}, 'blame': {}})
+    monkeypatch.setattr(git_history, 'pages', {})
+    return tmp_path
+
+
+def site_files(docs_dir, *paths):
+    return Files([File(path, str(docs_dir), str(docs_dir / 'site'), use_directory_urls=True) for path in paths])
+
+
+def test_parse_log_follows_renames():
+    """Commits before a rename count toward the file's current path"""
+    output = (
+        '\x1eccc\t300\n\nM\tdocs/new.md\n'
+        '\x1ebbb\t200\n\nR100\tdocs/old.md\tdocs/new.md\n'
+        '\x1eaaa\t100\n\nA\tdocs/old.md\nA\tdocs/other.md\n'
+    )
+    history = git_history.parse_log(output)
+    assert history['docs/new.md'] == {'created': 100, 'updated': 300, 'commits': 3}
+    assert history['docs/other.md'] == {'created': 100, 'updated': 100, 'commits': 1}
+    assert 'docs/old.md' not in history
+
+
+def test_parse_blame_counts_non_empty_lines():
+    """Authors are ranked by the non-empty lines they last touched"""
+    output = '\n'.join([
+        'a1 1 1 1', 'author Ada', 'author-mail <ada@example.com>', '\t# Title',
+        'b2 2 2 1', 'author Bob', 'author-mail <bob@example.com>', '\t',
+        'a1 3 3 1', 'author Ada', 'author-mail <ada@example.com>', '\tText',
+        'b2 4 4 1', 'author Bob', 'author-mail <bob@example.com>', '\tMore',
+    ])
+    assert git_history.parse_blame(output) == [['Ada', 'ada@example.com', 2], ['Bob', 'bob@example.com', 1]]
+
+
+def test_pages_served_from_index(repo):
+    """One history walk supplies dates and authors, and is cached by HEAD"""
+    docs = repo / 'docs'
+    git_history.on_config({'docs_dir': str(docs)})
+    git_history.on_files(site_files(docs, 'index.md', 'layers/l0.md'), {})
+
+    assert git_history.page_history('layers/l0.md') == {
+        'created': 1_700_000_000, 'updated': 1_700_200_000, 'commits': 3
+    }
+    authors = git_history.page_authors('layers/l0.md')
+    assert authors == [{'name': 'Ada', 'email': 'ada@example.com', 'lines': 3, 'contribution': 100.0}]
+    # index.md is excluded from author listings, so it was never blamed
+    assert git_history.page_authors('index.md') == []
+    assert git_history.format_date(1_700_000_000).endswith('>November 14, 2023</span>')
+
+    cache = json.loads((repo / git_history.CACHE_PATH).read_text())
+    head = subprocess.run(['git', 'rev-parse', 'HEAD'], cwd=repo, capture_output=True, text=True).stdout.strip()
+    assert cache['head'] == head
+    assert len(cache['blame']) == 1
+
+
+def test_cached_index_skips_git_log(repo, monkeypatch):
+    """A fresh process reuses the cached index while HEAD is unchanged"""
+    docs = repo / 'docs'
+    git_history.on_config({'docs_dir': str(docs)})
+    git_history.on_files(site_files(docs, 'layers/l0.md'), {})
+
+    monkeypatch.setattr(git_history, 'state', {'root': None, 'head': None, 'history': {}, 'blame': {}})
+    calls = []
+    real_git = git_history.git
+    monkeypatch.setattr(git_history, 'git', lambda *args, **kwargs: calls.append(args[0]) or real_git(*args, **kwargs))
+
+    git_history.on_config({'docs_dir': str(docs)})
+    git_history.on_files(site_files(docs, 'layers/l0.md'), {})
+    assert 'log' not in calls and 'blame' not in calls
+    assert git_history.page_history('layers/l0.md')['updated'] == 1_700_200_000
+
+
+def test_untracked_page_falls_back_to_build_date(repo):
+    """Pages without history get the build date"""
+    docs = repo / 'docs'
+    (docs / 'new.md').write_text('# New\n')
+    git_history.on_config({'docs_dir': str(docs)})
+    git_history.on_files(site_files(docs, 'new.md'), {})
+
+    history = git_history.page_history('new.md')
+    assert history['created'] == history['updated'] > 1_700_200_000
+    assert git_history.page_authors('new.md') == []
@@ -0,0 +1,104 @@
+"""
+Tests for .github/scripts/github_api.py
+
+Run with: python -m pytest tests/test_github_api.py
+"""
+
+import time
+
+import pytest
+
+
+@pytest.fixture
+def github_api(load_script):
+    return load_script('github_api.py')
+
+
+@pytest.fixture
+def sleeps():
+    """Record waits instead of sleeping"""
+    return []
+
+
+@pytest.fixture
+def limited_api(stub_github):
+    """
+    A stub that enforces an hourly budget and a secondary limit.
+
+    The third request hits the secondary limit; once the budget is spent
+    requests get 403 until a reset, which happens after one refused call.
+    """
+    state = {'remaining': 3, 'calls': 0, 'refused': 0}
+    reset = int(time.time()) + 30
+
+    def responder(request):
+        state['calls'] += 1
+        if state['calls'] == 3:
+            return 403, {'Retry-After': '2'}, {'message': 'You have exceeded a secondary rate limit.'}
+        if state['remaining'] == 0:
+            state['refused'] += 1
+            state['remaining'] = 5
+            return 403, {'X-RateLimit-Remaining': '0', 'X-RateLimit-Reset': str(reset)}, {
+                'message': 'API rate limit exceeded'}
+        state['remaining'] -= 1
+        headers = {'X-RateLimit-Remaining': str(state['remaining']), 'X-RateLimit-Reset': str(reset)}
+        return 200, headers, {'ok': True}
+
+    stub_github.route('/limited', responder)
+    stub_github.state = state
+    return stub_github
+
+
+def test_client_waits_out_secondary_and_primary_limits(github_api, limited_api, sleeps):
+    """Limited requests are retried after Retry-After or the reset time"""
+    client = github_api.GitHubClient('token', sleep=sleeps.append, reserve={github_api.NORMAL: 0})
+
+    statuses = [client.get(f'{limited_api.url}/limited').status_code for _ in range(5)]
+
+    assert statuses == [200] * 5
+    assert limited_api.state['refused'] == 1
+    assert sleeps[0] == 2
+    assert 25 < sleeps[1] <= 31
+    assert client.stats['retries'] == 2
+    assert limited_api.requests[0].headers['Authorization'] == 'token token'
+
+
+def test_low_priority_requests_yield_when_budget_is_low(github_api, stub_github, sleeps):
+    """Below the reserve, low priority requests give up while normal ones proceed"""
+    reset = int(time.time()) + 3600
+    stub_github.route('/budget', lambda request: (
+        200, {'X-RateLimit-Remaining': '120', 'X-RateLimit-Reset': str(reset)}, {}))
+    client = github_api.GitHubClient(sleep=sleeps.append, max_wait=60)
+
+    assert client.get(f'{stub_github.url}/budget').status_code == 200
+    with pytest.raises(github_api.RateLimitExceeded):
+        client.get(f'{stub_github.url}/budget', priority=github_api.LOW)
+    assert client.get(f'{stub_github.url}/budget', priority=github_api.NORMAL).status_code == 200
+    assert len(stub_github.requests) == 2
+    assert sleeps == []
+
+
+def test_server_errors_are_retried_with_backoff(github_api, stub_github, sleeps):
+    """A transient 502 is retried; a plain 403 is returned as is"""
+    calls = []
+    stub_github.route('/flaky', lambda request: calls.append(1) or ((502 if len(calls) == 1 else 200), {}, {}))
+    stub_github.route('/forbidden', lambda request: (403, {}, {'message': 'Resource not accessible'}))
+    client = github_api.GitHubClient(sleep=sleeps.append, backoff=0.5)
+
+    assert client.get(f'{stub_github.url}/flaky').status_code == 200
+    assert 0.5 <= sleeps[0] <= 1.0
+    assert client.get(f'{stub_github.url}/forbidden').status_code == 403
+    assert client.stats['retries'] == 1
+
+
+def test_token_bucket_paces_requests(github_api, stub_github):
+    """Requests beyond the burst wait for the bucket to refill"""
+    stub_github.route('/paced', lambda request: (200, {}, {}))
+    client = github_api.GitHubClient(rate=20, burst=1)
+
+    start = time.perf_counter()
+    for _ in range(5):
+        client.get(f'{stub_github.url}/paced')
+
+    assert time.perf_counter() - start >= 4 / 20 * 0.9
+    assert client.stats['waited_seconds'] > 0
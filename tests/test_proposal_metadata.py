@@ -4,9 +4,16 @@ Tests for proposal_metadata.py hook
 Run with: python -m pytest tests/test_proposal_metadata.py
 """
 
+import json
+import logging
+
 import pytest
+from mkdocs.config.defaults import MkDocsConfig
+from mkdocs.structure.files import File, Files
+from docs.hooks import proposal_metadata
 from docs.hooks.proposal_metadata import (
     extract_metadata,
+    header_region,
     format_metadata_box,
     insert_after_first_heading,
     on_page_markdown,
@@ -59,6 +66,33 @@ def test_extract_metadata_case_insensitive():
     assert metadata['authors'] == 'Jane Smith'
 
 
+def test_extract_metadata_ignores_body():
+    """Field-like lines after the header are not metadata"""
+    markdown = "# Title\n\nStatus: Review\n\n## Background\n\nAuthor: someone quoted in the body\n"
+
+    metadata = extract_metadata(markdown)
+
+    assert metadata == {'status': 'Review'}
+
+
+def test_extract_metadata_prefers_front_matter():
+    """Front matter parsed by MkDocs is used instead of scanning the content"""
+    meta = {'title': 'Ignored', 'Status': 'Final', 'authors': ['Ada', 'Grace'], 'rfc': 7}
+
+    metadata = extract_metadata("Status: Draft\n# Title\n", meta)
+
+    assert metadata == {'status': 'Final', 'authors': 'Ada, Grace', 'rfc': '7'}
+
+
+def test_header_region_is_bounded():
+    """Only a fixed number of leading lines are scanned, however long the page"""
+    markdown = "Status: Draft\n" + "Filler line\n" * 100000
+
+    assert header_region(markdown).count('\n') == 30
+    assert header_region(markdown, max_lines=3) == "Status: Draft\nFiller line\nFiller line\n"
+    assert header_region("Title\n## Body\nStatus: Draft\n") == "Title\n"
+
+
 def test_extract_metadata_empty():
     """Test extracting from markdown with no metadata"""
     markdown = """
@@ -138,6 +172,41 @@ Content"""
     assert '**Status**: 📝 Draft' in result
 
 
+@pytest.fixture
+def empty_cache(monkeypatch):
+    """Start from an empty page cache"""
+    monkeypatch.setattr(proposal_metadata, 'page_cache', proposal_metadata.OrderedDict())
+    monkeypatch.setattr(proposal_metadata, 'cache_stats', {'hits': 0, 'misses': 0})
+    return proposal_metadata
+
+
+def test_on_page_markdown_reuses_unchanged_pages(empty_cache, monkeypatch, caplog):
+    """Unchanged pages are served from the cache; edits and hook versions miss"""
+    page = MockPage('proposals/test.md')
+    markdown = "Status: Draft\n\n# Test Proposal\nContent"
+
+    first = on_page_markdown(markdown, page, None, None)
+    assert on_page_markdown(markdown, page, None, None) == first
+    on_page_markdown(markdown + "\nMore", page, None, None)
+    monkeypatch.setattr(empty_cache, 'HOOK_VERSION', 'next')
+    on_page_markdown(markdown, page, None, None)
+
+    assert empty_cache.cache_stats == {'hits': 1, 'misses': 3}
+    with caplog.at_level(logging.DEBUG, logger='mkdocs.hooks.proposal_metadata'):
+        empty_cache.on_post_build(None)
+    assert '1 hits, 3 misses, 3 pages cached' in caplog.text
+    assert empty_cache.cache_stats == {'hits': 0, 'misses': 0}
+
+
+def test_page_cache_is_bounded(empty_cache, monkeypatch):
+    """The least recently used page is evicted once the cache is full"""
+    monkeypatch.setattr(empty_cache, 'CACHE_SIZE', 2)
+    for name in ('a', 'b', 'a', 'c'):
+        empty_cache.process_proposal(f'proposals/{name}.md', f'# {name}\n')
+
+    assert [key[0] for key in empty_cache.page_cache] == ['proposals/a.md', 'proposals/c.md']
+
+
 def test_on_page_markdown_non_proposal_page():
     """Test that non-proposal pages are not modified"""
     page = MockPage('docs/test.md')
@@ -217,5 +286,64 @@ def test_on_page_content_error_handling():
     assert result is None
 
 
+@pytest.fixture
+def proposal_files(tmp_path, monkeypatch):
+    """A docs directory with two proposals, an index page and another page"""
+    monkeypatch.setattr(proposal_metadata, 'registry', {})
+    docs = tmp_path / 'docs'
+    (docs / 'proposals').mkdir(parents=True)
+    (docs / 'proposals' / 'index.md').write_text('# Proposals\n\n<!-- proposal-registry -->\n')
+    (docs / 'proposals' / 'routing.md').write_text(
+        '---\nstatus: Review\nauthors: [Jane Smith, Bo Li]\nrfc: "002"\n---\n\n# Routing\n\nBody\n'
+    )
+    (docs / 'proposals' / 'memory.md').write_text('Status: Draft\nDate: 2025-01-15\n\n# Memory | Sessions\n')
+    (docs / 'about.md').write_text('# About\n')
+    config = MkDocsConfig()
+    config.load_dict({'site_name': 'Test', 'docs_dir': str(docs), 'site_dir': str(tmp_path / 'site')})
+    config.validate()
+    # Set by MkDocs while an event runs; File.generated records it on the file
+    config.plugins._current_plugin = 'proposal_metadata'
+    files = Files([
+        File(path, str(docs), config['site_dir'], use_directory_urls=True)
+        for path in ('proposals/index.md', 'proposals/routing.md', 'proposals/memory.md', 'about.md')
+    ])
+    return proposal_metadata.on_files(files, config)
+
+
+def test_registry_built_once_and_published(proposal_files):
+    """Every proposal is registered in on_files and published as JSON"""
+    registry = proposal_metadata.registry
+    assert sorted(registry) == ['proposals/memory.md', 'proposals/routing.md']
+    assert registry['proposals/routing.md']['authors'] == 'Jane Smith, Bo Li'
+    assert registry['proposals/memory.md']['title'] == 'Memory | Sessions'
+
+    published = json.loads(proposal_files.get_file_from_path('proposals/index.json').content_string)
+    assert [entry['path'] for entry in published['proposals']] == ['proposals/memory.md', 'proposals/routing.md']
+    assert published['proposals'][1] == {
+        'path': 'proposals/routing.md', 'url': 'proposals/routing/', 'title': 'Routing',
+        'status': 'Review', 'authors': 'Jane Smith, Bo Li', 'date': None, 'rfc': '002', 'version': None
+    }
+
+
+def test_registry_table_replaces_marker(proposal_files):
+    """Index pages get a table of proposals from the registry"""
+    result = on_page_markdown('# Proposals\n\n<!-- proposal-registry -->\n', MockPage('proposals/index.md'), None, None)
+
+    assert '<!-- proposal-registry -->' not in result
+    assert '| [Memory \\| Sessions](memory.md) | Draft | — | 2025-01-15 | — |' in result
+    assert '| [Routing](routing.md) | Review | Jane Smith, Bo Li | — | 002 |' in result
+    assert '](proposals/routing.md)' in proposal_metadata.registry_table('about.md')
+
+
+def test_on_page_content_adds_status_badge(proposal_files):
+    """Registered statuses become badges on the page title at build time"""
+    html = '<h1 id="routing">Routing<a class="headerlink" href="#routing">¶</a></h1><h1>Second</h1>'
+    result = on_page_content(html, MockPage('proposals/routing.md'), None, None)
+
+    assert result.count('status-badge') == 1
+    assert '¶</a><span class="status-badge status-review">In Review</span></h1>' in result
+    assert on_page_content('<h1>About</h1>', MockPage('about.md'), None, None) == '<h1>About</h1>'
+
+
 if __name__ == '__main__':
     pytest.main([__file__, '-v'])
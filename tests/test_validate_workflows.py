@@ -0,0 +1,182 @@
+"""
+Tests for .github/scripts/validate-workflows.py
+
+Run with: python -m pytest tests/test_validate_workflows.py
+"""
+
+import pytest
+
+VALID_WORKFLOW = """name: Build
+'on': push
+jobs:
+  build:
+    runs-on: ubuntu-latest
+    steps:
+      - run: echo ok
+"""
+
+
+@pytest.fixture
+def validator(load_script):
+    return load_script('validate-workflows.py')
+
+
+@pytest.fixture
+def workflow_dir(tmp_path):
+    """A workflow directory with one valid and one broken workflow"""
+    directory = tmp_path / 'workflows'
+    directory.mkdir()
+    (directory / 'build.yml').write_text(VALID_WORKFLOW)
+    (directory / 'broken.yml').write_text("name: Broken\n'on': push\njobs:\n  test:\n    steps: []\n")
+    return directory
+
+
+def test_validate_workflows_uses_content_hash_cache(validator, workflow_dir, tmp_path, monkeypatch):
+    """Unchanged files are served from the cache instead of being parsed again"""
+    cache_path = tmp_path / 'cache.json'
+    first = validator.validate_workflows(validator.find_workflow_files(workflow_dir), cache_path=cache_path)
+
+    calls = []
+    original = validator.validate_yaml_file
+    monkeypatch.setattr(validator, 'validate_yaml_file', lambda *a: calls.append(a) or original(*a))
+    (workflow_dir / 'build.yml').write_text(VALID_WORKFLOW.replace('Build', 'Build and test'))
+    second = validator.validate_workflows(validator.find_workflow_files(workflow_dir), cache_path=cache_path)
+
+    assert [str(call[0]) for call in calls] == [str(workflow_dir / 'build.yml')]
+    # Validated from the content that was hashed, not read again
+    assert calls[0][1] == (workflow_dir / 'build.yml').read_text()
+    assert second == first
+    assert [r['valid'] for r in second] == [False, True]
+    assert "Job 'test' missing 'runs-on' field" in second[0]['errors']
+
+
+def test_parallel_validation_matches_serial(validator, workflow_dir):
+    """The process pool produces the same results as a serial pass"""
+    files = validator.find_workflow_files(workflow_dir)
+
+    assert validator.validate_workflows(files, jobs=2) == validator.validate_workflows(files)
+
+
+def test_schema_errors_point_at_yaml_position(validator):
+    """Schema violations are reported at the line and column of the offending node"""
+    pytest.importorskip('jsonschema')
+    content = VALID_WORKFLOW.replace("'on': push", "on:\n  push:\n    branchez: [main]")
+
+    errors, _ = validator.validate_yaml_file('typo.yml', content)
+
+    assert errors == [
+        "Line 4, column 5: Schema: Additional properties are not allowed "
+        "('branchez' was unexpected) (at on/push)"
+    ]
+
+
+def test_bare_on_key_is_not_reported_missing(validator):
+    """YAML 1.1 reads a bare 'on' as True; it still counts as the trigger"""
+    errors, _ = validator.validate_yaml_file('build.yml', VALID_WORKFLOW.replace("'on'", 'on'))
+
+    assert errors == []
+
+
+def test_schema_validator_is_compiled_once(validator):
+    """Every file reuses the same compiled validator"""
+    pytest.importorskip('jsonschema')
+    assert validator.get_schema_validator() is validator.get_schema_validator()
+    assert validator.benchmark_schema_validation(files=20, repeat=1)['files'] == 20
+
+
+def test_expand_matrix_applies_include_and_exclude(validator):
+    """Matrix size follows GitHub's include and exclude rules"""
+    strategy = {'matrix': {
+        'os': ['ubuntu', 'macos'],
+        'python': ['3.11', '3.12'],
+        'exclude': [{'os': 'macos', 'python': '3.11'}],
+        'include': [{'os': 'ubuntu', 'experimental': True}, {'os': 'windows', 'python': '3.12'}],
+    }}
+
+    assert validator.expand_matrix(strategy) == 4
+    assert validator.expand_matrix({'matrix': '${{ fromJSON(needs.setup.outputs.matrix) }}'}) == 1
+
+
+def test_analyze_workflow_finds_critical_path(validator):
+    """Critical path, runner minutes and speedup gains come from needs, matrices and durations"""
+    _, data = validator.load_workflow("""
+on: push
+jobs:
+  setup:
+    runs-on: ubuntu-latest
+  lint:
+    needs: setup
+    runs-on: ubuntu-latest
+  test:
+    needs: setup
+    runs-on: ubuntu-latest
+    strategy:
+      max-parallel: 2
+      matrix:
+        python: ['3.10', '3.11', '3.12', '3.13']
+  deploy:
+    needs: [lint, test]
+    runs-on: ubuntu-latest
+""")
+    durations = {'setup': 60, 'lint': {'install': 60, 'run': 120}, 'test': 300, 'deploy': 120}
+
+    result = validator.analyze_workflow(data, durations)
+
+    assert result['critical_path'] == ['setup', 'test', 'deploy']
+    assert result['wall_minutes'] == 13.0
+    assert result['runner_minutes'] == 26.0
+    assert result['parallelism'] == 3
+    assert result['jobs']['lint']['slack'] == 7.0
+    assert result['speedup_candidates'][0] == 'test'
+    assert result['jobs']['test']['gain_if_halved'] == 5.0
+    assert result['jobs']['lint']['gain_if_halved'] == 0.0
+
+
+def test_analyze_workflow_rejects_cycles(validator):
+    """Circular needs are reported rather than looping"""
+    _, data = validator.load_workflow("on: push\njobs:\n  a:\n    needs: b\n  b:\n    needs: a\n")
+
+    with pytest.raises(ValueError, match='cycle'):
+        validator.analyze_workflow(data)
+
+
+def test_filter_patterns_follow_github_globs(validator):
+    """Single stars stop at slashes, double stars do not, and later negations win"""
+    assert validator.filter_includes(['docs/**'], 'docs/a/b.md')
+    assert not validator.filter_includes(['docs/*'], 'docs/a/b.md')
+    assert not validator.filter_includes(['docs/**', '!docs/**/*.png'], 'docs/img/logo.png')
+    assert validator.filter_includes(['release/v*'], 'release/v1')
+
+
+def test_analyze_triggers_counts_overlap_and_redundant_runs(validator, tmp_path):
+    """Workflows sharing triggers are paired and runs without cancel-in-progress are counted"""
+    (tmp_path / 'docs.yml').write_text("""
+on:
+  push:
+    branches: [main]
+    paths: ['docs/**']
+  pull_request:
+    paths: ['docs/**']
+concurrency:
+  group: docs-${{ github.ref }}
+  cancel-in-progress: true
+jobs: {}
+""")
+    (tmp_path / 'lint.yml').write_text("""
+on:
+  pull_request:
+    paths-ignore: ['**.png']
+jobs: {}
+""")
+    changes = [{'sha': 'a', 'files': ['docs/index.md']}, {'sha': 'b', 'files': ['docs/logo.png']},
+               {'sha': 'c', 'files': ['src/app.py']}]
+
+    report = validator.analyze_triggers(validator.find_workflow_files(tmp_path), changes)
+
+    assert report['missing_concurrency'] == ['lint.yml']
+    assert report['overlaps'] == [
+        {'event': 'pull_request', 'workflows': ['docs.yml', 'lint.yml'], 'changes': 1}
+    ]
+    assert report['workflows']['docs.yml']['fired'] == {'push': 2, 'pull_request': 2}
+    # docs.yml runs twice per docs change; lint.yml keeps stale PR runs alive
+    assert report['redundant_runs_per_push'] == round((2 + 2) / 3, 2)